@@ -3,6 +3,10 @@ ASGI config for Assa_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+게임 이벤트 스트림(/api/v1/game/events/, game.events)은 연결마다 스레드를 잡지 않도록
+async 뷰로 작성되어 있으므로 이 application을 ASGI 서버(uvicorn, daphne 등)로 실행해야 한다.
+WSGI 서버(runserver, gunicorn sync 워커 등)에서는 스트림이 끝나지 않아 응답이 전달되지 않는다.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
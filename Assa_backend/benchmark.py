@@ -0,0 +1,71 @@
+"""
+벤치마크 명령어에서 공통으로 사용하는 도구
+
+- benchmark_database: 실제 DB를 건드리지 않도록 임시 DB를 만들고 끝나면 삭제
+- count_queries: 블록 안에서 실행된 SQL 쿼리 수 측정
+- timed: 블록 실행 시간(초) 측정
+"""
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    벤치마크 전용 임시 DB 생성
+    SQLite는 메모리 DB 대신 임시 파일을 사용해 실제 디스크 I/O를 포함해 측정
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+
+    tmp_dir = None
+    if connection.vendor == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='assa_bench_')
+        test_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection.settings_dict['NAME']
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class QueryCounter:
+    """connection.execute_wrapper에 등록해 실행된 쿼리 수를 센다"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+class Timer:
+    elapsed = 0.0
+
+
+@contextmanager
+def timed():
+    timer = Timer()
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.elapsed = time.perf_counter() - started
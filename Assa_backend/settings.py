@@ -53,6 +53,7 @@ INSTALLED_APPS = [
 
 CRONJOBS = [
     ('*/1 * * * *', 'source /root/Assa_backend/.env && DJANGO_SETTINGS_MODULE=Assa_backend.settings /root/venv/bin/python /root/Assa_backend/manage.py fetch_youtube_data >> /root/Assa_backend/logs/file2.log 2>&1'),
+    ('5 * * * *', 'source /root/Assa_backend/.env && DJANGO_SETTINGS_MODULE=Assa_backend.settings /root/venv/bin/python /root/Assa_backend/manage.py rollup_stats >> /root/Assa_backend/logs/file2.log 2>&1'),
 ]
 
 
@@ -150,6 +151,185 @@ load_dotenv()
 
 YOUTUBE_DATA_API_KEY = os.getenv("YOUTUBE_DATA_API_KEY", "default-fallback-key")
 
+# 유튜브 Data API 비동기 조회 설정 (shorts.fetcher)
+YOUTUBE_API_BASE_URL = os.getenv("YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3/")
+YOUTUBE_FETCH_CONCURRENCY = int(os.getenv("YOUTUBE_FETCH_CONCURRENCY", 8))  # 동시에 보내는 최대 요청 수
+
+# 영상별 갱신 주기 (shorts.scheduler)
+SHORTS_REFRESH_SCHEDULE = {
+    'MIN_INTERVAL_MINUTES': 1,
+    'MAX_INTERVAL_MINUTES': 24 * 60,        # 오래되고 정체된 영상은 하루에 한 번
+    'YOUNG_VIDEO_HOURS': 48,                # 게시 후 이 시간 이내의 영상은
+    'YOUNG_MAX_INTERVAL_MINUTES': 60,       # 최소 한 시간에 한 번 갱신
+    'TARGET_VIEW_DELTA': 500,               # 이만큼 증가할 것으로 예상될 때마다 갱신
+    'RUN_BUDGET': 200,                      # 실행당 videos.list 호출 수 상한 (= 최대 10,000개 영상)
+}
+
+# 트렌드 점수 (shorts.scoring)
+# (view_diff * VIEW_WEIGHT + like_diff * LIKE_WEIGHT) / decay(게시 후 경과 시간)
+# DECAY: 'sqrt' | 'power'(EXPONENT) | 'gravity'(GRAVITY) | 'exponential'(HALF_LIFE_HOURS)
+# 값을 바꾼 뒤에는 manage.py rescore_videos로 전체 점수를 다시 계산
+TREND_SCORE = {
+    'VIEW_WEIGHT': 1.0,
+    'LIKE_WEIGHT': 2.0,
+    'DECAY': 'sqrt',
+}
+
+# 트렌드 순위표 (shorts.leaderboard)
+# Redis에 연결할 수 없으면 프로세스 내 순위표(상위 TOP_K개, REFRESH_SECONDS마다 DB에서 다시 읽음)를 사용
+TRENDING_LEADERBOARD = {
+    'REDIS_URL': os.getenv("TRENDING_REDIS_URL", "redis://localhost:6379/1"),
+    'KEY': 'shorts:trending',
+    'TOP_K': 1000,
+    'REFRESH_SECONDS': 30,
+}
+
+# 게임 매칭 대기열 (game.matchmaking)
+# Redis에 연결할 수 없으면 프로세스 내 대기열을 사용 (서버 프로세스가 하나일 때만 모든 유저가 같은 대기열을 봄)
+GAME_MATCHMAKING = {
+    'REDIS_URL': os.getenv("MATCHMAKING_REDIS_URL", "redis://localhost:6379/2"),
+    'KEY': 'game:matchmaking',
+    # 랭크 점수 차이 허용 범위: min(BASE_GAP + GAP_PER_SECOND × 대기 시간(초), MAX_GAP)
+    'BASE_GAP': 50,
+    'GAP_PER_SECOND': 10,
+    'MAX_GAP': 600,
+    'SWEEP_SECONDS': 2,            # 대기자끼리 다시 짝짓는 주기 (game.tasks.sweep_matchmaking)
+}
+
+# 매치 문제 선택 (game.problems)
+GAME_PROBLEMS = {
+    'RECENT_LIMIT': 50,                  # 유저별로 다시 내지 않을 최근 문제 수
+    'PICK_ATTEMPTS': 8,                  # 최근 문제를 피해 다시 뽑는 최대 횟수
+    'SEEN_TIMEOUT': 60 * 60 * 24 * 7,    # 최근 문제 기록 보관 기간
+    'POOL_TIMEOUT': 60 * 60 * 24,        # 공유 캐시의 문제 id 배열 보관 기간 (버전이 바뀌면 새 키)
+    # (최소 평균 랭크 점수, 난이도)를 점수 내림차순으로. 비워 두면 난이도와 관계없이 선택
+    'DIFFICULTY_BY_RATING': [(1400, 3), (1000, 2), (0, 1)],
+}
+
+# 게임 이벤트 푸시 (game.events, GET /api/v1/game/events/ SSE 스트림 — ASGI 서버 필요)
+# BACKEND: 'redis'(프로세스 간 공유, 연결할 수 없으면 memory로 대체) | 'memory'(프로세스 내)
+GAME_EVENTS = {
+    'BACKEND': os.getenv("GAME_EVENTS_BACKEND", "redis"),
+    'REDIS_URL': os.getenv("GAME_EVENTS_REDIS_URL", "redis://localhost:6379/2"),
+    'KEY': 'game:events',
+    'KEEPALIVE_SECONDS': 15,       # 이벤트가 없을 때 주석 줄을 보내는 간격
+    'RETRY_MILLISECONDS': 3000,    # 연결이 끊겼을 때 브라우저(EventSource)의 재연결 대기 시간
+}
+
+# Cache
+# 수집 작업과 웹 서버가 캐시 버전을 공유하도록 REDIS_CACHE_URL이 있으면 Redis를 사용
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+if os.getenv("REDIS_CACHE_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_CACHE_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# trending_videos 페이지 크기 (limit이 MAX_LIMIT보다 크면 MAX_LIMIT개만 반환)
+TRENDING_PAGE = {
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+}
+
+# trending_videos 응답 캐시 (shorts.response_cache)
+TRENDING_CACHE = {
+    'TIMEOUT': 60 * 10,  # 버전이 바뀌지 않아도 이 시간(초)이 지나면 다시 만듦
+    # CACHES가 프로세스 내 캐시(LocMem)면 수집 작업의 버전 갱신이 보이지 않으므로 응답 캐시를 끔
+    'REQUIRE_SHARED': True,
+}
+
+# 수집 실행 단일화 잠금 (shorts.locks)
+# 실행 중 RENEW_SECONDS마다 리스를 연장하고, 연장이 끊긴 리스는 LEASE_SECONDS 뒤 다음 실행이 가져감
+INGESTION_LOCK = {
+    'LEASE_SECONDS': 120,
+    'RENEW_SECONDS': 30,
+}
+
+# 유튜브 API 일일 할당량 (shorts.quota)
+YOUTUBE_QUOTA = {
+    'DAILY_LIMIT': int(os.getenv("YOUTUBE_QUOTA_DAILY_LIMIT", 10_000)),
+    'BURST_UNITS': 500,  # 하루 페이스보다 앞서 쓸 수 있는 여유분
+    'DISCOVERY_SHARE': 0.5,  # 실행 할당량 중 새 영상 검색에 쓸 수 있는 비율
+}
+
+# 새 영상 검색 계획 (shorts.discovery)
+# QUERIES의 검색을 동시에 보내고, 검색마다 최대 PAGES 페이지(pageToken)까지 읽음
+# 할당량이 부족하면 새 영상 수율(검색 1회당 새 영상 수)이 높은 검색부터 보내고,
+# MIN_SEARCHES번 이상 검색했는데 수율이 MIN_YIELD보다 낮은 검색은 건너뜀 (/api/v1/video/discovery/)
+SHORTS_DISCOVERY = {
+    'QUERIES': [
+        {'name': 'kr-latest', 'regionCode': 'KR', 'relevanceLanguage': 'ko'},
+        {'name': 'kr-shorts-tag', 'regionCode': 'KR', 'relevanceLanguage': 'ko', 'q': '#shorts'},
+        {'name': 'kr-shorts-keyword', 'regionCode': 'KR', 'relevanceLanguage': 'ko', 'q': '쇼츠'},
+    ],
+    'PAGES': 2,
+    'MIN_YIELD': 1.0,
+    'MIN_SEARCHES': 20,
+}
+
+# 통계 이력 압축과 보존 기간 (shorts.rollups)
+# 원본 -> 시간 통계 -> 일 통계 순으로 압축하고, 일 통계는 계속 보존
+# 점수 재계산(rescore_videos)이 영상별 최근 원본 두 개를 읽으므로
+# RAW_RETENTION_DAYS는 MAX_INTERVAL_MINUTES의 두 배보다 길어야 함
+STATS_HISTORY = {
+    'RAW_RETENTION_DAYS': 7,
+    'HOURLY_RETENTION_DAYS': 90,
+    'MAX_POINTS': 1500,            # 이력 조회 시 이 포인트 수를 넘지 않는 가장 세밀한 해상도를 사용
+    'DELETE_CHUNK_SIZE': 10_000,
+    # 압축이 끝난 뒤 커밋된 늦은 샘플을 반영하려고 실행마다 다시 압축하는 최근 구간 수
+    'LATE_BUCKETS': {'hour': 3, 'day': 1},
+}
+
+# 영상별 성장 곡선 API (shorts.growth)
+GROWTH_CURVE = {
+    'DEFAULT_BUCKETS': 288,        # start를 생략하면 최근 이 개수의 구간 (5m 기준 하루)
+    'MAX_BUCKETS': 2000,           # 요청 하나에 포함할 수 있는 최대 구간 수
+    'PAGE_BUCKETS': 200,           # 이 개수의 구간을 한 페이지로 묶어 끝난 페이지를 캐시
+    'CACHE_TIMEOUT': 60 * 60 * 24,
+}
+
+# 트렌드 목록 / 증가량 순위 정적 스냅샷 (shorts.snapshots)
+FEED_SNAPSHOTS = {
+    'ROOT': os.getenv("FEED_SNAPSHOT_DIR"),  # nginx/CDN이 내려줄 디렉터리 (비어 있으면 만들지 않음)
+    'TRENDING_PAGES': 5,
+    'PAGE_SIZE': 50,
+    'GROWTH_LIMIT': 100,
+    'RANK_LIMIT': 100,             # 게임 랭크 점수 순위 인원
+    'COMPRESS': ['gzip', 'br'],    # br은 brotli 패키지가 설치된 경우만
+}
+
+# 통계 이력 내보내기 (shorts.export)
+STATS_EXPORT = {
+    'CHUNK_SIZE': 5_000,           # DB에서 한 번에 읽고 인코딩하는 행 수
+    'GZIP_LEVEL': 6,
+}
+
+# 영상 제목/설명 전문 검색 (shorts.search)
+VIDEO_SEARCH = {
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 50,
+    'MAX_TERMS': 8,                # 검색어에서 사용할 최대 단어 수
+    'CANDIDATES': 200,             # 매칭된 영상 중 트렌드 점수 상위 이 개수에만 관련도를 계산해 다시 정렬
+    'RANKED_SIZE': 50_000,         # 순위 역색인(SQLite)에 담을 트렌드 점수 상위 영상 수
+    'TREND_WEIGHT': 0.1,           # 0이면 관련도만으로 정렬
+}
+
+# Celery 분할 수집 (shorts.tasks.fetch_youtube_data)
+SHORTS_INGESTION_TASKS = {
+    'CHUNK_SIZE': 500,             # 하위 작업 하나가 갱신할 영상 수 (videos.list 10번을 작업 안에서 동시에 호출)
+    'MAX_RETRIES': 3,              # 실패한 하위 작업의 최대 재시도 횟수
+    # 하위 작업 하나당 잡아 두는 수집 잠금 시간(초). 대기열 대기 포함, 하위 작업 수만큼 곱해 리스를 미리 연장
+    'CHUNK_LEASE_SECONDS': 60,
+}
+
 # Redis를 브로커로 설정
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 
@@ -159,3 +339,12 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 # 직렬화 포맷
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+
+# 주기 작업 (django_celery_beat DatabaseScheduler를 써도 시작할 때 등록됨)
+CELERY_BEAT_SCHEDULE = {
+    'game-sweep-matchmaking': {
+        'task': 'game.tasks.sweep_matchmaking',
+        'schedule': GAME_MATCHMAKING['SWEEP_SECONDS'],
+        'options': {'expires': GAME_MATCHMAKING['SWEEP_SECONDS']},  # 밀린 실행은 버림
+    },
+}
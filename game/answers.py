@@ -0,0 +1,77 @@
+# game/answers.py
+"""
+답안 제출 처리 (game.views.MatchAnswerView)
+
+승자 결정은 조건부 UPDATE 한 문장으로 처리한다.
+
+    UPDATE game_match SET winner_id=…, status='finished', ended_at=…
+    WHERE id=… AND winner_id IS NULL AND status='ongoing'
+
+두 유저가 동시에 정답을 내도 한 문장만 1행을 바꾸므로 승자는 한 명이고,
+랭크 점수/전적은 같은 트랜잭션에서 F() 식으로 더해 읽고-쓰기 사이에 값이 덮이지 않는다.
+
+매치의 두 유저와 정규화한 정답은 매치가 끝날 때까지 바뀌지 않으므로 매치별로 캐시한다.
+(진행 중인 매치의 문제 정답을 수정하면 캐시가 만료될 때까지 이전 정답으로 판정)
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from accounts.models import Profile
+from game.models import Match
+
+CACHE_TIMEOUT = 60 * 60
+RANK_SCORE_DELTA = 20
+
+
+def normalize_answer(answer):
+    return str(answer).strip().lower()
+
+
+def answer_key(match_id):
+    return f'game:match:{match_id}:answer'
+
+
+def get_match_answer(match_id):
+    """
+    :return: (player1_id, player2_id, 정규화한 정답 또는 None) (매치가 없으면 None)
+    """
+    key = answer_key(match_id)
+    entry = cache.get(key)
+    if entry is None:
+        row = Match.objects.filter(id=match_id).values_list('player1_id', 'player2_id', 'problem__answer').first()
+        if row is None:
+            return None
+        player1_id, player2_id, answer = row
+        entry = (player1_id, player2_id, normalize_answer(answer) if answer else None)
+        cache.set(key, entry, timeout=CACHE_TIMEOUT)
+    return entry
+
+
+def resolve_win(match_id, winner_id, loser_id):
+    """
+    아직 승자가 없는 진행 중인 매치면 winner_id를 승자로 확정하고 두 유저의 랭크 점수/전적 반영
+    :return: 승자가 된 경우 (승자 프로필 갱신 수, 패자 프로필 갱신 수), 이미 끝난 매치면 None
+    """
+    with transaction.atomic():
+        decided = Match.objects.filter(id=match_id, winner__isnull=True, status='ongoing').update(
+            winner_id=winner_id, status='finished', ended_at=timezone.now()
+        )
+        if not decided:
+            return None
+        winner_updated = Profile.objects.filter(user_id=winner_id).update(
+            rank_score=F('rank_score') + RANK_SCORE_DELTA,
+            win_count=F('win_count') + 1,
+        )
+        loser_updated = Profile.objects.filter(user_id=loser_id).update(
+            rank_score=Greatest(F('rank_score') - RANK_SCORE_DELTA, Value(0)),
+            lose_count=F('lose_count') + 1,
+        )
+    return winner_updated, loser_updated
+
+
+def match_result(match_id):
+    """:return: (status, 승자 username 또는 None)"""
+    return Match.objects.filter(id=match_id).values_list('status', 'winner__username').get()
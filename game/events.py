@@ -0,0 +1,213 @@
+# game/events.py
+"""
+게임 이벤트 푸시 (Server-Sent Events)
+
+매칭 결과와 상대의 답안 제출을 알기 위해 /queue/와 /matches/<id>/를 반복 요청하던 것을
+유저별 이벤트 스트림(GET /api/v1/game/events/)으로 대체한다.
+
+    matched           매치가 만들어짐 (data: MatchSerializer)
+    opponent_answered 상대가 오답을 제출함 (data: {match_id})
+    match_finished    승자가 정해지거나 기권으로 매치가 끝남 (data: {match_id, status, winner})
+
+채널 레이어 (settings.GAME_EVENTS['BACKEND'])
+- redis: Redis pub/sub. 이벤트를 보내는 웹/작업 프로세스와 스트림을 연 ASGI 프로세스가 달라도 전달됨
+- memory: 프로세스 내 asyncio 큐 (테스트, 서버 프로세스가 하나일 때)
+redis에 연결할 수 없으면 memory로 대체한다.
+
+이벤트는 DB 트랜잭션이 커밋된 뒤에 보내고(publish_on_commit), 스트림은 ASGI 서버에서만 동작한다.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+MATCHED = 'matched'
+OPPONENT_ANSWERED = 'opponent_answered'
+MATCH_FINISHED = 'match_finished'
+
+
+def get_events_setting(name):
+    return settings.GAME_EVENTS[name]
+
+
+def user_group(user_id):
+    return f'user.{user_id}'
+
+
+def encode_event(event, data):
+    """SSE 메시지 한 개"""
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+class InMemoryChannelLayer:
+    """
+    프로세스 내 채널 레이어
+    구독자마다 (이벤트 루프, asyncio.Queue)를 두고, 다른 스레드(동기 뷰)에서 보낸 메시지는
+    call_soon_threadsafe로 구독자의 루프에 넣는다.
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def publish(self, group, message):
+        with self._lock:
+            subscribers = list(self._groups.get(group, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:  # 구독자의 루프가 이미 닫힘
+                pass
+
+    def subscribe(self, group):
+        return InMemorySubscription(self, group)
+
+
+class InMemorySubscription:
+    def __init__(self, layer, group):
+        self.layer = layer
+        self.group = group
+        self.subscriber = None
+
+    async def __aenter__(self):
+        self.subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.layer._lock:
+            self.layer._groups.setdefault(self.group, set()).add(self.subscriber)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        with self.layer._lock:
+            subscribers = self.layer._groups.get(self.group, set())
+            subscribers.discard(self.subscriber)
+            if not subscribers:
+                self.layer._groups.pop(self.group, None)
+
+    async def get(self, timeout):
+        """:return: 메시지 (timeout초 동안 없으면 None)"""
+        try:
+            return await asyncio.wait_for(self.subscriber[1].get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisChannelLayer:
+    """Redis pub/sub 채널 레이어 (보내기는 동기 클라이언트, 구독은 스트림마다 비동기 연결)"""
+
+    def __init__(self, client, url, prefix):
+        self.client = client
+        self.url = url
+        self.prefix = prefix
+
+    def channel(self, group):
+        return f'{self.prefix}:{group}'
+
+    def publish(self, group, message):
+        self.client.publish(self.channel(group), json.dumps(message, cls=DjangoJSONEncoder))
+
+    def subscribe(self, group):
+        return RedisSubscription(self, group)
+
+
+class RedisSubscription:
+    def __init__(self, layer, group):
+        self.layer = layer
+        self.group = group
+        self.client = None
+        self.pubsub = None
+
+    async def __aenter__(self):
+        self.client = redis.asyncio.Redis.from_url(self.layer.url, decode_responses=True)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.layer.channel(self.group))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+
+_channel_layer = None
+_channel_layer_lock = threading.Lock()
+
+
+def connect_redis():
+    """이벤트용 Redis 연결 (사용할 수 없으면 None)"""
+    url = get_events_setting('REDIS_URL')
+    if not url:
+        return None
+    try:
+        client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=1, decode_responses=True)
+        client.ping()
+        return client
+    except redis.RedisError as e:
+        logger.warning(f"Redis 이벤트 채널을 사용할 수 없어 프로세스 내 채널로 대체합니다: {e}")
+        return None
+
+
+def get_channel_layer():
+    """프로세스 전역 채널 레이어"""
+    global _channel_layer
+    if _channel_layer is None:
+        with _channel_layer_lock:
+            if _channel_layer is None:
+                client = connect_redis() if get_events_setting('BACKEND') == 'redis' else None
+                if client is not None:
+                    _channel_layer = RedisChannelLayer(
+                        client, get_events_setting('REDIS_URL'), get_events_setting('KEY')
+                    )
+                else:
+                    _channel_layer = InMemoryChannelLayer()
+    return _channel_layer
+
+
+def reset_channel_layer():
+    """설정 변경 후(테스트 등) 채널 레이어를 다시 만들도록 초기화"""
+    global _channel_layer
+    _channel_layer = None
+
+
+def publish(user_ids, event, data):
+    """유저들의 스트림에 이벤트 전송 (실패해도 요청은 계속 진행, 클라이언트는 조회 API로 복구 가능)"""
+    layer = get_channel_layer()
+    for user_id in user_ids:
+        try:
+            layer.publish(user_group(user_id), {'event': event, 'data': data})
+        except redis.RedisError as e:
+            logger.error(f"게임 이벤트 전송 실패 ({event}, user {user_id}): {e}")
+
+
+def publish_on_commit(user_ids, event, data):
+    """현재 트랜잭션이 커밋된 뒤 전송 (트랜잭션 밖이면 바로 전송)"""
+    transaction.on_commit(lambda: publish(user_ids, event, data))
+
+
+async def event_stream(user_id, initial_events=None):
+    """
+    유저 한 명의 SSE 스트림
+    :param initial_events: 구독한 뒤 호출해 먼저 보낼 [(event, data), ...]를 받는 async 함수
+                           (스트림을 열기 전에 만들어진 매치를 놓치지 않도록)
+    """
+    keepalive = get_events_setting('KEEPALIVE_SECONDS')
+    async with get_channel_layer().subscribe(user_group(user_id)) as subscription:
+        yield f'retry: {get_events_setting("RETRY_MILLISECONDS")}\n\n'
+        for event, data in (await initial_events() if initial_events else ()):
+            yield encode_event(event, data)
+        while True:
+            message = await subscription.get(keepalive)
+            if message is None:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+                yield ': keepalive\n\n'
+            else:
+                yield encode_event(message['event'], message['data'])
@@ -0,0 +1,176 @@
+import random
+import statistics
+import threading
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from Assa_backend.benchmark import benchmark_database, timed
+from game.matchmaking import LocalMatchmaker, RedisMatchmaker, Ticket, connect_redis, get_matchmaking_setting
+from game.models import Match, MatchQueue
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('매칭 엔진(game.matchmaking)의 동시 요청 시 초당 매칭 수와 중복 매칭 여부, 대기열 크기별 매칭 시도 시간, '
+            '가상 유입에서의 공정성 지표(점수 차이, 대기 시간)를 측정합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=500, help='동시에 매칭을 요청하는 유저(스레드) 수')
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--queue-sizes', nargs='+', type=int, default=[1_000, 10_000, 100_000],
+                            help='매칭 시도 시간을 잴 대기열 크기 목록')
+        parser.add_argument('--arrivals', type=int, default=20, help='공정성 시뮬레이션의 초당 유입 수')
+        parser.add_argument('--seconds', type=int, default=600, help='공정성 시뮬레이션 시간(초, 가상 시계)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--backend', choices=['local', 'redis'], default='local',
+                            help='redis는 MATCHMAKING_REDIS_URL의 별도 키(:bench)를 사용')
+        parser.add_argument('--legacy', action='store_true',
+                            help='기존 MatchQueue 테이블 방식도 임시 DB에서 같은 조건으로 측정')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        matchmaker = self.build_matchmaker(options['backend'])
+
+        self.stdout.write(f'동시 요청 {options["players"]}명')
+        for round_number in range(1, options['rounds'] + 1):
+            matchmaker.clear()
+            ratings = {user_id: rating(rng) for user_id in range(options['players'])}
+            pairs, errors, elapsed = self.run_threads(
+                list(ratings), lambda user_id: matchmaker.enqueue(user_id, ratings[user_id])
+            )
+            self.report(f'{options["backend"]} #{round_number}', options['players'], pairs, errors, elapsed,
+                        matchmaker.size())
+
+        self.stdout.write('대기열 크기별 매칭 시도 (대기자 수를 유지하며 새 유저가 한 번씩 요청)')
+        for size in options['queue_sizes']:
+            matchmaker.clear()
+            for user_id in range(size):
+                matchmaker.requeue(Ticket(user_id, rating(rng), 0.0))
+            attempts = 2_000
+            with timed() as timer:
+                for user_id in range(size, size + attempts):
+                    pairing = matchmaker.enqueue(user_id, rating(rng), now=0.0)
+                    if pairing is not None:
+                        matchmaker.requeue(pairing.opponent)
+            self.stdout.write(f'  대기 {size:>7}명: 시도당 {timer.elapsed / attempts * 1e6:8.1f}µs')
+
+        matchmaker.clear()
+        self.simulate(matchmaker, rng, options)
+        matchmaker.clear()
+
+        if options['legacy']:
+            with benchmark_database():
+                users = User.objects.bulk_create(
+                    User(username=f'bench{i}') for i in range(options['players'])
+                )
+                for round_number in range(1, options['rounds'] + 1):
+                    Match.objects.all().delete()
+                    MatchQueue.objects.all().delete()
+                    pairs, errors, elapsed = self.run_threads([user.pk for user in users], legacy_enqueue)
+                    self.report(f'legacy #{round_number}', options['players'], pairs, errors, elapsed)
+
+    def build_matchmaker(self, backend):
+        if backend == 'local':
+            return LocalMatchmaker()
+        client = connect_redis()
+        if client is None:
+            raise CommandError('Redis에 연결할 수 없습니다. (MATCHMAKING_REDIS_URL)')
+        return RedisMatchmaker(client, f"{get_matchmaking_setting('KEY')}:bench")
+
+    def run_threads(self, user_ids, enqueue):
+        """
+        모든 스레드가 준비된 뒤 유저마다 동시에 enqueue
+        :return: ([(상대, 유저), ...], 에러 수, 걸린 시간)
+        """
+        barrier = threading.Barrier(len(user_ids) + 1)
+        pairs = []
+        errors = []
+
+        def worker(user_id):
+            barrier.wait()
+            try:
+                pairing = enqueue(user_id)
+                if pairing is not None:
+                    opponent = pairing if isinstance(pairing, int) else pairing.opponent.user_id
+                    pairs.append((opponent, user_id))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in user_ids]
+        for thread in threads:
+            thread.start()
+        with timed() as timer:
+            barrier.wait()
+            for thread in threads:
+                thread.join()
+        return pairs, len(errors), timer.elapsed
+
+    def report(self, label, players, pairs, errors, elapsed, waiting=None):
+        # 한 유저가 두 매치에 들어가면 중복 매칭
+        appearances = Counter(player for pair in pairs for player in pair)
+        duplicated = sum(1 for count in appearances.values() if count > 1)
+        line = (f'  {label:<12} 매칭 {len(pairs):>5}쌍 / {players}명 {elapsed * 1000:9.1f}ms '
+                f'({len(pairs) / elapsed:10.0f}쌍/s) 중복 {duplicated}명, 에러 {errors}건')
+        if waiting is not None:
+            line += f', 대기 {waiting}명'
+        self.stdout.write(line)
+
+    def simulate(self, matchmaker, rng, options):
+        """
+        가상 시계로 초마다 새 유저가 들어오고, 대기 중인 유저는 다시 요청하지 않고 1초마다 sweep()으로 다시 짝지음
+        매치마다 점수 차이와 대기 시간을 모아 공정성 지표를 계산
+        """
+        waiting = set()
+        gaps, waits = [], []
+        next_user_id = 0
+        for second in range(options['seconds']):
+            pairings = []
+            for _ in range(options['arrivals']):
+                pairing = matchmaker.enqueue(next_user_id, rating(rng), now=float(second))
+                waiting.add(next_user_id)
+                next_user_id += 1
+                if pairing is not None:
+                    pairings.append(pairing)
+            pairings += matchmaker.sweep(now=float(second))
+            for pairing in pairings:
+                waiting -= {pairing.ticket.user_id, pairing.opponent.user_id}
+                gaps.append(pairing.rating_gap)
+                waits.append(pairing.wait_seconds)
+
+        if not gaps:
+            self.stdout.write('공정성: 매칭 없음')
+            return
+        self.stdout.write(
+            f'공정성 ({options["arrivals"]}명/s × {options["seconds"]}s, 매치 {len(gaps)}개, 남은 대기 {len(waiting)}명)\n'
+            f'  점수 차이 평균 {statistics.mean(gaps):6.1f} / p95 {percentile(gaps, 95):6.1f} / 최대 {max(gaps)}\n'
+            f'  대기 시간 평균 {statistics.mean(waits):6.1f}s / p95 {percentile(waits, 95):6.1f}s / 최대 {max(waits):.0f}s'
+        )
+
+
+def rating(rng):
+    """랭크 점수 분포 (대부분 중간, 일부 상위권)"""
+    return max(int(rng.gauss(1000, 300)), 0)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def legacy_enqueue(user_id):
+    """기존 MatchQueueView의 대기열 처리 (잠금 없이 가장 오래된 대기자를 조회)"""
+    with transaction.atomic():
+        waiting = MatchQueue.objects.exclude(user_id=user_id).order_by('created_at').first()
+        if waiting:
+            Match.objects.create(player1_id=waiting.user_id, player2_id=user_id, status='ongoing')
+            MatchQueue.objects.filter(user_id=waiting.user_id).delete()
+            MatchQueue.objects.filter(user_id=user_id).delete()
+            return waiting.user_id
+        MatchQueue.objects.create(user_id=user_id)
+        return None
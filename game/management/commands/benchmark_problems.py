@@ -0,0 +1,73 @@
+import random
+import statistics
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from Assa_backend.benchmark import benchmark_database, count_queries, timed
+from game import problems
+from game.models import Problem
+
+
+class Command(BaseCommand):
+    help = '문제 id 배열 선택(game.problems)과 ORDER BY RANDOM()의 문제 선택 시간과 반복 출제율을 비교합니다. (임시 DB 사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problems', type=int, default=100_000, help='문제 수')
+        parser.add_argument('--repeat', type=int, default=200, help='선택 횟수')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with benchmark_database():
+            Problem.objects.bulk_create(
+                (Problem(question=f'문제 {i}', answer=str(i), difficulty=rng.choice([1, 2, 3, None]))
+                 for i in range(options['problems'])),
+                batch_size=10_000,
+            )
+            problems.bump_version()
+            self.stdout.write(f'문제 {options["problems"]}개')
+
+            times = []
+            for _ in range(options['repeat']):
+                with timed() as timer:
+                    Problem.objects.order_by('?').first()
+                times.append(timer.elapsed)
+            self.report('ORDER BY RANDOM()', times)
+
+            # 새 버전의 첫 선택은 id 배열을 만들어 캐시에 저장
+            problems.bump_version()
+            with count_queries() as queries, timed() as timer:
+                problems.pick_problem([0, 1], rng=rng)
+            self.stdout.write(f'  {"id 배열 생성":<22} {timer.elapsed * 1000:9.2f}ms (쿼리 {queries.count}개)')
+
+            for label, difficulty in [('id 배열', None), ('id 배열 (난이도 2)', 2)]:
+                times = []
+                with count_queries() as queries:
+                    for i in range(options['repeat']):
+                        with timed() as timer:
+                            problems.pick_problem([2 * i, 2 * i + 1], difficulty, rng=rng)
+                        times.append(timer.elapsed)
+                self.report(label, times, queries.count)
+
+            self.repeat_rate(rng)
+        cache.clear()
+
+    def report(self, label, times, query_count=None):
+        line = (f'  {label:<22} 중앙값 {statistics.median(times) * 1000:9.3f}ms '
+                f'(최대 {max(times) * 1000:.3f}ms)')
+        if query_count is not None:
+            line += f' 쿼리 {query_count}개'
+        self.stdout.write(line)
+
+    def repeat_rate(self, rng):
+        """
+        같은 두 유저가 RECENT_LIMIT번 연속으로 매치할 때 같은 문제를 다시 받은 횟수
+        (문제 수가 RECENT_LIMIT보다 넉넉하면 0, 적으면 최근 문제를 피하지 못함)
+        """
+        limit = problems.get_problem_setting('RECENT_LIMIT')
+        for pool_size in [limit * 4, limit]:
+            Problem.objects.filter(id__gt=Problem.objects.order_by('id')[pool_size - 1].id).delete()
+            cache.clear()
+            picked = [problems.pick_problem(['a', 'b'], rng=rng) for _ in range(limit)]
+            self.stdout.write(f'  문제 {pool_size}개에서 연속 {limit}매치: 반복 출제 {len(picked) - len(set(picked))}번')
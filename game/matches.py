@@ -0,0 +1,44 @@
+# game/matches.py
+"""
+짝지어진 두 대기자로 매치 만들기 (game.views.MatchQueueView, game.tasks.sweep_matchmaking)
+
+요청한 유저가 바로 짝지어지면 뷰가, 대기 중인 유저끼리 넓어진 허용 범위로 짝지어지면 sweep 작업이 만든다.
+어느 쪽이든 두 유저에게 이벤트 스트림(game.events)의 matched를 보낸다.
+"""
+import logging
+
+from game import events, problems
+from game.models import Match
+from game.serializers import MatchSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def create_match(matchmaker, pairing, requeue_ticket=True):
+    """
+    Pairing으로 매치를 만들고 커밋 후 두 유저에게 matched 전송
+    저장에 실패하면 두 유저를 원래 대기 시각으로 대기열에 되돌린다.
+    :param requeue_ticket: 실패 시 pairing.ticket도 되돌릴지 (대기 중이 아니던 요청 유저는 되돌리지 않음)
+    :return: (Match, 직렬화한 매치)
+    """
+    user_ids = [pairing.opponent.user_id, pairing.ticket.user_id]
+    try:
+        match = Match.objects.create(
+            player1_id=pairing.opponent.user_id,
+            player2_id=pairing.ticket.user_id,
+            problem_id=problems.pick_problem(
+                user_ids, problems.difficulty_for_rating((pairing.ticket.rating + pairing.opponent.rating) / 2),
+            ),
+            status='ongoing',  # 매치 시작 시 상태를 ongoing으로 설정
+            rating_gap=pairing.rating_gap,
+            wait_seconds=pairing.wait_seconds,
+        )
+    except Exception:
+        matchmaker.requeue(pairing.opponent)
+        if requeue_ticket:
+            matchmaker.requeue(pairing.ticket)
+        raise
+
+    match_data = MatchSerializer(match).data
+    events.publish_on_commit(user_ids, events.MATCHED, match_data)
+    return match, match_data
@@ -0,0 +1,378 @@
+# game/matchmaking.py
+"""
+매칭 엔진 (랭크 점수가 비슷한 대기자를 찾아 꺼내기 + 짝짓기를 원자적으로)
+
+MatchQueue 테이블을 조회/삭제하던 방식은 잠금 없이 order_by('created_at').first()로 대기자를 고르므로
+동시에 들어온 두 요청이 같은 대기자를 가져갈 수 있었다.
+대기열은 엔진이 관리하고, 두 명이 짝지어졌을 때만 Match 행을 저장한다. (game.views.MatchQueueView)
+
+대기자는 랭크 점수(Profile.rank_score) 순으로 정렬된 색인에 들어가고, 점수 차이가 허용 범위 안인
+가장 가까운 대기자와 짝지어진다. 허용 범위는 오래 기다릴수록 넓어진다.
+
+    허용 점수 차이 = min(BASE_GAP + GAP_PER_SECOND × 대기 시간(초), MAX_GAP)
+
+두 유저 중 한 명의 허용 범위 안이면 짝지을 수 있으므로, 오래 기다린 대기자는 새로 들어온 유저와 넓어진 범위로 짝지어진다.
+바로 옆 대기자가 범위 밖이어도 더 멀리서 오래 기다린 대기자의 범위 안일 수 있으므로 점수 차이 MAX_GAP까지 바깥으로 찾는다.
+점수 차이가 같으면 더 오래 기다린 대기자를 고른다.
+
+새 유저가 들어오지 않아도 대기자끼리의 허용 범위는 계속 넓어지므로, sweep()을 주기적으로 호출해
+대기 중인 유저끼리 다시 짝짓는다. (game.tasks.sweep_matchmaking)
+
+- RedisMatchmaker: 점수를 score로 하는 sorted set + 대기 시작 시각 hash를 Lua 스크립트로 처리.
+  모든 프로세스가 공유하고, 찾기는 점수 순 ZRANGEBYSCORE를 32명씩 (가까운 대기자가 범위 안이면 O(log n))
+- LocalMatchmaker: Redis를 쓸 수 없을 때의 프로세스 내 대체 구현 (단일 프로세스 서버용)
+  정렬된 리스트에서 bisect로 찾음 (O(log n), 넣고 빼기는 리스트 이동)
+
+enqueue(user_id, rating)의 결과
+- Pairing: 대기 중이던 상대를 꺼내 짝지음 (두 유저 모두 대기열에서 빠짐)
+- None: 허용 범위 안에 대기자가 없어 대기 중 (이미 대기 중이면 처음 등록한 점수와 시각을 그대로 사용)
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 대기자 한 명 (enqueued_at: epoch 초)
+Ticket = namedtuple('Ticket', ['user_id', 'rating', 'enqueued_at'])
+
+
+class Pairing(namedtuple('Pairing', ['ticket', 'opponent', 'matched_at'])):
+    """짝지어진 두 대기자 (ticket: 요청한 유저, opponent: 꺼낸 상대)"""
+
+    @property
+    def rating_gap(self):
+        return abs(self.ticket.rating - self.opponent.rating)
+
+    @property
+    def wait_seconds(self):
+        """둘 중 더 오래 기다린 유저의 대기 시간"""
+        return max(self.matched_at - min(self.ticket.enqueued_at, self.opponent.enqueued_at), 0.0)
+
+
+# 두 스크립트 공통: KEYS[1]: 점수 sorted set, KEYS[2]: 대기 시작 시각 hash
+# ARGV[1..4]: BASE_GAP, GAP_PER_SECOND, MAX_GAP, now
+# Lua 숫자는 정수로 잘려 반환되므로 점수와 시각은 문자열로 반환
+FIND_FUNCTIONS = """
+local now = tonumber(ARGV[4])
+local max_gap = tonumber(ARGV[3])
+local function allowed_gap(since)
+    return math.min(tonumber(ARGV[1]) + tonumber(ARGV[2]) * math.max(now - since, 0), max_gap)
+end
+
+-- 점수가 가까운 순으로 한쪽 방향을 훑어 둘 중 한 명의 허용 범위 안인 첫 대기자 (차이가 같으면 오래 기다린 쪽)
+local function scan(user, rating, gap, reverse)
+    local best, best_rating, best_distance, best_at
+    local offset = 0
+    while true do
+        local members
+        if reverse then
+            members = redis.call('ZREVRANGEBYSCORE', KEYS[1], rating, rating - max_gap,
+                'WITHSCORES', 'LIMIT', offset, 32)
+        else
+            members = redis.call('ZRANGEBYSCORE', KEYS[1], rating, rating + max_gap,
+                'WITHSCORES', 'LIMIT', offset, 32)
+        end
+        for i = 1, #members, 2 do
+            if members[i] ~= user then
+                local member_rating = tonumber(members[i + 1])
+                local distance = math.abs(member_rating - rating)
+                if best and distance > best_distance then
+                    return best, best_rating, best_distance, best_at
+                end
+                local member_at = tonumber(redis.call('HGET', KEYS[2], members[i]))
+                if distance <= math.max(gap, allowed_gap(member_at)) and (not best or member_at < best_at) then
+                    best, best_rating, best_distance, best_at = members[i], member_rating, distance, member_at
+                end
+            end
+        end
+        if #members < 64 then
+            return best, best_rating, best_distance, best_at
+        end
+        offset = offset + 32
+    end
+end
+
+local function find(user, rating, enqueued_at)
+    local gap = allowed_gap(enqueued_at)
+    local below, below_rating, below_distance, below_at = scan(user, rating, gap, true)
+    local above, above_rating, above_distance, above_at = scan(user, rating, gap, false)
+    if above and (not below or above_distance < below_distance
+            or (above_distance == below_distance and above_at < below_at)) then
+        return above, above_rating, above_at
+    end
+    return below, below_rating, below_at
+end
+
+local function pair(user, best)
+    redis.call('ZREM', KEYS[1], user, best)
+    redis.call('HDEL', KEYS[2], user, best)
+end
+"""
+
+# ARGV[5]: user_id, ARGV[6]: rating
+ENQUEUE_SCRIPT = FIND_FUNCTIONS + """
+local user = ARGV[5]
+local rating = tonumber(ARGV[6])
+local enqueued_at = redis.call('HGET', KEYS[2], user)
+if enqueued_at then
+    rating = tonumber(redis.call('ZSCORE', KEYS[1], user))
+    enqueued_at = tonumber(enqueued_at)
+else
+    enqueued_at = now
+end
+
+local best, best_rating, best_at = find(user, rating, enqueued_at)
+if best then
+    pair(user, best)
+    return {1, tostring(rating), tostring(enqueued_at), best, tostring(best_rating), tostring(best_at)}
+end
+redis.call('ZADD', KEYS[1], rating, user)
+redis.call('HSET', KEYS[2], user, tostring(enqueued_at))
+return {0}
+"""
+
+# 오래 기다린 대기자부터 다시 짝짓기 (6개씩: 대기자 id, 점수, 대기 시각, 상대 id, 점수, 대기 시각)
+SWEEP_SCRIPT = FIND_FUNCTIONS + """
+local entries = redis.call('HGETALL', KEYS[2])
+local tickets = {}
+for i = 1, #entries, 2 do
+    tickets[#tickets + 1] = {entries[i], tonumber(entries[i + 1])}
+end
+table.sort(tickets, function(a, b) return a[2] < b[2] end)
+
+local result = {}
+for _, ticket in ipairs(tickets) do
+    local rating = redis.call('ZSCORE', KEYS[1], ticket[1])
+    if rating then
+        local best, best_rating, best_at = find(ticket[1], tonumber(rating), ticket[2])
+        if best then
+            pair(ticket[1], best)
+            for _, value in ipairs({ticket[1], rating, tostring(ticket[2]), best, tostring(best_rating), tostring(best_at)}) do
+                result[#result + 1] = value
+            end
+        end
+    end
+end
+return result
+"""
+
+# 짝지은 뒤 Match 저장에 실패했을 때 원래 점수와 대기 시각으로 되돌림
+REQUEUE_SCRIPT = """
+if redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[3]) == 1 then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+end
+return 1
+"""
+
+
+def get_matchmaking_setting(name):
+    return settings.GAME_MATCHMAKING[name]
+
+
+def allowed_gap(waited_seconds):
+    """대기 시간에 따른 허용 점수 차이"""
+    return min(
+        get_matchmaking_setting('BASE_GAP') + get_matchmaking_setting('GAP_PER_SECOND') * max(waited_seconds, 0),
+        get_matchmaking_setting('MAX_GAP'),
+    )
+
+
+class RedisMatchmaker:
+    def __init__(self, client, key):
+        self.client = client
+        self.ratings_key = f'{key}:ratings'
+        self.enqueued_key = f'{key}:enqueued_at'
+        self._enqueue = client.register_script(ENQUEUE_SCRIPT)
+        self._requeue = client.register_script(REQUEUE_SCRIPT)
+        self._sweep = client.register_script(SWEEP_SCRIPT)
+
+    def _args(self, now, *args):
+        return [
+            get_matchmaking_setting('BASE_GAP'), get_matchmaking_setting('GAP_PER_SECOND'),
+            get_matchmaking_setting('MAX_GAP'), repr(now), *args,
+        ]
+
+    @staticmethod
+    def _pairing(values, now):
+        user_id, rating, enqueued_at, opponent_id, opponent_rating, opponent_at = values
+        return Pairing(
+            Ticket(int(user_id), int(float(rating)), float(enqueued_at)),
+            Ticket(int(opponent_id), int(float(opponent_rating)), float(opponent_at)),
+            now,
+        )
+
+    def enqueue(self, user_id, rating, now=None):
+        now = time.time() if now is None else now
+        result = self._enqueue(keys=[self.ratings_key, self.enqueued_key], args=self._args(now, user_id, rating))
+        if result[0] == 0:
+            return None
+        return self._pairing([user_id, *result[1:]], now)
+
+    def sweep(self, now=None):
+        """대기 중인 유저끼리 넓어진 허용 범위로 다시 짝짓기 (오래 기다린 유저부터) :return: Pairing 목록"""
+        now = time.time() if now is None else now
+        result = self._sweep(keys=[self.ratings_key, self.enqueued_key], args=self._args(now))
+        return [self._pairing(result[i:i + 6], now) for i in range(0, len(result), 6)]
+
+    def requeue(self, ticket):
+        self._requeue(keys=[self.ratings_key, self.enqueued_key],
+                      args=[ticket.user_id, ticket.rating, repr(ticket.enqueued_at)])
+
+    def cancel(self, user_id):
+        """:return: 대기 중이었으면 True"""
+        pipeline = self.client.pipeline()
+        pipeline.zrem(self.ratings_key, user_id)
+        pipeline.hdel(self.enqueued_key, user_id)
+        return bool(pipeline.execute()[0])
+
+    def is_waiting(self, user_id):
+        return self.client.zscore(self.ratings_key, user_id) is not None
+
+    def size(self):
+        return self.client.zcard(self.ratings_key)
+
+    def clear(self):
+        self.client.delete(self.ratings_key, self.enqueued_key)
+
+
+class LocalMatchmaker:
+    """프로세스 내 대기열 (여러 프로세스로 서버를 띄우면 프로세스마다 대기열이 나뉨)"""
+
+    def __init__(self):
+        self._index = []     # (rating, user_id) 정렬 리스트
+        self._tickets = {}   # user_id -> Ticket
+        self._lock = threading.Lock()
+
+    def enqueue(self, user_id, rating, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            ticket = self._tickets.get(user_id) or Ticket(user_id, rating, now)
+            opponent = self._nearest(ticket, now)
+            if opponent is None:
+                if user_id not in self._tickets:
+                    self._tickets[user_id] = ticket
+                    insort(self._index, (ticket.rating, user_id))
+                return None
+            self._remove(opponent.user_id)
+            self._remove(user_id)
+            return Pairing(ticket, opponent, now)
+
+    def _nearest(self, ticket, now):
+        """
+        둘 중 한 명의 허용 범위 안에서 점수가 가장 가까운 대기자 (같으면 오래 기다린 쪽)
+        바로 옆 이웃이 범위 밖이어도 더 멀리 있는 오래 기다린 대기자의 범위 안일 수 있으므로 MAX_GAP까지 바깥으로 훑는다.
+        """
+        gap = allowed_gap(now - ticket.enqueued_at)
+        position = bisect_left(self._index, (ticket.rating, ticket.user_id))
+        right = position
+        if right < len(self._index) and self._index[right][1] == ticket.user_id:
+            right += 1
+        candidates = [
+            other for other in (
+                self._scan(ticket, gap, now, range(position - 1, -1, -1)),
+                self._scan(ticket, gap, now, range(right, len(self._index))),
+            ) if other is not None
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda other: (abs(other.rating - ticket.rating), other.enqueued_at))
+
+    def _scan(self, ticket, gap, now, positions):
+        """점수가 가까운 순으로 한쪽 방향을 훑어 허용 범위 안인 첫 대기자 (차이가 같으면 오래 기다린 쪽)"""
+        max_gap = get_matchmaking_setting('MAX_GAP')
+        best = None
+        for position in positions:
+            other = self._tickets[self._index[position][1]]
+            distance = abs(other.rating - ticket.rating)
+            if distance > max_gap or (best is not None and distance > abs(best.rating - ticket.rating)):
+                break
+            if distance <= max(gap, allowed_gap(now - other.enqueued_at)) and (
+                    best is None or other.enqueued_at < best.enqueued_at):
+                best = other
+        return best
+
+    def sweep(self, now=None):
+        """대기 중인 유저끼리 넓어진 허용 범위로 다시 짝짓기 (오래 기다린 유저부터) :return: Pairing 목록"""
+        now = time.time() if now is None else now
+        pairings = []
+        with self._lock:
+            for ticket in sorted(self._tickets.values(), key=lambda waiting: waiting.enqueued_at):
+                if ticket.user_id not in self._tickets:
+                    continue
+                opponent = self._nearest(ticket, now)
+                if opponent is not None:
+                    self._remove(opponent.user_id)
+                    self._remove(ticket.user_id)
+                    pairings.append(Pairing(ticket, opponent, now))
+        return pairings
+
+    def _remove(self, user_id):
+        ticket = self._tickets.pop(user_id, None)
+        if ticket is not None:
+            del self._index[bisect_left(self._index, (ticket.rating, user_id))]
+        return ticket is not None
+
+    def requeue(self, ticket):
+        with self._lock:
+            if ticket.user_id not in self._tickets:
+                self._tickets[ticket.user_id] = ticket
+                insort(self._index, (ticket.rating, ticket.user_id))
+
+    def cancel(self, user_id):
+        with self._lock:
+            return self._remove(user_id)
+
+    def is_waiting(self, user_id):
+        return user_id in self._tickets
+
+    def size(self):
+        return len(self._tickets)
+
+    def clear(self):
+        with self._lock:
+            self._index.clear()
+            self._tickets.clear()
+
+
+_matchmaker = None
+_matchmaker_lock = threading.Lock()
+
+
+def connect_redis():
+    """매칭용 Redis 연결 (사용할 수 없으면 None)"""
+    url = get_matchmaking_setting('REDIS_URL')
+    if not url:
+        return None
+    try:
+        client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=1, decode_responses=True)
+        client.ping()
+        return client
+    except redis.RedisError as e:
+        logger.warning(f"Redis 매칭 대기열을 사용할 수 없어 프로세스 내 대기열로 대체합니다: {e}")
+        return None
+
+
+def get_matchmaker():
+    """프로세스 전역 매칭 엔진 (Redis 우선, 실패 시 LocalMatchmaker)"""
+    global _matchmaker
+    if _matchmaker is None:
+        with _matchmaker_lock:
+            if _matchmaker is None:
+                client = connect_redis()
+                if client is not None:
+                    _matchmaker = RedisMatchmaker(client, get_matchmaking_setting('KEY'))
+                else:
+                    _matchmaker = LocalMatchmaker()
+    return _matchmaker
+
+
+def reset_matchmaker():
+    """설정 변경 후(테스트 등) 엔진을 다시 만들도록 초기화"""
+    global _matchmaker
+    _matchmaker = None
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_matchqueue_match'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='rating_gap',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='wait_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_match_fairness_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='difficulty',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -7,6 +7,8 @@ User = get_user_model()
 class Problem(models.Model):
     question = models.TextField()
     answer = models.CharField(max_length=255)
+    # 난이도 (비워 두면 난이도별 선택에서 제외되고 전체 선택에만 포함, game.problems)
+    difficulty = models.PositiveSmallIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"Problem {self.id}"
@@ -28,6 +30,10 @@ class Match(models.Model):
     ]
     status = models.CharField(max_length=10, choices=MATCH_STATUS_CHOICES, default='ongoing')
 
+    # 매칭 공정성 지표 (game.matchmaking으로 짝지어진 매치만)
+    rating_gap = models.IntegerField(null=True, blank=True)     # 두 유저의 랭크 점수 차이
+    wait_seconds = models.FloatField(null=True, blank=True)     # 더 오래 기다린 유저의 대기 시간
+
     def __str__(self):
         w = self.winner.username if self.winner else "No winner"
         return f"Match {self.id}: {self.player1.username} vs {self.player2.username} (Winner: {w}, Status: {self.status})"
@@ -35,8 +41,9 @@ class Match(models.Model):
 
 class MatchQueue(models.Model):
     """
-    매칭 대기열: 유저가 매칭을 누르면 이 테이블에 등록.
-    두 명이 매칭되면, 양쪽 대기열을 제거하고 Match를 생성.
+    (이전) 매칭 대기열 테이블
+    대기열은 이제 game.matchmaking이 관리하고 두 명이 짝지어졌을 때만 Match를 저장하므로 MatchQueueView는 이 테이블을 쓰지 않는다.
+    benchmark_matchmaking --legacy가 기존 방식과 비교할 때 임시 DB에서 사용하므로 모델은 남겨 둔다.
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,141 @@
+# game/problems.py
+"""
+매치 문제 선택
+
+Problem.objects.order_by('?').first()는 매치를 만들 때마다 문제 테이블 전체를 무작위 정렬한다.
+문제 id 배열을 캐시에 한 번 만들어 두고 무작위 위치 하나를 고르므로 문제 수와 관계없이 O(1)이다.
+
+- 문제가 추가/수정/삭제되면(game.signals) bump_version()으로 버전을 올려 배열을 다시 만든다.
+  프로세스마다 현재 버전의 배열을 메모리에 들고 있어 선택마다 캐시 조회는 버전 1번뿐이다.
+- 두 유저가 최근 RECENT_LIMIT개 안에 푼 문제는 피한다. (PICK_ATTEMPTS개를 뽑아 모두 본 문제면 그대로 사용)
+- 뽑은 후보가 아직 있는지 pk__in 쿼리 한 번으로 확인하고, 삭제된 문제가 섞여 있으면 배열을 다시 만든다.
+  (공유 캐시가 아니면 다른 프로세스의 삭제로 올린 버전이 보이지 않아 배열이 DB보다 오래될 수 있음)
+- 난이도(Problem.difficulty)가 있으면 두 유저의 평균 랭크 점수로 난이도를 정하고 그 난이도 안에서 고른다.
+  해당 난이도의 문제가 없으면 전체에서 고른다.
+
+여러 프로세스가 같은 버전과 최근 문제 기록을 보려면 CACHES가 Redis 같은 공유 캐시여야 한다.
+"""
+import logging
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from game.models import Problem
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'game:problems:version'
+ALL = 'all'
+
+_pool = (None, None)
+_pool_lock = threading.Lock()
+
+
+def get_problem_setting(name):
+    return settings.GAME_PROBLEMS[name]
+
+
+def bump_version():
+    """문제 목록이 바뀌었음을 알림 (다음 선택부터 id 배열을 다시 만듦)"""
+    version = time.time_ns()
+    cache.set(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def build_pool():
+    """{ALL: 전체 id, 난이도: 해당 난이도 id} (array라 문제 10만 개도 1MB 미만)"""
+    pool = {ALL: array('q')}
+    for problem_id, difficulty in Problem.objects.order_by('id').values_list('id', 'difficulty').iterator():
+        pool[ALL].append(problem_id)
+        if difficulty is not None:
+            pool.setdefault(difficulty, array('q')).append(problem_id)
+    return pool
+
+
+def get_pool():
+    """현재 버전의 id 배열 (프로세스 메모리 → 공유 캐시 → DB 순으로 찾음)"""
+    global _pool
+    version = get_version()
+    cached_version, pool = _pool
+    if cached_version == version:
+        return pool
+
+    with _pool_lock:
+        cached_version, pool = _pool
+        if cached_version != version:
+            key = f'game:problems:{version}'
+            pool = cache.get(key)
+            if pool is None:
+                pool = build_pool()
+                cache.set(key, pool, timeout=get_problem_setting('POOL_TIMEOUT'))
+            _pool = (version, pool)
+    return pool
+
+
+def difficulty_for_rating(rating):
+    """랭크 점수에 맞는 난이도 (DIFFICULTY_BY_RATING이 비어 있으면 None)"""
+    for min_rating, difficulty in get_problem_setting('DIFFICULTY_BY_RATING'):
+        if rating >= min_rating:
+            return difficulty
+    return None
+
+
+def seen_key(user_id):
+    return f'game:problems:seen:{user_id}'
+
+
+def recently_seen(user_ids):
+    """유저들이 최근 RECENT_LIMIT개 안에 받은 문제 id"""
+    seen = set()
+    for problem_ids in cache.get_many([seen_key(user_id) for user_id in user_ids]).values():
+        seen.update(problem_ids)
+    return seen
+
+
+def record_seen(user_ids, problem_id):
+    limit = get_problem_setting('RECENT_LIMIT')
+    current = cache.get_many([seen_key(user_id) for user_id in user_ids])
+    cache.set_many({
+        seen_key(user_id): [*current.get(seen_key(user_id), []), problem_id][-limit:]
+        for user_id in user_ids
+    }, timeout=get_problem_setting('SEEN_TIMEOUT'))
+
+
+def pick_problem(user_ids, difficulty=None, rng=random, rebuild=True):
+    """
+    매치에 낼 문제 id를 고르고 유저들의 최근 문제에 기록
+    :param rebuild: 삭제된 문제를 뽑았을 때 배열을 다시 만들어 한 번 더 고를지
+    :return: 문제 id (문제가 하나도 없으면 None)
+    """
+    pool = get_pool()
+    problem_ids = pool.get(difficulty) or pool[ALL]
+    if not problem_ids:
+        return None
+
+    candidates = [problem_ids[rng.randrange(len(problem_ids))] for _ in range(get_problem_setting('PICK_ATTEMPTS'))]
+    existing = set(Problem.objects.filter(pk__in=candidates).values_list('pk', flat=True))
+    if len(existing) < len(set(candidates)):
+        logger.info("삭제된 문제가 id 배열에 남아 있어 배열을 다시 만듭니다.")
+        bump_version()
+        if rebuild:
+            return pick_problem(user_ids, difficulty, rng, rebuild=False)
+    candidates = [problem_id for problem_id in candidates if problem_id in existing]
+    if not candidates:
+        return None
+
+    seen = recently_seen(user_ids)
+    problem_id = next((problem_id for problem_id in candidates if problem_id not in seen), candidates[0])
+    record_seen(user_ids, problem_id)
+    return problem_id
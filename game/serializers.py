@@ -9,7 +9,7 @@ User = get_user_model()
 class ProblemSerializer(serializers.ModelSerializer):
     class Meta:
         model = Problem
-        fields = ['id', 'question', 'answer']
+        fields = ['id', 'question', 'answer', 'difficulty']
         # answer는 노출하지 않음
         
 class UserDetailSerializer(serializers.ModelSerializer):
@@ -26,5 +26,6 @@ class MatchSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Match
-        fields = ['id', 'player1', 'player2', 'problem', 'winner', 'started_at', 'ended_at', 'status']
-        read_only_fields = ['winner', 'started_at', 'ended_at']
+        fields = ['id', 'player1', 'player2', 'problem', 'winner', 'started_at', 'ended_at', 'status',
+                  'rating_gap', 'wait_seconds']
+        read_only_fields = ['winner', 'started_at', 'ended_at', 'rating_gap', 'wait_seconds']
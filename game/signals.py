@@ -0,0 +1,13 @@
+# game/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import problems
+from .models import Problem
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def invalidate_problem_pool(sender, **kwargs):
+    # 문제 선택용 id 배열을 다시 만들도록 버전을 올림
+    problems.bump_version()
@@ -0,0 +1,27 @@
+import logging
+
+from celery import shared_task
+
+from game.matches import create_match
+from game.matchmaking import get_matchmaker
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def sweep_matchmaking():
+    """
+    대기 중인 유저끼리 넓어진 허용 범위로 다시 짝지어 매치 생성 (celery beat, GAME_MATCHMAKING['SWEEP_SECONDS']마다)
+    대기자는 /queue/를 다시 요청하지 않아도 이벤트 스트림으로 matched를 받는다.
+    프로세스 내 대기열(LocalMatchmaker)은 작업 프로세스와 공유되지 않으므로 Redis 대기열에서만 의미가 있다.
+    :return: 만든 매치 수
+    """
+    matchmaker = get_matchmaker()
+    created = 0
+    for pairing in matchmaker.sweep():
+        try:
+            create_match(matchmaker, pairing)
+            created += 1
+        except Exception:
+            logger.exception(f"대기자 {pairing.ticket.user_id}, {pairing.opponent.user_id}의 매치를 만들지 못했습니다.")
+    return created
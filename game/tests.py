@@ -1,3 +1,283 @@
-from django.test import TestCase
+import threading
+import time
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from game import events, matchmaking, problems
+from game.matchmaking import LocalMatchmaker, Ticket
+from accounts.models import Profile
+from game.models import Match, MatchQueue, Problem
+from game.tasks import sweep_matchmaking
+from game.views import MatchAnswerView
+
+User = get_user_model()
+
+
+class LocalMatchmakerTests(TestCase):
+    def test_concurrent_enqueue_pairs_each_player_once(self):
+        matchmaker = LocalMatchmaker()
+        barrier = threading.Barrier(200)
+        pairs = []
+
+        def worker(user_id):
+            barrier.wait()
+            pairing = matchmaker.enqueue(user_id, 1000 + user_id % 7)
+            if pairing is not None:
+                pairs.append((pairing.opponent.user_id, user_id))
+
+        threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(200)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        players = [player for pair in pairs for player in pair]
+        self.assertEqual(len(pairs), 100)
+        self.assertEqual(len(set(players)), 200)
+        self.assertEqual(matchmaker.size(), 0)
+
+    def test_gap_widens_while_waiting(self):
+        matchmaker = LocalMatchmaker()
+        self.assertIsNone(matchmaker.enqueue(1, 1000, now=0.0))
+        self.assertIsNone(matchmaker.enqueue(2, 1200, now=0.0))
+        self.assertIsNone(matchmaker.enqueue(3, 1080, now=0.0))
+        # 다시 요청해도 처음 등록한 점수와 시각 기준 (허용 차이 50 + 10 × 2초 = 70)
+        self.assertIsNone(matchmaker.enqueue(1, 0, now=2.0))
+
+        pairing = matchmaker.enqueue(1, 1000, now=3.0)
+        self.assertEqual((pairing.opponent.user_id, pairing.rating_gap, pairing.wait_seconds), (3, 80, 3.0))
+        self.assertTrue(matchmaker.cancel(2))
+        self.assertFalse(matchmaker.cancel(2))
+
+        matchmaker.requeue(pairing.opponent)
+        self.assertEqual(matchmaker.enqueue(4, 1090, now=3.0).opponent, pairing.opponent)
+
+    def test_far_waiting_player_and_sweep(self):
+        matchmaker = LocalMatchmaker()
+        self.assertIsNone(matchmaker.enqueue(1, 1000, now=0.0))
+        matchmaker.requeue(Ticket(2, 1250, 28.0))
+        # 바로 옆 2번(차이 90, 허용 70)은 범위 밖이어도 더 멀리서 30초 기다린 1번(허용 350)의 범위 안
+        pairing = matchmaker.enqueue(3, 1340, now=30.0)
+        self.assertEqual((pairing.opponent.user_id, pairing.rating_gap), (1, 340))
+
+        # 새 유저가 들어오지 않아도 sweep이 넓어진 범위로 대기자끼리 짝지음
+        self.assertIsNone(matchmaker.enqueue(4, 1500, now=30.0))
+        self.assertEqual(matchmaker.sweep(now=31.0), [])
+        [pairing] = matchmaker.sweep(now=48.0)
+        self.assertEqual((pairing.ticket.user_id, pairing.opponent.user_id, pairing.wait_seconds), (2, 4, 20.0))
+        self.assertEqual(matchmaker.size(), 0)
+
+
+class MatchQueueViewTests(TestCase):
+    def setUp(self):
+        matchmaking._matchmaker = LocalMatchmaker()
+        self.addCleanup(matchmaking.reset_matchmaker)
+        Problem.objects.create(question='1 + 1 = ?', answer='2')
+        self.users = [User.objects.create_user(username=f'player{i}', password='pw') for i in range(3)]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_match_is_saved_only_when_a_pair_forms(self):
+        first, second, third = (self.client_for(user) for user in self.users)
+
+        response = first.post('/api/v1/game/queue/')
+        self.assertFalse(response.json()['matched'])
+        self.assertEqual(first.post('/api/v1/game/queue/').json()['detail'], '대기 중입니다.')
+        self.assertFalse(Match.objects.exists())
+        self.assertFalse(MatchQueue.objects.exists())
+
+        response = second.post('/api/v1/game/queue/')
+        self.assertEqual(response.status_code, 201)
+        match = Match.objects.get()
+        self.assertEqual((match.player1, match.player2), (self.users[0], self.users[1]))
+        self.assertEqual(match.rating_gap, 0)
+        self.assertIsNotNone(match.wait_seconds)
+
+        # 대기하던 유저는 다시 요청해 진행 중인 매치를 받음
+        self.assertEqual(first.post('/api/v1/game/queue/').json()['match']['id'], match.id)
+
+        third.post('/api/v1/game/queue/')
+        self.assertEqual(third.delete('/api/v1/game/queue/').status_code, 200)
+        self.assertEqual(third.delete('/api/v1/game/queue/').status_code, 400)
+
+    def test_sweep_creates_matches_for_waiting_players(self):
+        Profile.objects.filter(user=self.users[1]).update(rank_score=300)
+        for user in self.users[:2]:
+            self.client_for(user).post('/api/v1/game/queue/')
+        self.assertEqual(sweep_matchmaking(), 0)
+
+        # 30초 기다리면 허용 차이가 350으로 넓어져 다시 요청하지 않아도 짝지어짐
+        matchmaker = matchmaking.get_matchmaker()
+        for user_id, rating in [(self.users[0].id, 0), (self.users[1].id, 300)]:
+            matchmaker.cancel(user_id)
+            matchmaker.requeue(Ticket(user_id, rating, time.time() - 30))
+        self.assertEqual(sweep_matchmaking(), 1)
+        match = Match.objects.get()
+        self.assertEqual({match.player1_id, match.player2_id}, {self.users[0].id, self.users[1].id})
+        self.assertEqual(match.rating_gap, 300)
+        self.assertEqual(matchmaker.size(), 0)
+
+
+class ProblemSelectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_recent_problems_are_not_repeated(self):
+        Problem.objects.bulk_create(Problem(question=str(i), answer=str(i), difficulty=1) for i in range(200))
+        problems.bump_version()
+        limit = problems.get_problem_setting('RECENT_LIMIT')
+
+        # id 배열은 처음 한 번만 만들고, 선택마다 후보가 남아 있는지 한 번 확인
+        with self.assertNumQueries(1 + limit):
+            picked = [problems.pick_problem([1, 2]) for _ in range(limit)]
+        self.assertEqual(len(set(picked)), limit)
+        # 한 명만 같아도 그 유저가 본 문제는 피함
+        self.assertNotIn(problems.pick_problem([2, 3]), picked)
+
+    def test_pool_follows_problem_changes_and_difficulty(self):
+        self.assertIsNone(problems.pick_problem([1, 2]))
+        easy = Problem.objects.create(question='1 + 1 = ?', answer='2', difficulty=1)
+        hard = Problem.objects.create(question='적분', answer='0', difficulty=3)
+        self.assertEqual(problems.pick_problem([1, 2], problems.difficulty_for_rating(1500)), hard.id)
+        self.assertEqual(problems.pick_problem([1, 2], problems.difficulty_for_rating(0)), easy.id)
+        # 해당 난이도 문제가 없으면 전체에서 고름
+        self.assertIn(problems.pick_problem([1, 2], problems.difficulty_for_rating(1100)), [easy.id, hard.id])
+
+        hard.delete()
+        self.assertEqual(problems.pick_problem([3, 4], 3), easy.id)
+
+    def test_stale_pool_skips_deleted_problems(self):
+        problem_ids = [problem.id for problem in Problem.objects.bulk_create(
+            Problem(question=str(i), answer=str(i)) for i in range(3)
+        )]
+        version = problems.bump_version()
+        problems.get_pool()
+        # 다른 프로세스에서 지워 이 프로세스의 캐시에는 버전이 그대로인 경우
+        Problem.objects.filter(id__in=problem_ids[1:]).delete()
+        cache.set(problems.VERSION_KEY, version, timeout=None)
+        self.assertEqual({problems.pick_problem([5, 6]) for _ in range(10)}, {problem_ids[0]})
+        self.assertEqual(list(problems.get_pool()[problems.ALL]), problem_ids[:1])
+
+
+class MatchAnswerTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.users = [User.objects.create_user(username=f'player{i}', password='pw') for i in range(2)]
+        Profile.objects.filter(user=self.users[1]).update(rank_score=10)
+        self.match = Match.objects.create(
+            player1=self.users[0], player2=self.users[1],
+            problem=Problem.objects.create(question='1 + 1 = ?', answer=' Two '),
+        )
+        self.path = f'/api/v1/game/matches/{self.match.id}/answer/'
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_correct_answer_query_count(self):
+        first = self.client_for(self.users[0])
+        self.assertEqual(first.post(self.path, {'answer': 'one'}).json()['detail'], '틀렸습니다.')
+        # 정답은 캐시에서 확인하고 매치 UPDATE 1번 + 프로필 UPDATE 2번 (+ 트랜잭션)
+        with self.assertNumQueries(5):
+            response = first.post(self.path, {'answer': 'two'})
+        self.assertEqual(response.json()['winner'], 'player0')
+
+        scores = dict(Profile.objects.values_list('user__username', 'rank_score'))
+        self.assertEqual(scores, {'player0': 20, 'player1': 0})
+        self.assertEqual(
+            self.client_for(self.users[1]).post(self.path, {'answer': 'two'}).json()['detail'], '이미 승자가 결정되었습니다.'
+        )
+
+    def test_simultaneous_correct_answers_have_one_winner(self):
+        barrier = threading.Barrier(2)
+        details = []
+
+        def submit(user):
+            barrier.wait()
+            try:
+                # 테스트용 메모리 SQLite는 잠금을 기다리지 않으므로 파일 DB의 busy timeout처럼 다시 시도
+                for _ in range(50):
+                    # 테스트 클라이언트는 다른 스레드의 요청 예외까지 받아 오므로 뷰를 직접 호출
+                    request = APIRequestFactory().post(self.path, {'answer': 'two'}, format='json')
+                    force_authenticate(request, user)
+                    try:
+                        details.append(MatchAnswerView.as_view()(request, match_id=self.match.id).data['detail'])
+                        return
+                    except OperationalError:
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertCountEqual(details, ['정답! 승리했습니다.', '이미 승자가 결정되었습니다.'])
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, 'finished')
+        profiles = Profile.objects.order_by('user_id')
+        self.assertEqual(sorted(profile.win_count for profile in profiles), [0, 1])
+        self.assertEqual(sum(profile.lose_count for profile in profiles), 1)
+
+
+@override_settings(GAME_EVENTS={**settings.GAME_EVENTS, 'BACKEND': 'memory', 'KEEPALIVE_SECONDS': 0.05})
+class MatchEventStreamTests(TestCase):
+    def setUp(self):
+        matchmaking._matchmaker = LocalMatchmaker()
+        self.addCleanup(matchmaking.reset_matchmaker)
+        events.reset_channel_layer()
+        self.addCleanup(events.reset_channel_layer)
+        self.users = [User.objects.create_user(username=f'player{i}', password='pw') for i in range(2)]
+
+    def post_as(self, user, path, data=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post(path, data, format='json')
+
+    async def test_waiting_player_is_pushed_match_events(self):
+        await self.async_client.aforce_login(self.users[0])
+        response = await self.async_client.get('/api/v1/game/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertEqual(await anext(stream), b': keepalive\n\n')
+
+        await sync_to_async(self.post_as)(self.users[0], '/api/v1/game/queue/')
+        response = await sync_to_async(self.post_as)(self.users[1], '/api/v1/game/queue/')
+        match_id = response.json()['match']['id']
+        message = await anext(stream)
+        self.assertTrue(message.startswith(b'event: matched\n'))
+        self.assertIn(f'"id": {match_id}'.encode(), message)
+
+        await sync_to_async(self.post_as)(self.users[1], f'/api/v1/game/matches/{match_id}/answer/', {'answer': 'x'})
+        self.assertTrue((await anext(stream)).startswith(b'event: opponent_answered\n'))
+        await sync_to_async(self.post_as)(self.users[1], f'/api/v1/game/matches/{match_id}/forfeit/')
+        self.assertTrue((await anext(stream)).startswith(b'event: match_finished\n'))
+        await stream.aclose()
+
+        # 스트림을 열기 전에 만들어진 진행 중인 매치는 연결 직후 전송
+        await sync_to_async(self.post_as)(self.users[0], '/api/v1/game/queue/')
+        match_id = (await sync_to_async(self.post_as)(self.users[1], '/api/v1/game/queue/')).json()['match']['id']
+        await self.async_client.aforce_login(self.users[1])
+        response = await self.async_client.get('/api/v1/game/events/')
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        message = await anext(stream)
+        self.assertTrue(message.startswith(b'event: matched\n'))
+        self.assertIn(f'"id": {match_id}'.encode(), message)
+        await stream.aclose()
@@ -5,7 +5,8 @@ from .views import (
     MatchDetailView,
     MatchAnswerView,
     MatchForfeitView,
-    MyMatchesView
+    MyMatchesView,
+    match_events,
 )
 
 urlpatterns = [
@@ -21,6 +22,9 @@ urlpatterns = [
     # 새로 만든 강제 종료/포기 엔드포인트
     path('matches/<int:match_id>/forfeit/', MatchForfeitView.as_view(), name='match_forfeit'),
     
-    path('my-matches/', MyMatchesView.as_view(), name='my-matches')
+    path('my-matches/', MyMatchesView.as_view(), name='my-matches'),
+
+    # 매칭/답안/매치 종료 이벤트 스트림 (SSE)
+    path('events/', match_events, name='match_events'),
     
 ]
@@ -1,26 +1,38 @@
-import time
-
 # game/views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Q
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
 
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
-from .models import MatchQueue, Match, Problem
+from . import answers, events
+from .matches import create_match
+from .matchmaking import get_matchmaker
+from .models import Match
 from .serializers import MatchSerializer
 from accounts.models import Profile  # Profile 모델 임포트
 
 # -----------------------------
-#  A. 매칭 대기열 처리 (MatchQueue)
+#  A. 매칭 대기열 처리 (game.matchmaking)
 # -----------------------------
 class MatchQueueView(APIView):
+    """
+    POST   /api/game/queue/ -> 대기 중인 유저가 있으면 바로 매치 생성, 없으면 대기열에 등록
+    DELETE /api/game/queue/ -> 대기 취소
+
+    대기열은 매칭 엔진(Redis 또는 프로세스 내)이 관리하고, 짝이 지어졌을 때만 Match 행을 저장한다.
+    랭크 점수가 비슷한 유저끼리 짝짓고, 오래 기다릴수록 허용 점수 차이가 넓어진다.
+    매칭 결과는 이벤트 스트림(GET /events/)의 matched로 받는다. 대기 중에 다시 요청하지 않아도
+    sweep 작업(game.tasks.sweep_matchmaking)이 넓어진 범위로 다시 짝짓는다. 같은 요청을 다시 보내면
+    바로 다시 찾거나 진행 중인 매치를 받아 간다.
+    """
     def post(self, request):
         user = request.user
         if not user.is_authenticated:
@@ -38,44 +50,34 @@ class MatchQueueView(APIView):
                     "match": MatchSerializer(ongoing_match).data
                 }, status=status.HTTP_201_CREATED)
 
-        # 2) 이미 대기열에 있는지 확인
-        existing_queue = MatchQueue.objects.filter(user=user).first()
-        if existing_queue:
-            if existing_queue.match:  # 매칭이 이미 연결되어 있는 상태(매치가 존재)라면
-                return Response({
-                    "detail": "매칭이 이미 완료되었거나 연결되었습니다.",
-                    "matched": True,
-                    "match": MatchSerializer(existing_queue.match).data
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({"detail": "이미 대기 중입니다.", "matched": False}, status=status.HTTP_400_BAD_REQUEST)
-
-        with transaction.atomic():
-            # 3) 다른 유저가 대기 중인지 확인
-            waiting = MatchQueue.objects.exclude(user=user).order_by('created_at').first()
-            if waiting:
-                # 매칭 생성
-                problem = Problem.objects.order_by('?').first()
-                match = Match.objects.create(
-                    player1=waiting.user,
-                    player2=user,
-                    problem=problem,
-                    status='ongoing'  # 매치 시작 시 상태를 ongoing으로 설정
-                )
-
-                # 대기열에서 제거
-                MatchQueue.objects.filter(user=waiting.user).delete()
-                MatchQueue.objects.filter(user=user).delete()
+        # 2) 점수가 비슷한 대기자를 꺼내 짝짓기 (찾기, 꺼내기, 등록이 엔진 안에서 원자적으로 처리됨)
+        matchmaker = get_matchmaker()
+        was_waiting = matchmaker.is_waiting(user.id)
+        rating = Profile.objects.filter(user=user).values_list('rank_score', flat=True).first() or 0
+        pairing = matchmaker.enqueue(user.id, rating)
+        if pairing is None:
+            # 3) 대기열에 추가하고 매칭을 기다림
+            if was_waiting:
+                return Response({"detail": "대기 중입니다.", "matched": False}, status=status.HTTP_200_OK)
+            return Response({"detail": "대기열에 등록되었습니다.", "matched": False}, status=status.HTTP_200_OK)
+
+        # 4) 매치 생성 (실패하면 두 유저를 원래 대기 시각으로 대기열에 되돌림)
+        # 대기하던 상대는 /queue/를 다시 요청하지 않고 이벤트 스트림으로 매칭을 받음
+        _, match_data = create_match(matchmaker, pairing, requeue_ticket=was_waiting)
+        return Response({
+            "detail": "매칭 완료",
+            "matched": True,
+            "match": match_data
+        }, status=status.HTTP_201_CREATED)
 
-                return Response({
-                    "detail": "매칭 완료",
-                    "matched": True,
-                    "match": MatchSerializer(match).data
-                }, status=status.HTTP_201_CREATED)
-            else:
-                # 4) 대기열에 추가하고 매칭을 기다림
-                MatchQueue.objects.create(user=user)
-                return Response({"detail": "대기열에 등록되었습니다.", "matched": False}, status=status.HTTP_200_OK)
+    def delete(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({"detail": "로그인 필요"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        if not get_matchmaker().cancel(user.id):
+            return Response({"detail": "대기 중이 아닙니다."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "대기를 취소했습니다."}, status=status.HTTP_200_OK)
 
 # -----------------------------
 #  B. 매치 상세 & 정답 제출
@@ -97,22 +99,20 @@ class MatchAnswerView(APIView):
 
     - winner가 이미 정해졌다면 -> "이미 끝났다" 메시지
     - 아직이라면 정답 검증 -> 맞으면 winner 설정
+    승자 확정과 랭크 점수 반영은 조건부 UPDATE로 처리해 동시에 정답을 내도 승자는 한 명 (game.answers)
     """
     def post(self, request, match_id):
         user = request.user
         if not user.is_authenticated:
             return Response({"detail": "로그인 필요"}, status=status.HTTP_200_OK)
 
-        match = get_object_or_404(Match, id=match_id)
-
-        if match.winner:
-            return Response({
-                "detail": "이미 승자가 결정되었습니다.",
-                "winner": match.winner.username
-            }, status=status.HTTP_200_OK)
+        entry = answers.get_match_answer(match_id)
+        if entry is None:
+            raise Http404
+        player1_id, player2_id, correct_answer = entry
 
         # 매치 플레이어인지 확인
-        if user not in [match.player1, match.player2]:
+        if user.id not in (player1_id, player2_id):
             return Response({"detail": "해당 매치에 속한 유저가 아닙니다."},
                             status=status.HTTP_200_OK)
 
@@ -121,42 +121,37 @@ class MatchAnswerView(APIView):
             return Response({"detail": "answer 필드가 필요합니다."},
                             status=status.HTTP_200_OK)
 
-        correct_answer = match.problem.answer if match.problem else None
-        if correct_answer and (str(answer).strip().lower() == str(correct_answer).strip().lower()):
-            # 정답 -> 승자 설정
-            match.winner = user
-            match.ended_at = timezone.now()
-            match.status = 'finished'
-            match.save()
-
-            try:
-                winner_profile = Profile.objects.get(user=user)  # 현재 정답 맞힌 유저의 프로필
-                winner_profile.rank_score += 20
-                winner_profile.win_count += 1
-                winner_profile.save()
-            except Profile.DoesNotExist:
-                return Response({"detail": "승자의 프로필이 존재하지 않습니다."}, status=status.HTTP_200_OK)
-
-            # 패배자의 프로필 업데이트
-            loser = match.player1 if user == match.player2 else match.player2  # 상대방 유저
-            try:
-                loser_profile = Profile.objects.get(user=loser)  # 패배자의 프로필
-                loser_profile.rank_score -= 20
-                if loser_profile.rank_score < 0:
-                    loser_profile.rank_score = 0
-                loser_profile.lose_count += 1
-                loser_profile.save()
-            except Profile.DoesNotExist:
-                return Response({"detail": "패배자의 프로필이 존재하지 않습니다."}, status=status.HTTP_200_OK)
-
+        opponent_id = player1_id if user.id == player2_id else player2_id
+        if correct_answer and answers.normalize_answer(answer) == correct_answer:
+            # 정답 -> 아직 승자가 없으면 승자로 확정하고 두 유저의 프로필 갱신
+            result = answers.resolve_win(match_id, user.id, opponent_id)
+            if result is not None:
+                events.publish_on_commit([player1_id, player2_id], events.MATCH_FINISHED, {
+                    "match_id": match_id, "status": 'finished', "winner": user.username
+                })
+                winner_updated, loser_updated = result
+                if not winner_updated:
+                    return Response({"detail": "승자의 프로필이 존재하지 않습니다."}, status=status.HTTP_200_OK)
+                if not loser_updated:
+                    return Response({"detail": "패배자의 프로필이 존재하지 않습니다."}, status=status.HTTP_200_OK)
+                return Response({
+                    "detail": "정답! 승리했습니다.",
+                    "winner": user.username
+                }, status=status.HTTP_200_OK)
 
+        match_status, winner = answers.match_result(match_id)
+        if winner:
             return Response({
-                "detail": "정답! 승리했습니다.",
-                "winner": user.username
+                "detail": "이미 승자가 결정되었습니다.",
+                "winner": winner
             }, status=status.HTTP_200_OK)
-        else:
-            # 오답
-            return Response({"detail": "틀렸습니다."}, status=status.HTTP_200_OK)
+        if match_status != 'ongoing':
+            return Response({"detail": f"이미 종료된 매치입니다. (status: {match_status})"},
+                            status=status.HTTP_200_OK)
+
+        # 오답 (상대에게 알림)
+        events.publish_on_commit([opponent_id], events.OPPONENT_ANSWERED, {"match_id": match_id})
+        return Response({"detail": "틀렸습니다."}, status=status.HTTP_200_OK)
 
 
 # game/views.py
@@ -187,6 +182,9 @@ class MatchForfeitView(APIView):
         match.status = 'forfeited'
         match.ended_at = timezone.now()
         match.save()
+        events.publish_on_commit([match.player1_id, match.player2_id], events.MATCH_FINISHED, {
+            "match_id": match.id, "status": match.status, "winner": None
+        })
 
         return Response({
             "detail": "매치가 강제 종료(포기)되었습니다.",
@@ -204,4 +202,37 @@ class MyMatchesView(APIView):
         # 현재 유저가 player1 또는 player2로 참가한 모든 매치를 가져옴
         my_matches = Match.objects.filter(Q(player1=user) | Q(player2=user)).order_by('-started_at')
         serializer = MatchSerializer(my_matches, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+#  C. 이벤트 스트림 (Server-Sent Events)
+# -----------------------------
+async def match_events(request):
+    """
+    GET /api/v1/game/events/
+      -> 로그인한 유저의 매칭/답안/매치 종료 이벤트 스트림 (text/event-stream)
+
+    /queue/ 재요청과 매치 상세 조회 polling 대신 사용. 연결 직후 진행 중인 매치가 있으면 matched를 먼저 보낸다.
+    DRF APIView는 비동기 스트리밍을 지원하지 않아 일반 async 뷰로 작성 (세션 인증)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "로그인 필요"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    @sync_to_async
+    def initial_events():
+        ongoing_match = Match.objects.filter(
+            Q(player1=user) | Q(player2=user),
+            status='ongoing'
+        ).first()
+        return [(events.MATCHED, MatchSerializer(ongoing_match).data)] if ongoing_match else []
+
+    response = StreamingHttpResponse(
+        events.event_stream(user.id, initial_events), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx가 스트림을 버퍼링하지 않도록
+    return response
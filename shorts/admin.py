@@ -1,7 +1,11 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Video, VideoStatsHistory
+from .models import DiscoveryQueryStats, IngestionLock, QuotaUsage, Video, VideoStatsHistory, VideoStatsRollup
 
 admin.site.register(Video)
-admin.site.register(VideoStatsHistory)
\ No newline at end of file
+admin.site.register(VideoStatsHistory)
+admin.site.register(VideoStatsRollup)
+admin.site.register(QuotaUsage)
+admin.site.register(IngestionLock)
+admin.site.register(DiscoveryQueryStats)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ShortsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shorts'
+
+    def ready(self):
+        # signals 임포트
+        import shorts.signals
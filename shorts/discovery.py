@@ -0,0 +1,160 @@
+# shorts/discovery.py
+"""
+새 영상 검색 계획 (여러 검색 동시 실행)
+
+settings.SHORTS_DISCOVERY['QUERIES']의 검색(지역/언어/키워드 조합)을 동시에 보내고,
+검색마다 nextPageToken을 따라 PAGES 페이지까지 읽는다.
+- 실행당 search.list 호출 수는 할당량 계획(QuotaPlan.searches) 이내
+- 누적 수율(검색 1회당 새 영상 수)이 높은 검색부터 호출 기회를 받고, 수율이 낮은 검색은 건너뜀
+- 모든 검색 결과를 합쳐 중복을 제거한 뒤에 통계를 조회 (shorts.ingestion.discover_videos)
+"""
+import asyncio
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from django.utils.timezone import now
+
+from shorts.models import DiscoveryQueryStats
+
+logger = logging.getLogger(__name__)
+
+# 모든 검색에 공통으로 들어가는 search.list 파라미터 (검색별 설정이 덮어씀)
+SEARCH_PARAMS = {
+    'part': "snippet",
+    'maxResults': 50,
+    'order': "date",
+    'type': "video",
+    'videoDuration': "short",
+}
+
+
+def get_discovery_setting(name):
+    return settings.SHORTS_DISCOVERY[name]
+
+
+class DiscoveryQuery:
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+
+    def search_params(self, page_token=None):
+        params = {**SEARCH_PARAMS, **self.params}
+        if page_token:
+            params['pageToken'] = page_token
+        return params
+
+    def __repr__(self):
+        return f"DiscoveryQuery({self.name!r})"
+
+
+class QueryResult:
+    """검색 하나의 이번 실행 결과"""
+
+    def __init__(self, query):
+        self.query = query
+        self.searches = 0
+        self.video_ids = []
+        self.new_videos = 0
+
+
+def load_queries():
+    """
+    이번 실행에서 보낼 검색 목록 (수율이 높은 순, 아직 충분히 검색하지 않은 검색이 가장 먼저)
+    """
+    stats = {row.name: row for row in DiscoveryQueryStats.objects.all()}
+    min_yield = get_discovery_setting('MIN_YIELD')
+    min_searches = get_discovery_setting('MIN_SEARCHES')
+
+    queries = []
+    for config in get_discovery_setting('QUERIES'):
+        params = dict(config)
+        query = DiscoveryQuery(params.pop('name'), params)
+        row = stats.get(query.name)
+        if row is not None and row.searches >= min_searches and row.new_per_search < min_yield:
+            logger.info(f"새 영상 수율이 낮아 검색을 건너뜁니다: {query.name} ({row.new_per_search:.2f}/검색)")
+            continue
+        explored = row is not None and row.searches >= min_searches
+        queries.append((explored, -(row.new_per_search or 0) if row else 0, query))
+
+    queries.sort(key=lambda entry: entry[:2])
+    return [query for _, _, query in queries]
+
+
+async def search_all(source, queries, max_searches=None, pages=None):
+    """
+    검색을 동시에 보내고 검색별로 페이지를 이어 읽음
+    호출 기회는 queries 순서대로 돌아가므로 할당량이 부족하면 앞쪽 검색이 먼저 쓴다.
+    :param max_searches: 이번 실행의 최대 search.list 호출 수 (None이면 제한 없음)
+    :return: QueryResult 리스트 (queries 순서)
+    """
+    pages = pages or get_discovery_setting('PAGES')
+    remaining = [len(queries) * pages if max_searches is None else max_searches]
+
+    async def run(query):
+        result = QueryResult(query)
+        page_token = None
+        for _ in range(pages):
+            if remaining[0] <= 0 or source.quota_exceeded:
+                break
+            remaining[0] -= 1
+            response = await source.search_list(**query.search_params(page_token))
+            result.searches += 1
+            if response is None:
+                break
+            result.video_ids += [
+                item['id']['videoId'] for item in response.get('items', []) if item['id'].get('videoId')
+            ]
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        return result
+
+    return await asyncio.gather(*(run(query) for query in queries))
+
+
+def merge_results(results):
+    """검색 결과를 합쳐 중복 제거 (먼저 나온 순서 유지)"""
+    return list(dict.fromkeys(video_id for result in results for video_id in result.video_ids))
+
+
+def record_results(results, known_video_ids):
+    """
+    검색별 수율을 누적 기록
+    결과 중 저장되지 않은 영상 수를 검색마다 센다. (여러 검색이 같은 새 영상을 찾으면 각자 센다)
+    """
+    at = now()
+    for result in results:
+        if not result.searches:
+            continue
+        result.new_videos = len({video_id for video_id in result.video_ids if video_id not in known_video_ids})
+        DiscoveryQueryStats.objects.get_or_create(name=result.query.name)
+        DiscoveryQueryStats.objects.filter(name=result.query.name).update(
+            searches=F('searches') + result.searches,
+            results=F('results') + len(result.video_ids),
+            new_videos=F('new_videos') + result.new_videos,
+            last_searched_at=at,
+        )
+        logger.info(f"검색 {result.query.name}: {result.searches}회, 결과 {len(result.video_ids)}개, "
+                    f"새 영상 {result.new_videos}개")
+
+
+def discovery_metrics():
+    """대시보드용 검색별 누적 수율"""
+    configured = {config['name'] for config in get_discovery_setting('QUERIES')}
+    return {
+        'queries': [
+            {
+                'name': row.name,
+                'configured': row.name in configured,
+                'searches': row.searches,
+                'results': row.results,
+                'new_videos': row.new_videos,
+                'new_per_search': row.new_per_search,
+                'last_searched_at': row.last_searched_at,
+            }
+            for row in DiscoveryQueryStats.objects.order_by('name')
+        ],
+        'min_yield': get_discovery_setting('MIN_YIELD'),
+        'min_searches': get_discovery_setting('MIN_SEARCHES'),
+    }
@@ -0,0 +1,129 @@
+# shorts/export.py
+"""
+통계 이력 대량 내보내기 (NDJSON / CSV, 선택적으로 gzip)
+
+행을 iterator(chunk_size)로 끊어 읽고 CHUNK_SIZE행씩 인코딩해 바로 흘려보내므로
+내보내는 행 수와 관계없이 메모리 사용량이 일정하다. (웹 응답은 StreamingHttpResponse)
+ASGI에서는 동기 iterator를 넘기면 Django가 응답 전체를 list로 모은 뒤 보내므로
+aiter_chunks로 조각을 하나씩 꺼내는 async iterator로 감싸서 넘긴다.
+- raw: 원본 VideoStatsHistory, hour/day: 압축 통계 VideoStatsRollup (shorts.rollups)
+- 영상(video_id 목록)과 기간 [start, end)로 거를 수 있음
+"""
+import csv
+import io
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from shorts.models import Video, VideoStatsHistory, VideoStatsRollup
+from shorts.rollups import DAY, HISTORY_FIELDS, HOUR, RAW
+
+RESOLUTIONS = [RAW, HOUR, DAY]
+
+# 형식별 Content-Type
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+COLUMNS = ['video_id', 'collected_at', *HISTORY_FIELDS]
+
+
+def get_export_setting(name):
+    return settings.STATS_EXPORT[name]
+
+
+def export_rows(resolution=RAW, video_ids=None, start=None, end=None):
+    """
+    내보낼 행을 시간 순으로 (video_id, 시각, 조회수, 좋아요, 트렌드 점수) 튜플로 하나씩 반환
+    """
+    if resolution == RAW:
+        queryset, time_field = VideoStatsHistory.objects.all(), 'collected_at'
+    else:
+        queryset, time_field = VideoStatsRollup.objects.filter(resolution=resolution), 'bucket_start'
+
+    if video_ids:
+        queryset = queryset.filter(video__in=Video.objects.filter(video_id__in=video_ids).values('pk'))
+    if start is not None:
+        queryset = queryset.filter(**{f'{time_field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{time_field}__lt': end})
+
+    return (
+        queryset
+        .order_by(time_field, 'pk')
+        .values_list('video__video_id', time_field, *HISTORY_FIELDS)
+        .iterator(chunk_size=get_export_setting('CHUNK_SIZE'))
+    )
+
+
+def iter_chunks(rows):
+    rows = iter(rows)
+    while chunk := list(islice(rows, get_export_setting('CHUNK_SIZE'))):
+        yield chunk
+
+
+def encode_ndjson(rows):
+    encoder = DjangoJSONEncoder()
+    for chunk in iter_chunks(rows):
+        yield ''.join(encoder.encode(dict(zip(COLUMNS, row))) + '\n' for row in chunk).encode()
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in iter_chunks(rows):
+        writer.writerows((video_id, at.isoformat(), *values) for video_id, at, *values in chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # 행이 없으면 헤더만
+        yield buffer.getvalue().encode()
+
+
+ENCODERS = {
+    'ndjson': encode_ndjson,
+    'csv': encode_csv,
+}
+
+
+def gzip_stream(chunks):
+    """바이트 조각을 이어서 gzip 압축 (조각마다 압축된 만큼만 내보냄)"""
+    compressor = zlib.compressobj(get_export_setting('GZIP_LEVEL'), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(export_format='ndjson', compress=False, **filters):
+    """
+    :param filters: export_rows의 resolution, video_ids, start, end
+    :return: 바이트 조각 iterator
+    """
+    chunks = ENCODERS[export_format](export_rows(**filters))
+    return gzip_stream(chunks) if compress else chunks
+
+
+def export_filename(export_format, compress):
+    return f"stats-history.{export_format}{'.gz' if compress else ''}"
+
+
+async def aiter_chunks(chunks):
+    """
+    동기 바이트 조각 iterator를 한 조각씩 스레드에서 꺼내는 async iterator (ASGI 응답용)
+    thread_sensitive라 요청의 동기 스레드에서 실행되므로 DB 커서도 같은 연결에서 이어서 읽는다.
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # 클라이언트가 끊으면 남은 쿼리를 닫음
+        if hasattr(chunks, 'close'):
+            await sync_to_async(chunks.close)()
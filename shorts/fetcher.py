@@ -0,0 +1,195 @@
+# shorts/fetcher.py
+"""
+유튜브 Data API 비동기 조회 계층
+
+하나의 keep-alive 커넥션 풀(httpx.AsyncClient)을 공유하면서
+최대 concurrency 개의 요청을 동시에 보내고, 응답이 끝나는 순서대로 결과를 흘려보낸다.
+429 / 403(rate limit) / 5xx 응답은 지수 백오프 후 재시도한다.
+
+커넥션 풀은 실행(이벤트 루프)마다 새로 열지만, 생성 비용의 대부분인 SSL 컨텍스트(인증서 번들 로드)는
+프로세스 전역으로 한 번만 만들어 모든 실행과 스레드(Celery 하위 작업)가 공유한다.
+"""
+import asyncio
+import logging
+import random
+import threading
+from collections import Counter
+
+import httpx
+from django.conf import settings
+
+from shorts.sources import StatsSource
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 403 에러 사유 (일시적인 호출 빈도 제한)
+RETRYABLE_403_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+# 일일 할당량 소진 사유: 재시도해도 소용없으므로 이번 실행의 남은 요청을 모두 중단
+QUOTA_EXCEEDED_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+_ssl_context = None
+_ssl_context_lock = threading.Lock()
+
+
+def get_ssl_context():
+    """
+    프로세스 전역 SSL 컨텍스트 (처음 호출할 때 한 번만 생성)
+    ssl.SSLContext는 여러 커넥션과 스레드에서 함께 써도 안전하다.
+    """
+    global _ssl_context
+    if _ssl_context is None:
+        with _ssl_context_lock:
+            if _ssl_context is None:
+                _ssl_context = httpx.create_ssl_context()
+    return _ssl_context
+
+
+class YouTubeAPIError(Exception):
+    def __init__(self, status_code, reason='', message=''):
+        self.status_code = status_code
+        self.reason = reason
+        super().__init__(f"{status_code} {reason}: {message}".strip())
+
+
+def parse_error(response):
+    """에러 응답 본문에서 (reason, message) 추출"""
+    try:
+        error = response.json().get('error', {})
+    except ValueError:
+        return '', response.text[:200]
+
+    errors = error.get('errors') or [{}]
+    return errors[0].get('reason', ''), error.get('message', '')
+
+
+class AsyncYouTubeFetcher(StatsSource):
+    """
+    실제 유튜브 Data API 소스
+    사용 예:
+        async with AsyncYouTubeFetcher(settings.YOUTUBE_DATA_API_KEY) as fetcher:
+            async for batch, items in fetcher.stream_videos_list(batches):
+                ...
+    """
+
+    def __init__(self, api_key, concurrency=None, base_url=None,
+                 max_retries=5, backoff_base=1.0, backoff_max=32.0, timeout=10.0):
+        self.api_key = api_key
+        self.concurrency = concurrency or settings.YOUTUBE_FETCH_CONCURRENCY
+        self.base_url = base_url or settings.YOUTUBE_API_BASE_URL
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.quota_exceeded = False
+        self.request_count = 0
+        self.retry_count = 0
+        self.error_count = 0
+        self._usage = Counter()
+
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            verify=get_ssl_context(),
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    metered = True
+
+    @property
+    def usage(self):
+        return dict(self._usage)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)  # jitter
+
+    async def get(self, resource, params):
+        """
+        GET {base_url}/{resource} 호출
+        동시에 진행 중인 요청은 semaphore로 concurrency 개까지만 허용
+        :raises YouTubeAPIError: 재시도 불가 에러이거나 재시도 횟수 초과
+        """
+        params = {**params, 'key': self.api_key}
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                # 대기하는 동안 다른 요청이 할당량 소진을 확인했을 수 있으므로 semaphore 획득 후 검사
+                if self.quota_exceeded:
+                    raise YouTubeAPIError(403, 'quotaExceeded', '이번 실행에서 이미 할당량이 소진되었습니다.')
+
+                self.request_count += 1
+                self._usage[f'{resource}.list'] += 1  # 실패한 요청도 할당량을 소모
+                try:
+                    response = await self._client.get(resource, params=params)
+                except httpx.TransportError as e:
+                    error = YouTubeAPIError(0, 'transportError', str(e))
+                    retry_after = None
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+
+                    reason, message = parse_error(response)
+                    error = YouTubeAPIError(response.status_code, reason, message)
+                    if reason in QUOTA_EXCEEDED_REASONS:
+                        self.quota_exceeded = True
+                        raise error
+                    if not self.is_retryable(response.status_code, reason):
+                        raise error
+                    retry_after = response.headers.get('Retry-After')
+                    retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+
+            # 대기하는 동안에는 semaphore를 반납해 다른 요청이 진행되도록 함
+            if attempt < self.max_retries:
+                self.retry_count += 1
+                delay = self.backoff_delay(attempt, retry_after)
+                logger.warning(f"유튜브 API 재시도 ({resource}, {error}), {delay:.1f}초 후")
+                await asyncio.sleep(delay)
+
+        raise error
+
+    @staticmethod
+    def is_retryable(status_code, reason):
+        if status_code == 429 or status_code >= 500:
+            return True
+        return status_code == 403 and reason in RETRYABLE_403_REASONS
+
+    async def videos_list(self, video_ids, part="statistics,snippet"):
+        """
+        videos.list 한 번 호출 (최대 50개 id)
+        :return: items 리스트 (에러 시 None)
+        """
+        try:
+            response = await self.get('videos', {'part': part, 'id': ",".join(video_ids)})
+        except YouTubeAPIError as e:
+            self.error_count += 1
+            logger.error(f"유튜브 API 호출 에러 (batch_ids: {video_ids}): {e}")
+            return None
+        return response.get('items', [])
+
+    async def search_list(self, **params):
+        """
+        search.list 한 번 호출
+        :return: 응답 dict (에러 시 None)
+        """
+        try:
+            return await self.get('search', params)
+        except YouTubeAPIError as e:
+            self.error_count += 1
+            logger.error(f"유튜브 API 검색 호출 에러: {e}")
+            return None
@@ -0,0 +1,131 @@
+# shorts/growth.py
+"""
+영상별 조회수/좋아요 성장 곡선
+
+이력을 요청한 단위(5m/1h/1d)의 구간으로 묶어 구간별 마지막 누적값과 직전 구간 대비 증가량을 계산한다.
+- 구간보다 촘촘한 해상도 중 가장 거친 압축 통계부터 shorts.rollups.load_history로 읽음
+  (아직 압축되지 않은 최근 구간은 원본 VideoStatsHistory로 채워짐)
+- 구간 묶기와 증가량 계산은 NumPy로 한 번에 처리
+- 구간 PAGE_BUCKETS개를 한 페이지로 묶어, 이미 끝난 페이지는 캐시에 저장
+  (끝난 구간의 값은 더 이상 바뀌지 않으므로 이력이 길어져도 DB에서는 마지막 페이지만 읽음)
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from shorts.rollups import BUCKET_SIZES, DAY, HOUR, RAW, load_history
+
+RESOLUTIONS = {
+    '5m': timedelta(minutes=5),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+
+
+def get_growth_setting(name):
+    return settings.GROWTH_CURVE[name]
+
+
+def to_epoch(at):
+    return int(at.timestamp())
+
+
+def from_epoch(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def floor_time(at, size):
+    """at이 속한 size 구간의 시작 시각 (UTC epoch 기준 정렬)"""
+    seconds = int(size.total_seconds())
+    return from_epoch(to_epoch(at) // seconds * seconds)
+
+
+def history_resolution(bucket_size):
+    """구간보다 촘촘한 해상도 중 가장 거친 해상도"""
+    for resolution in (DAY, HOUR):
+        if BUCKET_SIZES[resolution] <= bucket_size:
+            return resolution
+    return RAW
+
+
+def to_arrays(history):
+    """
+    load_history 결과 -> (epoch 초 배열, 조회수 배열, 좋아요 배열)
+    """
+    rows = np.array(
+        [(row['at'].timestamp(), row['view_count'], row['like_count']) for row in history], dtype=np.float64,
+    ).reshape(-1, 3)
+    return rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64), rows[:, 2].astype(np.int64)
+
+
+def bucketize(times, view_counts, like_counts, bucket_size):
+    """
+    시간 순 샘플을 구간으로 묶음 (누적값이므로 구간 최댓값 = 구간 마지막 값)
+    :return: [[구간 시작 epoch, 조회수, 좋아요], ...]
+    """
+    if not len(times):
+        return []
+    seconds = int(bucket_size.total_seconds())
+    bucket_ids = times // seconds
+    starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+    return np.column_stack([
+        bucket_ids[starts] * seconds,
+        np.maximum.reduceat(view_counts, starts),
+        np.maximum.reduceat(like_counts, starts),
+    ]).tolist()
+
+
+def page_buckets(video, resolution, page_start, page_end, finished_until):
+    """페이지 하나의 구간 목록 (끝난 페이지는 캐시에서 읽음)"""
+    bucket_size = RESOLUTIONS[resolution]
+    finished = page_end <= finished_until
+    key = f'shorts:growth:{video.pk}:{resolution}:{to_epoch(page_start)}'
+    if finished:
+        buckets = cache.get(key)
+        if buckets is not None:
+            return buckets
+
+    history = load_history(video, page_start, page_end, history_resolution(bucket_size))
+    buckets = bucketize(*to_arrays(history), bucket_size)
+    if finished:
+        cache.set(key, buckets, timeout=get_growth_setting('CACHE_TIMEOUT'))
+    return buckets
+
+
+def growth_curve(video, resolution, start, end, at=None):
+    """
+    [start, end) 구간별 누적값과 증가량
+    증가량은 값이 있는 직전 구간 대비 (첫 구간은 None)
+    :return: (구간 리스트, 끝난 구간의 끝 시각)
+    """
+    bucket_size = RESOLUTIONS[resolution]
+    finished_until = floor_time(at or now(), bucket_size)  # 진행 중인 구간은 캐시하지 않음
+    page_size = bucket_size * get_growth_setting('PAGE_BUCKETS')
+
+    buckets = []
+    page_start = floor_time(start, page_size)
+    while page_start < end:
+        page_end = page_start + page_size
+        buckets.extend(page_buckets(video, resolution, page_start, page_end, finished_until))
+        page_start = page_end
+
+    start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+    values = np.array(
+        [bucket for bucket in buckets if start_epoch <= bucket[0] < end_epoch], dtype=np.int64
+    ).reshape(-1, 3)
+    view_deltas = np.diff(values[:, 1]).tolist()
+    like_deltas = np.diff(values[:, 2]).tolist()
+
+    return [
+        {
+            'start': from_epoch(bucket_start),
+            'view_count': view_count,
+            'like_count': like_count,
+            'view_delta': view_deltas[index - 1] if index else None,
+            'like_delta': like_deltas[index - 1] if index else None,
+        }
+        for index, (bucket_start, view_count, like_count) in enumerate(values.tolist())
+    ], finished_until
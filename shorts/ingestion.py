@@ -0,0 +1,409 @@
+# shorts/ingestion.py
+import logging
+import uuid
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from shorts import response_cache
+from shorts.discovery import load_queries, merge_results, record_results, search_all
+from shorts.fetcher import AsyncYouTubeFetcher
+from shorts.known_videos import get_known_video_ids
+from shorts.leaderboard import publish_videos, republish_since
+from shorts.locks import single_flight
+from shorts.models import Video, VideoStatsHistory
+from shorts.quota import plan_run, record_usage
+from shorts.rankings import record_samples
+from shorts.scheduler import count_due_videos, due_video_pks, schedule_next_refresh, velocity_per_minute
+from shorts.scoring import lifetime_rates, to_db_scores, trend_scores
+from shorts.search import index_videos, rebuild_ranked_index
+from shorts.snapshots import publish_safely
+
+logger = logging.getLogger(__name__)
+
+# videos.list 한 번에 조회할 수 있는 최대 id 개수
+BATCH_SIZE = 50
+
+# 기존 영상을 DB에서 읽어올 때 한 번에 가져오는 행 수
+FETCH_SIZE = 1000
+
+# 갱신 시 bulk_update 대상 필드
+REFRESH_FIELDS = [
+    'title', 'description',
+    'view_count', 'like_count',
+    'view_diff', 'like_diff',
+    'trend_score',
+    'last_refreshed_at', 'next_refresh_at',
+]
+
+# 새 영상 저장 시 이미 같은 video_id가 있으면 덮어쓸 필드
+CREATE_CONFLICT_FIELDS = [
+    'title', 'description',
+    'view_count', 'like_count',
+    'trend_score',
+    'last_refreshed_at', 'next_refresh_at',
+]
+
+# 갱신 시 DB에서 읽어오는 필드
+REFRESH_ONLY_FIELDS = ['id', 'video_id', 'view_count', 'like_count', 'published_at', 'last_refreshed_at']
+
+
+def parse_published_at(value):
+    """유튜브 API의 publishedAt 문자열(ISO 8601)을 datetime으로 변환"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def chunked(iterable, size=BATCH_SIZE):
+    """iterable을 size 개씩 잘라 리스트로 반환"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_video_pages(queryset=None, fetch_size=FETCH_SIZE, limit=None):
+    """
+    갱신 대상 Video를 fetch_size 개씩 끊어 리스트로 반환
+    queryset을 주지 않으면 스케줄러가 고른 갱신 시기가 된 영상만 limit(기본값: 실행당 예산)만큼 반환
+    (SQLite에서 커서를 열어둔 채 같은 테이블에 쓰지 않도록 페이지 단위로 조회)
+    """
+    if queryset is None:
+        due_pks = due_video_pks(now(), limit=refresh_limit() if limit is None else limit)
+        for page_pks in chunked(due_pks, fetch_size):
+            yield list(Video.objects.only(*REFRESH_ONLY_FIELDS).filter(pk__in=page_pks))
+        return
+
+    # 전체 갱신: pk 기준 keyset 방식
+    last_pk = 0
+    while True:
+        page = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:fetch_size])
+        if not page:
+            return
+        yield page
+        last_pk = page[-1].pk
+
+
+def refresh_limit():
+    """실행당 갱신할 수 있는 최대 영상 수 (videos.list 호출 예산 × 50)"""
+    return settings.SHORTS_REFRESH_SCHEDULE['RUN_BUDGET'] * BATCH_SIZE
+
+
+def apply_refresh(videos, items):
+    """
+    videos.list 응답(items)을 기존 영상 배치에 반영하고 DB에 저장
+    :return: 갱신된 Video 리스트
+    """
+    videos_by_id = {video.video_id: video for video in videos}
+    collected_at = now()
+    updated_videos = []
+    view_rates, like_rates, ages = [], [], []
+    for item in items:
+        video = videos_by_id.get(item['id'])
+        if video is None:
+            continue
+
+        stats = item['statistics']
+        snippet = item['snippet']
+
+        new_view_count = int(stats.get('viewCount', 0))
+        new_like_count = int(stats.get('likeCount', 0))
+
+        # 증가량 계산
+        video.view_diff = new_view_count - video.view_count
+        video.like_diff = new_like_count - video.like_count
+        video.view_count = new_view_count
+        video.like_count = new_like_count
+        video.title = snippet['title']
+        video.description = snippet['description']
+
+        # 영상마다 갱신 간격이 다르므로 트렌드 점수와 다음 갱신 시각은 분당 증가량 기준으로 계산
+        if video.last_refreshed_at:
+            elapsed_minutes = max((collected_at - video.last_refreshed_at).total_seconds() / 60, 1)
+        else:
+            elapsed_minutes = 1
+        age_in_hours = (collected_at - video.published_at).total_seconds() / 3600
+        video.last_refreshed_at = collected_at
+        video.next_refresh_at = schedule_next_refresh(
+            collected_at, velocity_per_minute(video.view_diff, video.like_diff, elapsed_minutes), age_in_hours
+        )
+
+        updated_videos.append(video)
+        view_rates.append(video.view_diff / elapsed_minutes)
+        like_rates.append(video.like_diff / elapsed_minutes)
+        ages.append(age_in_hours)
+
+    missing_ids = videos_by_id.keys() - {video.video_id for video in updated_videos}
+    if missing_ids:
+        logger.warning(f"해당 video_id {sorted(missing_ids)}로 정보를 찾을 수 없습니다.")
+
+    if not updated_videos:
+        return updated_videos
+
+    # 배치 전체의 트렌드 점수를 한 번에 계산
+    for video, score in zip(updated_videos, to_db_scores(trend_scores(view_rates, like_rates, ages))):
+        video.trend_score = score
+
+    with transaction.atomic():
+        Video.objects.bulk_update(updated_videos, REFRESH_FIELDS)
+        VideoStatsHistory.objects.bulk_create([
+            VideoStatsHistory(
+                video=video,
+                view_count=video.view_count,
+                like_count=video.like_count,
+                trend_score=video.trend_score,
+            )
+            for video in updated_videos
+        ])
+        record_samples(updated_videos, collected_at)
+        index_videos(updated_videos)
+    publish_videos(updated_videos)
+
+    return updated_videos
+
+
+def apply_create(items):
+    """
+    새 영상의 videos.list 응답(items)으로 Video와 초기 이력을 저장
+    :return: 생성된 Video 리스트
+    """
+    collected_at = now()
+    new_videos = []
+    for item in items:
+        snippet = item['snippet']
+        stats = item['statistics']
+
+        view_count = int(stats.get('viewCount', 0))
+        like_count = int(stats.get('likeCount', 0))
+        published_at = parse_published_at(snippet.get('publishedAt'))
+
+        new_videos.append(Video(
+            video_id=item['id'],
+            title=snippet.get('title'),
+            description=snippet.get('description'),
+            published_at=published_at,
+            view_count=view_count,
+            like_count=like_count,
+            # 증가 속도를 알 수 없으므로 다음 실행에 바로 갱신
+            last_refreshed_at=collected_at,
+            next_refresh_at=collected_at,
+        ))
+
+    # 첫 수집은 이전 값이 없으므로 게시 후 평균 분당 증가량으로 점수 계산 (갱신 점수와 같은 단위)
+    ages = [(collected_at - video.published_at).total_seconds() / 3600 for video in new_videos]
+    scores = trend_scores(
+        *lifetime_rates([video.view_count for video in new_videos], [video.like_count for video in new_videos], ages),
+        ages,
+    )
+    for video, score in zip(new_videos, to_db_scores(scores)):
+        video.trend_score = score
+
+    with transaction.atomic():
+        # 동시에 실행된 다른 수집이 먼저 저장한 영상은 최신 값으로 덮어씀 (pk는 어느 쪽이든 채워짐)
+        Video.objects.bulk_create(
+            new_videos, update_conflicts=True, unique_fields=['video_id'], update_fields=CREATE_CONFLICT_FIELDS,
+        )
+        VideoStatsHistory.objects.bulk_create([
+            VideoStatsHistory(
+                video=video,
+                view_count=video.view_count,
+                like_count=video.like_count,
+                trend_score=video.trend_score,
+            )
+            for video in new_videos
+        ])
+        record_samples(new_videos, collected_at)
+        index_videos(new_videos)
+    get_known_video_ids(sync=False).add(video.video_id for video in new_videos)
+    publish_videos(new_videos)
+
+    return new_videos
+
+
+def find_new_video_ids(video_ids):
+    """검색 결과 video_id 중 아직 저장되지 않은 것만 추림 (검색 결과 수와 관계없이 쿼리 2번)"""
+    known_video_ids = get_known_video_ids()
+    return [video_id for video_id in dict.fromkeys(video_ids) if video_id not in known_video_ids]
+
+
+# 수집 실행 단일화 잠금 이름 (shorts.locks)
+INGESTION_LOCK_NAME = 'ingestion'
+
+
+# -----------------------------
+#  수집 파이프라인
+#  소스(shorts.sources)에 여러 배치 요청을 동시에 보내고, DB 쓰기는 응답이 도착하는 대로
+#  호출한 스레드에서 배치 단위로 처리한다.
+# -----------------------------
+async def still_leased(lease):
+    """배치 사이에 리스를 연장 (다른 실행이 리스를 가져갔으면 False)"""
+    return lease is None or await sync_to_async(lease.renew)()
+
+
+async def refresh_videos(source, queryset=None, limit=None, lease=None):
+    """
+    저장된 영상을 50개 단위 배치로 갱신
+    페이지(FETCH_SIZE) 단위로 배치를 동시에 조회하고, 끝나는 순서대로 DB에 반영
+    :param limit: 갱신할 최대 영상 수 (할당량 계획)
+    :param lease: shorts.locks.Lease (잃으면 남은 배치를 쓰지 않고 멈춤)
+    :return: 갱신된 영상 수
+    """
+    pages = iter_video_pages(queryset, limit=limit)
+    next_page = sync_to_async(lambda: next(pages, None))
+    write = sync_to_async(apply_refresh)
+
+    updated_count = 0
+    while (page := await next_page()) is not None:
+        async for videos, items in source.stream_videos_list(
+            chunked(page), key=lambda batch: [video.video_id for video in batch]
+        ):
+            if not await still_leased(lease):
+                return updated_count
+            if items is not None:
+                updated_count += len(await write(videos, items))
+        if source.quota_exceeded:
+            break
+    return updated_count
+
+
+def plan_discovery(results):
+    """검색 결과를 합쳐 새 영상만 추리고 검색별 수율을 기록"""
+    new_video_ids = find_new_video_ids(merge_results(results))
+    record_results(results, get_known_video_ids(sync=False))
+    return new_video_ids
+
+
+async def discover_videos(source, lease=None, max_searches=None):
+    """
+    설정된 검색(shorts.discovery)을 동시에 보내 아직 저장되지 않은 영상을 추가
+    :param max_searches: 최대 search.list 호출 수 (할당량 계획)
+    :return: 생성된 Video 리스트
+    """
+    queries = await sync_to_async(load_queries)()
+    results = await search_all(source, queries, max_searches)
+
+    new_video_ids = await sync_to_async(plan_discovery)(results)
+    write = sync_to_async(apply_create)
+
+    created_videos = []
+    async for _, items in source.stream_videos_list(chunked(new_video_ids)):
+        if not await still_leased(lease):
+            break
+        if items:
+            created_videos += await write(items)
+    return created_videos
+
+
+async def ingest(source, plan=None, lease=None):
+    """
+    기존 영상 갱신 후 새 영상 검색 (한 번의 수집 실행)
+    :param plan: shorts.quota.QuotaPlan (없으면 제한 없음)
+    :param lease: shorts.locks.Lease
+    """
+    updated_count = await refresh_videos(source, limit=plan.refresh_limit if plan else None, lease=lease)
+    logger.info(f"유튜브 데이터 업데이트 완료 ({updated_count}개)")
+
+    if plan and not plan.discovery:
+        logger.info(f"할당량이 부족해 새 영상 검색을 건너뜁니다. ({plan})")
+        return updated_count, []
+
+    if lease is not None and lease.lost:
+        return updated_count, []
+
+    created_videos = await discover_videos(source, lease=lease, max_searches=plan.searches if plan else None)
+    logger.info(f"새로운 유튜브 영상 추가 완료 ({len(created_videos)}개)")
+    return updated_count, created_videos
+
+
+def build_source(source=None, **fetcher_options):
+    """source를 주지 않으면 실제 유튜브 API 소스(AsyncYouTubeFetcher)를 생성"""
+    if source is not None:
+        return source
+    api_key = fetcher_options.pop('api_key', None) or settings.YOUTUBE_DATA_API_KEY
+    return AsyncYouTubeFetcher(api_key, **fetcher_options)
+
+
+def run_with_source(source, work, run_id=None):
+    """
+    source를 연 채로 work(source) 코루틴을 동기 코드에서 실행
+    실제 유튜브 API를 쓰는 경우 사용량을 장부에 기록한다.
+    :param run_id: 할당량 장부의 실행 ID (여러 하위 작업이 실행 하나를 나눠 처리하면 같은 ID)
+    """
+    async def main():
+        async with source:
+            return await work(source)
+
+    try:
+        return async_to_sync(main)()
+    finally:
+        if source.metered:
+            record_usage(run_id or uuid.uuid4(), source.usage)
+
+
+def run_ingestion(source=None, **fetcher_options):
+    """
+    동기 코드(관리 명령어)에서 수집을 1회 실행
+    async_to_sync로 실행하므로 ORM 호출은 호출한 스레드에서 그대로 처리된다.
+    실제 유튜브 API를 쓰는 경우 남은 할당량으로 작업량을 정하고, 사용량을 장부에 기록한다.
+    이전 실행이 아직 진행 중이면 아무것도 하지 않는다. (shorts.locks)
+    :param source: StatsSource (기본값: 실제 유튜브 API)
+    :param fetcher_options: 기본 소스(AsyncYouTubeFetcher) 생성 옵션
+    :return: (갱신된 영상 수, 생성된 Video 리스트), 건너뛰었으면 None
+    """
+    with single_flight(INGESTION_LOCK_NAME) as lease:
+        if lease is None:
+            logger.warning("이전 수집이 아직 실행 중이라 이번 실행을 건너뜁니다.")
+            return None
+
+        source = build_source(source, **fetcher_options)
+        plan = None
+        if source.metered:
+            plan = plan_run(count_due_videos(now(), refresh_limit()), BATCH_SIZE)
+        result = run_with_source(source, lambda source: ingest(source, plan, lease))
+
+    finish_ingestion()
+    return result
+
+
+def finish_ingestion(since=None):
+    """
+    수집 실행이 끝난 뒤 트렌드 목록을 다시 계산
+    - since 이후 수집된 영상의 점수를 DB에서 다시 읽어 순위표에 반영 (shorts.leaderboard.republish_since)
+      분할 수집은 하위 작업들이 각자 순위표에 반영하므로 실패/순서 뒤섞임을 여기서 맞춘다.
+    - 트렌드 목록 응답 캐시 무효화, 정적 스냅샷과 검색 순위 역색인 갱신
+    :param since: 실행을 시작한 시각 (None이면 순위표는 다시 반영하지 않음)
+    """
+    if since is not None:
+        republish_since(since)
+    response_cache.bump_version()
+    publish_safely()
+    rebuild_ranked_index()
+
+
+class IncompleteChunk(Exception):
+    """하위 작업의 일부 배치 조회가 실패함 (작업을 다시 실행하면 실패한 영상만 다시 조회)"""
+
+
+def refresh_chunk(video_pks, dispatched_at, lease=None, source=None, run_id=None, **fetcher_options):
+    """
+    분할 수집(shorts.tasks.fetch_youtube_data)의 갱신 하위 작업 하나
+    dispatched_at 이후 이미 갱신된 영상은 건너뛰므로 같은 청크를 다시 실행해도 이력이 중복되지 않는다.
+    :param video_pks: 이 작업이 갱신할 Video pk 목록
+    :param dispatched_at: 실행을 나눈 시각
+    :return: 갱신된 영상 수
+    :raises IncompleteChunk: 할당량 소진이나 리스 분실이 아닌 이유로 실패한 배치가 있음
+    """
+    source = build_source(source, **fetcher_options)
+    queryset = (
+        Video.objects.only(*REFRESH_ONLY_FIELDS)
+        .filter(pk__in=video_pks)
+        .filter(Q(last_refreshed_at__isnull=True) | Q(last_refreshed_at__lt=dispatched_at))
+    )
+    updated_count = run_with_source(source, lambda source: refresh_videos(source, queryset, lease=lease), run_id)
+
+    if source.error_count and not source.quota_exceeded and not (lease is not None and lease.lost):
+        raise IncompleteChunk(f"배치 {source.error_count}개 조회 실패 (갱신 {updated_count}개)")
+    return updated_count
@@ -0,0 +1,72 @@
+# shorts/known_videos.py
+"""
+이미 저장된 video_id 집합 (새 영상 검색 시 중복 제거)
+
+검색 결과마다 DB에 존재 여부를 묻는 대신, 프로세스마다 video_id 집합을 한 번 읽어 두고
+실행마다 그 뒤에 추가된 행만 pk 기준으로 이어서 읽는다. (실행당 쿼리 2번)
+- 다른 프로세스가 추가한 영상도 다음 동기화에서 반영
+- 마지막으로 읽은 행이 사라졌거나(삭제, 테스트 롤백) RELOAD_SECONDS가 지나면 전체를 다시 읽음
+Bloom 필터 대신 정확한 set을 쓴다. (영상 100만 개에 약 100MB, 오탐으로 새 영상을 놓치지 않음)
+"""
+import threading
+import time
+
+from shorts.models import Video
+
+# 삭제된 영상을 반영하기 위해 전체를 다시 읽는 주기
+RELOAD_SECONDS = 60 * 60
+
+
+class KnownVideoIds:
+    def __init__(self, reload_seconds=RELOAD_SECONDS):
+        self.reload_seconds = reload_seconds
+        self._ids = set()
+        self._last_pk = 0
+        self._last_video_id = None  # _last_pk 행의 video_id (행이 바뀌었는지 확인용)
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reload_seconds:
+            return True
+        if not self._last_pk:
+            return False
+        # 마지막으로 읽은 행이 삭제되었거나 다른 영상이면 (롤백 후 pk 재사용 등) 전체를 다시 읽음
+        return Video.objects.filter(pk=self._last_pk).values_list('video_id', flat=True).first() != self._last_video_id
+
+    def sync(self):
+        """DB에 새로 추가된 영상을 반영"""
+        with self._lock:
+            if self._is_stale():
+                self._ids = set()
+                self._last_pk = 0
+                self._last_video_id = None
+                self._loaded_at = time.monotonic()
+
+            rows = Video.objects.filter(pk__gt=self._last_pk).order_by('pk').values_list('pk', 'video_id')
+            for pk, video_id in rows.iterator(chunk_size=10_000):
+                self._ids.add(video_id)
+                self._last_pk, self._last_video_id = pk, video_id
+
+    def add(self, video_ids):
+        with self._lock:
+            self._ids.update(video_ids)
+
+    def __contains__(self, video_id):
+        return video_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+
+_known_video_ids = KnownVideoIds()
+
+
+def get_known_video_ids(sync=True):
+    """
+    프로세스 전역 video_id 집합
+    :param sync: DB에 새로 추가된 영상을 먼저 반영할지 여부
+    """
+    if sync:
+        _known_video_ids.sync()
+    return _known_video_ids
@@ -0,0 +1,373 @@
+# shorts/leaderboard.py
+"""
+트렌드 점수 순위표
+
+수집 파이프라인이 점수가 바뀐 영상을 update()로 반영하고,
+/api/v1/video/trending-videos/ 는 Video 테이블 대신 순위표에서 상위 N개를 읽는다.
+
+- RedisLeaderboard: Redis sorted set(점수) + hash(응답용 영상 정보). 모든 프로세스가 공유.
+  상위 N개와 임의 영상의 순위를 O(log n)으로 조회
+  Redis 재시작이나 키 삭제로 sorted set이 없으면 읽는 쪽이 잠금(shorts.locks)을 잡고 DB에서 다시 채움
+- LocalLeaderboard: Redis를 쓸 수 없을 때의 프로세스 내 대체 구현 (단일 서버용)
+  DB에서 상위 TOP_K개를 읽어 정렬된 리스트로 유지하고 REFRESH_SECONDS마다 다시 읽음
+
+세 곳(Redis, LocalLeaderboard, DB) 모두 trend_score 내림차순, 동점이면 video_id 내림차순으로 정렬한다.
+(Redis sorted set을 역순으로 읽을 때의 순서) 그래서 (trend_score, video_id) 커서로
+어느 쪽에서 읽든 같은 위치에서 다음 페이지를 이어 읽을 수 있다.
+"""
+import base64
+import binascii
+import bisect
+import json
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from shorts import response_cache
+from shorts.locks import single_flight
+from shorts.models import Video
+
+logger = logging.getLogger(__name__)
+
+# 응답에 포함되는 영상 정보 (trending_videos 응답 형식)
+PAYLOAD_FIELDS = ['video_id', 'title', 'description', 'trend_score', 'view_count', 'like_count', 'published_at']
+
+ORDERING = ['-trend_score', '-video_id']
+
+REFILL_LOCK_NAME = 'leaderboard-refill'
+
+
+def get_leaderboard_setting(name):
+    return settings.TRENDING_LEADERBOARD[name]
+
+
+def leaderboard_entry(video):
+    """Video -> (video_id, 점수, 응답용 영상 정보)"""
+    payload = {field: getattr(video, field) for field in PAYLOAD_FIELDS}
+    return video.video_id, int(video.trend_score), payload
+
+
+def project(payload, fields):
+    """응답용 영상 정보에서 fields만 남김 (None이면 그대로)"""
+    if fields is None:
+        return payload
+    return {field: payload[field] for field in fields}
+
+
+def encode_cursor(score, video_id):
+    return base64.urlsafe_b64encode(f'{score}:{video_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    :return: (trend_score, video_id)
+    :raises ValueError: 잘못된 커서
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f'invalid cursor: {cursor}')
+    score, _, video_id = decoded.partition(':')
+    if not video_id:
+        raise ValueError(f'invalid cursor: {cursor}')
+    return int(score), video_id
+
+
+def iter_db_entries(limit=None, after=None, fields=None):
+    """
+    DB에서 점수 순으로 순위표 항목을 읽음
+    (trend_score, video_id) 복합 인덱스를 따라 읽으므로 커서 위치와 관계없이 limit개만 읽는다.
+    :param after: (trend_score, video_id) 커서. 이 항목 다음부터 읽음
+    :param fields: 응답에 포함할 필드 (기본값: PAYLOAD_FIELDS)
+    """
+    fields = fields or PAYLOAD_FIELDS
+    queryset = Video.objects.order_by(*ORDERING)
+    if after is not None:
+        score, video_id = after
+        queryset = queryset.filter(
+            Q(trend_score__lte=score), Q(trend_score__lt=score) | Q(video_id__lt=video_id)
+        )
+    queryset = queryset.values(*dict.fromkeys(['video_id', 'trend_score', *fields]))
+    if limit is not None:
+        queryset = queryset[:limit]
+    for row in queryset.iterator(chunk_size=2_000):
+        yield row['video_id'], int(row['trend_score']), {field: row[field] for field in fields}
+
+
+class RedisLeaderboard:
+    def __init__(self, client, key):
+        self.client = client
+        self.scores_key = f'{key}:scores'
+        self.payloads_key = f'{key}:payloads'
+        self.empty_key = f'{key}:empty'  # DB에도 영상이 없어 비어 있는 순위표 (다시 채우지 않음)
+
+    def update(self, entries):
+        entries = list(entries)
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(self.scores_key, {video_id: score for video_id, score, _ in entries})
+        pipe.hset(self.payloads_key, mapping={
+            video_id: json.dumps(payload, cls=DjangoJSONEncoder) for video_id, _, payload in entries
+        })
+        pipe.execute()
+
+    def remove(self, video_ids):
+        if video_ids:
+            self.client.pipeline(transaction=False).zrem(self.scores_key, *video_ids).hdel(
+                self.payloads_key, *video_ids
+            ).execute()
+
+    def _start_after(self, score, video_id):
+        """커서 다음 항목의 0부터 시작하는 순위"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zscore(self.scores_key, video_id)
+        pipe.zrevrank(self.scores_key, video_id)
+        pipe.zcount(self.scores_key, f'({score}', '+inf')
+        current_score, rank, higher = pipe.execute()
+        if current_score is not None and int(current_score) == score:
+            return rank + 1
+        # 커서 영상의 점수가 바뀌었으면 같은 점수의 첫 항목부터 (건너뛰는 것보다 중복이 나음)
+        return higher
+
+    def top(self, limit, after=None, fields=None):
+        """
+        :param after: (trend_score, video_id) 커서
+        :return: [(video_id, 점수, 응답용 영상 정보), ...]
+        """
+        start = self._start_after(*after) if after is not None else 0
+        members = self.client.zrevrange(self.scores_key, start, start + limit - 1, withscores=True)
+        if not members:
+            if self.refill():
+                return self.top(limit, after, fields)
+            return []
+        payloads = self.client.hmget(self.payloads_key, [video_id for video_id, _ in members])
+        return [
+            (video_id, int(score), project(json.loads(payload), fields))
+            for (video_id, score), payload in zip(members, payloads) if payload is not None
+        ]
+
+    def rank(self, video_id):
+        """:return: (1부터 시작하는 순위, 점수) 또는 None"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zrevrank(self.scores_key, video_id)
+        pipe.zscore(self.scores_key, video_id)
+        rank, score = pipe.execute()
+        if rank is None:
+            if self.refill():
+                return self.rank(video_id)
+            return None
+        return rank + 1, int(score)
+
+    def refill(self):
+        """
+        sorted set이 없으면 DB에서 다시 채움 (여러 프로세스가 동시에 발견해도 한 곳만 채움)
+        :return: 다시 채웠으면 True (이미 있거나 다른 프로세스가 채우는 중이면 False)
+        """
+        if self.client.exists(self.scores_key, self.empty_key):
+            return False
+        with single_flight(REFILL_LOCK_NAME) as lease:
+            if lease is None or self.client.exists(self.scores_key, self.empty_key):
+                return False
+            logger.warning("Redis 순위표가 없어 DB에서 다시 채웁니다.")
+            self.rebuild(iter_db_entries())
+        response_cache.bump_version()
+        return True
+
+    def size(self):
+        return self.client.zcard(self.scores_key)
+
+    def rebuild(self, entries, chunk_size=5_000):
+        """임시 키에 새로 만든 뒤 RENAME으로 교체 (읽는 쪽에서 빈 순위표가 보이지 않음)"""
+        staging = RedisLeaderboard(self.client, f'{self.scores_key}:rebuild')
+        self.client.delete(staging.scores_key, staging.payloads_key)
+
+        entries = iter(entries)
+        while True:
+            chunk = [entry for _, entry in zip(range(chunk_size), entries)]
+            if not chunk:
+                break
+            staging.update(chunk)
+
+        pipe = self.client.pipeline(transaction=True)
+        if staging.size():
+            pipe.rename(staging.scores_key, self.scores_key)
+            pipe.rename(staging.payloads_key, self.payloads_key)
+            pipe.delete(self.empty_key)
+        else:
+            pipe.delete(self.scores_key, self.payloads_key)
+            # 영상이 추가되면 update()가 sorted set을 만들고, 그 전까지 읽을 때마다 DB를 다시 읽지 않도록
+            pipe.set(self.empty_key, 1, ex=get_leaderboard_setting('REFRESH_SECONDS'))
+        pipe.execute()
+
+
+class LocalLeaderboard:
+    """
+    프로세스 내 순위표 (상위 top_k개만 유지)
+    _order는 (점수, video_id) 오름차순 리스트라 끝에서부터 읽으면 순위 순서가 되고,
+    bisect로 순위와 커서 위치를 O(log n)에 찾는다.
+    """
+
+    def __init__(self, top_k, refresh_seconds):
+        self.top_k = top_k
+        self.refresh_seconds = refresh_seconds
+        self._order = []
+        self._entries = {}  # video_id -> (점수, payload)
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def _ensure_fresh(self):
+        # 다른 프로세스(수집 작업)의 갱신을 반영하기 위해 주기적으로 DB에서 다시 읽음
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.rebuild(iter_db_entries(self.top_k))
+
+    def _remove(self, video_id):
+        old = self._entries.pop(video_id, None)
+        if old is not None:
+            index = bisect.bisect_left(self._order, (old[0], video_id))
+            del self._order[index]
+
+    def update(self, entries):
+        with self._lock:
+            for video_id, score, payload in entries:
+                self._remove(video_id)
+                bisect.insort(self._order, (score, video_id))
+                self._entries[video_id] = (score, payload)
+            # 상위 top_k개만 유지
+            excess = max(len(self._order) - self.top_k, 0)
+            for _, video_id in self._order[:excess]:
+                del self._entries[video_id]
+            del self._order[:excess]
+
+    def remove(self, video_ids):
+        with self._lock:
+            for video_id in video_ids:
+                self._remove(video_id)
+
+    def top(self, limit, after=None, fields=None):
+        """
+        :param after: (trend_score, video_id) 커서
+        :return: [(video_id, 점수, 응답용 영상 정보), ...]
+        """
+        with self._lock:
+            self._ensure_fresh()
+            # end: 커서 다음 항목부터 끝까지가 _order[:end]를 뒤집은 순서
+            end = bisect.bisect_left(self._order, after) if after is not None else len(self._order)
+            if end >= limit or len(self._order) < self.top_k:
+                return [
+                    (video_id, score, project(self._entries[video_id][1], fields))
+                    for score, video_id in reversed(self._order[max(end - limit, 0):end])
+                ]
+        # 유지하는 범위를 벗어나면 DB에서 직접 읽음
+        return list(iter_db_entries(limit, after, fields))
+
+    def rank(self, video_id):
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._entries.get(video_id)
+            if entry is not None:
+                return len(self._order) - bisect.bisect_left(self._order, (entry[0], video_id)), entry[0]
+
+        # 상위 top_k 밖의 영상은 (trend_score, video_id) 인덱스로 순위 계산
+        video = Video.objects.filter(video_id=video_id).only('pk', 'trend_score').first()
+        if video is None:
+            return None
+        higher = Video.objects.filter(trend_score__gt=video.trend_score).count()
+        ties = Video.objects.filter(trend_score=video.trend_score, video_id__gt=video_id).count()
+        return higher + ties + 1, video.trend_score
+
+    def size(self):
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._order)
+
+    def rebuild(self, entries):
+        with self._lock:
+            self._order = []
+            self._entries = {}
+            self._loaded_at = time.monotonic()
+            self.update(entries)
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def connect_redis():
+    """순위표용 Redis 연결 (사용할 수 없으면 None)"""
+    url = get_leaderboard_setting('REDIS_URL')
+    if not url:
+        return None
+    try:
+        client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=1, decode_responses=True)
+        client.ping()
+        return client
+    except redis.RedisError as e:
+        logger.warning(f"Redis 순위표를 사용할 수 없어 프로세스 내 순위표로 대체합니다: {e}")
+        return None
+
+
+def get_leaderboard():
+    """프로세스 전역 순위표 (Redis 우선, 실패 시 LocalLeaderboard)"""
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                client = connect_redis()
+                if client is not None:
+                    _leaderboard = RedisLeaderboard(client, get_leaderboard_setting('KEY'))
+                else:
+                    _leaderboard = LocalLeaderboard(
+                        get_leaderboard_setting('TOP_K'), get_leaderboard_setting('REFRESH_SECONDS')
+                    )
+    return _leaderboard
+
+
+def reset_leaderboard():
+    """설정 변경 후(테스트 등) 순위표를 다시 만들도록 초기화"""
+    global _leaderboard
+    _leaderboard = None
+
+
+def publish_videos(videos):
+    """
+    수집 파이프라인에서 점수가 바뀐 영상을 순위표에 반영
+    DB에는 이미 저장된 뒤이므로 실패해도 수집은 계속하고, rebuild_leaderboard로 복구한다.
+    """
+    try:
+        get_leaderboard().update(leaderboard_entry(video) for video in videos)
+    except redis.RedisError as e:
+        logger.error(f"순위표 갱신 실패: {e}")
+
+
+def republish_since(at, chunk_size=5_000):
+    """
+    at 이후 수집된 영상의 점수를 DB에서 다시 읽어 순위표에 반영 (분할 수집이 끝난 뒤)
+    하위 작업마다 publish_videos로 반영한 값이 실패하거나 늦게 도착해 뒤섞였어도 DB의 최종 점수로 맞춘다.
+    :return: 반영한 영상 수
+    """
+    leaderboard = get_leaderboard()
+    videos = Video.objects.filter(last_refreshed_at__gte=at).only(*PAYLOAD_FIELDS).order_by('pk')
+    entries = (leaderboard_entry(video) for video in videos.iterator(chunk_size=chunk_size))
+    count = 0
+    try:
+        while chunk := [entry for _, entry in zip(range(chunk_size), entries)]:
+            leaderboard.update(chunk)
+            count += len(chunk)
+    except redis.RedisError as e:
+        logger.error(f"순위표 갱신 실패: {e}")
+    return count
+
+
+def rebuild_from_db():
+    """DB 기준으로 순위표를 다시 만듦"""
+    leaderboard = get_leaderboard()
+    limit = leaderboard.top_k if isinstance(leaderboard, LocalLeaderboard) else None
+    leaderboard.rebuild(iter_db_entries(limit))
+    response_cache.bump_version()
+    return leaderboard
@@ -0,0 +1,144 @@
+# shorts/locks.py
+"""
+수집 실행 단일화 (single-flight)
+
+cron(manage.py fetch_youtube_data)과 Celery(shorts.tasks.fetch_youtube_data)가 같은 수집을 예약할 수 있고,
+느린 실행이 다음 실행과 겹치면 API 호출과 VideoStatsHistory 행이 중복되고 view_diff가 틀어진다.
+IngestionLock 행 하나를 리스로 사용해 한 번에 하나의 실행만 수집하게 한다.
+
+- 잠금 획득: 비어 있거나 만료된 행만 조건부 UPDATE로 가져감 (DB 종류와 관계없이 원자적)
+  행이 아직 없으면 충돌을 무시하는 INSERT로 만든 뒤 한 번 더 시도
+- 리스 갱신: 실행 중 RENEW_SECONDS마다 expires_at을 연장 (수집 루프에서 배치 사이에 호출)
+  Celery로 나눈 실행은 하위 작업이 대기열에서 기다리는 시간까지 extend()로 미리 연장하고,
+  갱신은 expires_at을 앞당기지 않는다.
+- 비정상 종료로 갱신이 끊긴 리스는 LEASE_SECONDS 뒤 다음 실행이 가져감 (takeovers)
+- 잠금을 얻지 못한 실행은 skipped를 늘리고 바로 끝남
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils.timezone import now
+
+from shorts.models import IngestionLock
+
+logger = logging.getLogger(__name__)
+
+
+def get_lock_setting(name):
+    return settings.INGESTION_LOCK[name]
+
+
+class Lease:
+    """획득한 리스 (실행 중 renew()를 주기적으로 호출)"""
+
+    def __init__(self, name, owner, acquired_at=None):
+        self.name = name
+        self.owner = owner
+        self.acquired_at = acquired_at or now()
+        self.lost = False
+        self._renewed = time.monotonic()
+
+    @classmethod
+    def resume(cls, name, owner):
+        """다른 프로세스가 획득한 리스를 이어서 사용 (Celery 하위 작업에 owner만 넘겨 받은 경우)"""
+        acquired_at = IngestionLock.objects.filter(name=name, owner=owner).values_list('acquired_at', flat=True).first()
+        return cls(name, owner, acquired_at)
+
+    def renew(self, force=False):
+        """
+        RENEW_SECONDS가 지났으면 리스를 연장
+        :return: 리스를 아직 가지고 있으면 True (다른 실행이 가져갔으면 False)
+        """
+        if self.lost:
+            return False
+        if not force and time.monotonic() - self._renewed < get_lock_setting('RENEW_SECONDS'):
+            return True
+
+        self._renewed = time.monotonic()
+        return self.extend(get_lock_setting('LEASE_SECONDS'))
+
+    def extend(self, seconds):
+        """
+        리스를 지금부터 seconds초 뒤까지 연장 (이미 더 길게 잡혀 있으면 그대로)
+        :return: 리스를 아직 가지고 있으면 True
+        """
+        updated = IngestionLock.objects.filter(name=self.name, owner=self.owner).update(
+            expires_at=Greatest(F('expires_at'), Value(now() + timedelta(seconds=seconds))),
+        )
+        if not updated:
+            self.lost = True
+            logger.error(f"{self.name} 잠금 리스를 잃었습니다. (다른 실행이 만료된 리스를 가져감)")
+        return not self.lost
+
+    def release(self):
+        IngestionLock.objects.filter(name=self.name, owner=self.owner).update(
+            owner=None, expires_at=None, last_duration=(now() - self.acquired_at).total_seconds(),
+        )
+
+
+def acquire(name):
+    """
+    :return: Lease (이미 다른 실행이 리스를 가지고 있으면 None)
+    """
+    at = now()
+    owner = uuid.uuid4()
+
+    def take():
+        return IngestionLock.objects.filter(name=name).filter(Q(owner__isnull=True) | Q(expires_at__lt=at)).update(
+            # SET의 오른쪽은 갱신 전 값으로 계산되므로 owner가 있었다면 만료된 리스를 가져온 것
+            takeovers=F('takeovers') + Case(When(owner__isnull=False, then=1), default=0),
+            owner=owner,
+            acquired_at=at,
+            expires_at=at + timedelta(seconds=get_lock_setting('LEASE_SECONDS')),
+            runs=F('runs') + 1,
+        )
+
+    acquired = take()
+    if not acquired and not IngestionLock.objects.filter(name=name).exists():
+        # 첫 실행: 여러 실행이 동시에 행을 만들어도 INSERT ... ON CONFLICT DO NOTHING이라 IntegrityError가 나지 않음
+        IngestionLock.objects.bulk_create([IngestionLock(name=name)], ignore_conflicts=True)
+        acquired = take()
+    if acquired:
+        return Lease(name, owner, at)
+
+    IngestionLock.objects.filter(name=name).update(skipped=F('skipped') + 1, last_skipped_at=at)
+    return None
+
+
+@contextmanager
+def single_flight(name):
+    """
+    with single_flight('ingestion') as lease:
+        if lease is None:
+            return  # 이전 실행이 아직 진행 중
+    """
+    lease = acquire(name)
+    try:
+        yield lease
+    finally:
+        if lease is not None:
+            lease.release()
+
+
+def lock_metrics(name):
+    """대시보드용 잠금 상태와 건너뛴/겹친 실행 수"""
+    lock = IngestionLock.objects.filter(name=name).first()
+    if lock is None:
+        return {'name': name, 'running': False, 'runs': 0, 'skipped': 0, 'takeovers': 0}
+    return {
+        'name': name,
+        'running': lock.owner is not None and lock.expires_at >= now(),
+        'acquired_at': lock.acquired_at,
+        'expires_at': lock.expires_at,
+        'runs': lock.runs,
+        'skipped': lock.skipped,
+        'takeovers': lock.takeovers,
+        'last_skipped_at': lock.last_skipped_at,
+        'last_duration': lock.last_duration,
+    }
@@ -0,0 +1,46 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from Assa_backend.benchmark import timed
+from shorts.fetcher import AsyncYouTubeFetcher, get_ssl_context
+
+
+class Command(BaseCommand):
+    help = '수집 실행마다 유튜브 API 클라이언트를 새로 만들 때(cold)와 캐시된 SSL 컨텍스트를 쓸 때(warm)의 생성 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=50, help='클라이언트 생성 횟수')
+        parser.add_argument('--threads', type=int, default=8, help='동시에 클라이언트를 만드는 스레드 수')
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+
+        # 기존 방식: 실행마다 httpx 기본값으로 SSL 컨텍스트(인증서 번들)까지 새로 생성
+        async def cold():
+            async with httpx.AsyncClient(base_url='https://www.googleapis.com/youtube/v3/'):
+                pass
+
+        async def warm():
+            async with AsyncYouTubeFetcher('benchmark'):
+                pass
+
+        get_ssl_context()  # 첫 생성 비용은 프로세스당 한 번
+        with timed() as cold_timer:
+            for _ in range(runs):
+                asyncio.run(cold())
+        with timed() as warm_timer:
+            for _ in range(runs):
+                asyncio.run(warm())
+
+        self.stdout.write(f'클라이언트 생성 {runs}회 (실행마다 새 이벤트 루프)')
+        self.stdout.write(f'  cold: {cold_timer.elapsed / runs * 1000:8.2f}ms/회')
+        self.stdout.write(f'  warm: {warm_timer.elapsed / runs * 1000:8.2f}ms/회 '
+                          f'({cold_timer.elapsed / warm_timer.elapsed:.0f}배)')
+
+        # 여러 스레드(Celery 하위 작업)가 동시에 만들어도 SSL 컨텍스트는 하나
+        with ThreadPoolExecutor(options['threads']) as executor:
+            contexts = set(map(id, executor.map(lambda _: get_ssl_context(), range(runs))))
+        self.stdout.write(f'  스레드 {options["threads"]}개에서 공유한 SSL 컨텍스트 수: {len(contexts)}')
@@ -0,0 +1,104 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from Assa_backend.benchmark import benchmark_database, timed
+from shorts.models import Video, VideoStatsHistory
+from shorts.rollups import load_history, run_rollups, select_resolution
+
+
+class Command(BaseCommand):
+    help = '통계 이력 압축 전후의 이력 조회 시간과 DB 크기를 비교합니다. (임시 DB 사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=200, help='영상 수')
+        parser.add_argument('--days', type=int, default=30, help='이력 기간 (일)')
+        parser.add_argument('--interval', type=int, default=10, help='샘플 간격 (분)')
+        parser.add_argument('--reads', type=int, default=50, help='조회할 영상 수')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            at = now()
+            with timed() as seed_timer:
+                video_pks = self.seed(at, options)
+            self.stdout.write(f'이력 {VideoStatsHistory.objects.count()}행 생성 ({seed_timer.elapsed:.1f}s)')
+
+            rng = random.Random(options['seed'])
+            sample = rng.sample(video_pks, min(options['reads'], len(video_pks)))
+            periods = [('24시간', timedelta(days=1)), (f"{options['days']}일", timedelta(days=options['days']))]
+
+            self.stdout.write(f'압축 전: DB {self.db_size()}')
+            index = next(index for index in VideoStatsHistory._meta.indexes if index.name == 'history_video_time_idx')
+            with connection.schema_editor() as editor:
+                editor.remove_index(VideoStatsHistory, index)
+            self.report('  (video, collected_at) 인덱스 없음', sample, periods, at, raw_only=True)
+            with connection.schema_editor() as editor:
+                editor.add_index(VideoStatsHistory, index)
+            self.report('  (video, collected_at) 인덱스', sample, periods, at, raw_only=True)
+
+            with timed() as rollup_timer:
+                result = run_rollups(at)
+            self.vacuum()
+            self.stdout.write(f'압축 ({rollup_timer.elapsed:.1f}s): {result}')
+            self.stdout.write(f'압축 후: DB {self.db_size()}, 원본 {VideoStatsHistory.objects.count()}행')
+            self.report('  해상도 자동 선택', sample, periods, at)
+
+    def seed(self, at, options):
+        rng = random.Random(options['seed'])
+        videos = Video.objects.bulk_create([
+            Video(video_id=f'hist{i:06d}', title=f'history {i}', published_at=at - timedelta(days=options['days'] + 1))
+            for i in range(options['videos'])
+        ])
+
+        interval = timedelta(minutes=options['interval'])
+        steps = options['days'] * 24 * 60 // options['interval']
+        sql = (f'INSERT INTO {VideoStatsHistory._meta.db_table} '
+               f'(video_id, collected_at, view_count, like_count, trend_score) VALUES (%s, %s, %s, %s, %s)')
+        adapt = connection.ops.adapt_datetimefield_value
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for video in videos:
+                views, rate = 0, rng.lognormvariate(3, 1.5)
+                rows = []
+                for step in range(steps, 0, -1):
+                    views += int(rate * options['interval'] * rng.uniform(0.5, 1.5))
+                    rows.append((video.pk, adapt(at - step * interval), views, views // 30, int(rate)))
+                cursor.executemany(sql, rows)
+        return [video.pk for video in videos]
+
+    def report(self, label, video_pks, periods, at, raw_only=False):
+        for name, period in periods:
+            start = at - period
+            with timed() as timer:
+                for video_pk in video_pks:
+                    if raw_only:
+                        points = list(
+                            VideoStatsHistory.objects
+                            .filter(video_id=video_pk, collected_at__gte=start, collected_at__lt=at)
+                            .order_by('collected_at')
+                            .values('collected_at', 'view_count', 'like_count', 'trend_score')
+                        )
+                    else:
+                        points = load_history(video_pk, start, at)
+            resolution = 'raw' if raw_only else select_resolution(start, at, at)
+            self.stdout.write(f'{label} / {name} 조회 ({resolution}, {len(points)}포인트): '
+                              f'{timer.elapsed / len(video_pks) * 1000:.2f}ms/영상')
+
+    def db_size(self):
+        if connection.vendor != 'sqlite':
+            return '(SQLite에서만 측정)'
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA page_count')
+            page_count = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            page_size = cursor.fetchone()[0]
+        return f'{page_count * page_size / 1024 / 1024:.1f}MB'
+
+    def vacuum(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
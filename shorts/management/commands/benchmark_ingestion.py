@@ -0,0 +1,74 @@
+import cProfile
+import pstats
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from Assa_backend.benchmark import benchmark_database, count_queries, timed
+from shorts.ingestion import apply_create, chunked, run_ingestion
+from shorts.models import Video, VideoStatsHistory
+from shorts.sources import ReplaySource, SyntheticSource
+
+
+class Command(BaseCommand):
+    help = '임시 DB에서 가짜(또는 기록된) 통계 소스로 수집 1회 실행 시간을 측정합니다. (유튜브 할당량 사용 없음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000, 100_000],
+                            help='미리 저장해 둘 가짜 쇼츠 수 목록')
+        parser.add_argument('--runs', type=int, default=1, help='크기마다 반복할 수집 횟수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--replay', metavar='PATH',
+                            help='가짜 소스 대신 fetch_youtube_data --record로 기록한 파일을 재생')
+        parser.add_argument('--profile', metavar='PATH',
+                            help='수집 구간을 cProfile로 프로파일링해 PATH에 저장')
+
+    def handle(self, *args, **options):
+        profiler = cProfile.Profile() if options['profile'] else None
+
+        with benchmark_database():
+            sizes = [None] if options['replay'] else options['sizes']
+            for size in sizes:
+                VideoStatsHistory.objects.all().delete()
+                Video.objects.all().delete()
+
+                if options['replay']:
+                    source = ReplaySource(options['replay'])
+                    video_ids = list(source.snapshots)
+                else:
+                    # 매 실행마다 검색으로 50개씩 새로 발견될 영상을 여분으로 생성
+                    source = SyntheticSource(count=size + 50 * options['runs'], seed=options['seed'])
+                    video_ids = source.video_ids()[:size]
+                    source.discovered = size
+
+                # 수집 파이프라인의 쓰기 경로로 초기 카탈로그 저장
+                for batch in chunked(async_to_sync(fetch_all)(source, video_ids), 1_000):
+                    apply_create(batch)
+
+                for run in range(1, options['runs'] + 1):
+                    if isinstance(source, SyntheticSource):
+                        source.advance()
+
+                    if profiler:
+                        profiler.enable()
+                    with count_queries() as queries, timed() as timer:
+                        updated_count, created_videos = run_ingestion(source)
+                    if profiler:
+                        profiler.disable()
+
+                    self.stdout.write(
+                        f'{len(video_ids):>8}개 #{run}: {timer.elapsed:8.2f}s '
+                        f'(갱신 {updated_count}, 추가 {len(created_videos)}, 쿼리 {queries.count})'
+                    )
+
+        if profiler:
+            profiler.dump_stats(options['profile'])
+            pstats.Stats(profiler, stream=self.stdout).sort_stats('cumulative').print_stats(20)
+
+
+async def fetch_all(source, video_ids):
+    """소스에서 초기 스냅샷을 50개씩 받아옴"""
+    items = []
+    for batch in chunked(video_ids):
+        items += await source.videos_list(batch)
+    return items
@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from Assa_backend.benchmark import timed
+from shorts.scoring import DECAY_FUNCTIONS, calculate_trend_score, trend_scores
+
+
+class Command(BaseCommand):
+    help = '영상별 파이썬 루프와 NumPy 일괄 계산의 트렌드 점수 계산 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100_000, help='영상 수')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        size = options['size']
+        view_diffs = rng.integers(0, 100_000, size)
+        like_diffs = rng.integers(0, 5_000, size)
+        ages = rng.uniform(0, 24 * 30, size)
+
+        # 기존 방식: 영상마다 math.sqrt로 계산하던 루프
+        with timed() as loop_timer:
+            loop_scores = [
+                scalar_trend_score(view_diff, like_diff, age)
+                for view_diff, like_diff, age in zip(view_diffs.tolist(), like_diffs.tolist(), ages.tolist())
+            ]
+
+        with timed() as vector_timer:
+            vector_scores = trend_scores(view_diffs, like_diffs, ages)
+
+        assert np.allclose(loop_scores, vector_scores)
+        self.stdout.write(f'{size}개 영상 (sqrt)')
+        self.stdout.write(f'  영상별 루프:   {loop_timer.elapsed * 1000:9.2f}ms')
+        self.stdout.write(f'  NumPy 일괄:    {vector_timer.elapsed * 1000:9.2f}ms '
+                          f'({loop_timer.elapsed / vector_timer.elapsed:.0f}배)')
+
+        # 설정 기반 단건 함수도 영상마다 호출하면 배열 변환 비용이 반복됨
+        with timed() as scalar_timer:
+            for view_diff, like_diff, age in zip(view_diffs[:10_000], like_diffs[:10_000], ages[:10_000]):
+                calculate_trend_score(view_diff, like_diff, age)
+        self.stdout.write(f'  calculate_trend_score 단건 호출: {scalar_timer.elapsed / 10_000 * 1e6:.1f}us/영상')
+
+        for decay in sorted(DECAY_FUNCTIONS):
+            with timed() as timer:
+                trend_scores(view_diffs, like_diffs, ages, DECAY=decay)
+            self.stdout.write(f'  NumPy {decay:<12} {timer.elapsed * 1000:9.2f}ms')
+
+
+def scalar_trend_score(view_diff, like_diff, age_in_hours, w_v=1.0, w_l=2.0):
+    """이전 shorts.tasks.calculate_trend_score (비교 기준)"""
+    if age_in_hours <= 0:
+        age_in_hours = 1
+
+    return (view_diff * w_v + like_diff * w_l) / math.sqrt(age_in_hours)
@@ -0,0 +1,86 @@
+import random
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils.timezone import now
+
+from Assa_backend.benchmark import benchmark_database, timed
+from shorts.models import Video
+from shorts.search import rebuild_index, rebuild_ranked_index, search_videos
+
+# 제목/설명을 만들 단어 (앞쪽 단어일수록 자주 등장)
+WORDS = [
+    '쇼츠', '브이로그', '먹방', '게임', '고양이', '강아지', '여행', '요리', '댄스', '커버', '리뷰', '운동',
+    '메이크업', '챌린지', '일상', '음악', '축구', '야구', '코미디', '실험', 'shorts', 'vlog', 'asmr', 'funny',
+    'cat', 'dog', 'travel', 'recipe', 'dance', 'cover', 'review', 'workout', 'makeup', 'challenge', 'music',
+]
+PARTICLES = ['', '', '를', '의', '에서', '하는']
+
+
+class Command(BaseCommand):
+    help = '전문 검색 역색인(shorts.search)과 icontains 필터의 검색 시간을 비교합니다. (임시 DB 사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=1_000_000, help='영상 수')
+        parser.add_argument('--repeat', type=int, default=20, help='검색어별 반복 횟수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-ms', type=float, default=10.0,
+                            help='역색인 검색 중앙값 상한 (넘는 검색어가 있으면 실패)')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            with timed() as seed_timer:
+                self.seed(options)
+            with timed() as index_timer:
+                rebuild_index()
+            with timed() as ranked_timer:
+                rebuild_ranked_index()
+            self.stdout.write(f'영상 {options["videos"]}개 생성 ({seed_timer.elapsed:.1f}s), '
+                              f'색인 ({index_timer.elapsed:.1f}s), 순위 역색인 재생성 ({ranked_timer.elapsed:.2f}s)')
+
+            queries = ['쇼츠', '고양이 먹방', 'asmr', 'challenge dance', '실험 야구 일상', '메이크업', '없는단어']
+            slow = []
+            for query in queries:
+                times = []
+                for _ in range(options['repeat']):
+                    with timed() as timer:
+                        results = search_videos(query, 10)
+                    times.append(timer.elapsed)
+                median_ms = statistics.median(times) * 1000
+                self.stdout.write(f'  {query!r:<22} 역색인 중앙값 {median_ms:8.2f}ms '
+                                  f'(최대 {max(times) * 1000:.2f}ms, 결과 {len(results)}개)')
+                if median_ms > options['max_ms']:
+                    slow.append(f'{query!r} {median_ms:.2f}ms')
+
+            # 기존 방식: 제목/설명 icontains (매칭이 드물수록 테이블 전체를 스캔)
+            for query in [queries[0], queries[1], queries[4], queries[-1]]:
+                condition = Q()
+                for term in query.split():
+                    condition &= Q(title__icontains=term) | Q(description__icontains=term)
+                with timed() as timer:
+                    list(Video.objects.filter(condition).order_by('-trend_score').values('video_id')[:10])
+                self.stdout.write(f'  {query!r:<22} icontains     {timer.elapsed * 1000:8.2f}ms')
+
+        if slow:
+            raise CommandError(f'검색 중앙값이 {options["max_ms"]}ms를 넘었습니다: {", ".join(slow)}')
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+        published_at = now()
+
+        def text(count):
+            words = rng.choices(WORDS, weights, k=count)
+            return ' '.join(word + rng.choice(PARTICLES) for word in words)
+
+        batch = []
+        for i in range(options['videos']):
+            batch.append(Video(
+                video_id=f'search{i:07d}', title=text(rng.randint(2, 6)), description=text(rng.randint(0, 15)),
+                published_at=published_at, trend_score=int(rng.paretovariate(1.5) * 100),
+            ))
+            if len(batch) == 10_000:
+                Video.objects.bulk_create(batch)
+                batch = []
+        Video.objects.bulk_create(batch)
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shorts.export import ENCODERS, RAW, RESOLUTIONS, export_stream
+from shorts.views import parse_time
+
+
+class Command(BaseCommand):
+    help = '통계 이력을 NDJSON/CSV로 내보냅니다. (행 수와 관계없이 메모리 사용량 일정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(ENCODERS), default='ndjson')
+        parser.add_argument('--resolution', choices=RESOLUTIONS, default=RAW,
+                            help='raw: 원본 이력, hour/day: 압축 통계')
+        parser.add_argument('--video', action='append', dest='video_ids', default=[], help='video_id (여러 번 지정 가능)')
+        parser.add_argument('--start', help='ISO 8601 시작 시각 (포함)')
+        parser.add_argument('--end', help='ISO 8601 끝 시각 (제외)')
+        parser.add_argument('--gzip', action='store_true', help='gzip으로 압축')
+        parser.add_argument('--output', '-o', help='저장할 파일 경로 (기본값: 표준 출력)')
+
+    def handle(self, *args, **options):
+        try:
+            start = parse_time(options['start']) if options['start'] else None
+            end = parse_time(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(e)
+
+        chunks = export_stream(
+            options['format'], options['gzip'],
+            resolution=options['resolution'], video_ids=options['video_ids'], start=start, end=end,
+        )
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shorts.snapshots import publish
+
+
+class Command(BaseCommand):
+    help = '트렌드 목록과 증가량 순위 정적 스냅샷(JSON)을 다시 씁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help='스냅샷 디렉터리 (기본값: settings.FEED_SNAPSHOTS["ROOT"])')
+
+    def handle(self, *args, **options):
+        result = publish(options['root'])
+        if result is None:
+            raise CommandError('FEED_SNAPSHOT_DIR 또는 --root로 스냅샷 디렉터리를 지정하세요.')
+        self.stdout.write(self.style.SUCCESS(
+            f"스냅샷 {len(result['written'])}개를 썼습니다. ({len(result['unchanged'])}개 변경 없음)"
+        ))
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shorts.rankings import rebuild_from_history
+
+
+class Command(BaseCommand):
+    help = '최근 24시간 이력으로 1h/6h/24h 증가량(VideoGrowth)을 다시 만듭니다. (배포 직후, 수집 중단 후)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_from_history()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{count}개 영상의 증가량을 다시 만들었습니다. ({elapsed:.2f}s)'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from shorts.leaderboard import get_leaderboard, iter_db_entries, rebuild_from_db
+from shorts.snapshots import publish_safely
+
+
+class Command(BaseCommand):
+    help = '트렌드 순위표가 DB와 일치하는지 확인하고 DB 기준으로 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=100, help='비교할 상위 영상 수')
+        parser.add_argument('--check-only', action='store_true', help='비교 결과만 출력하고 다시 만들지 않음')
+
+    def handle(self, *args, **options):
+        leaderboard = get_leaderboard()
+        top = options['top']
+
+        expected = [(video_id, score) for video_id, score, _ in iter_db_entries(top)]
+        actual = [(video_id, score) for video_id, score, _ in leaderboard.top(top)]
+        mismatches = [
+            (rank, expected_entry, actual_entry)
+            for rank, (expected_entry, actual_entry) in enumerate(zip(expected, actual), start=1)
+            if expected_entry[1] != actual_entry[1]  # 동점 영상의 순서 차이는 무시
+        ]
+
+        self.stdout.write(f'{type(leaderboard).__name__}: 상위 {top}개 중 불일치 {len(mismatches)}개'
+                          f' (DB {len(expected)}개, 순위표 {len(actual)}개)')
+        for rank, (expected_id, expected_score), (actual_id, actual_score) in mismatches[:20]:
+            self.stdout.write(f'  {rank}위: DB {expected_id}({expected_score}) / 순위표 {actual_id}({actual_score})')
+
+        if options['check_only']:
+            return
+
+        leaderboard = rebuild_from_db()
+        publish_safely()
+        self.stdout.write(self.style.SUCCESS(f'순위표를 DB 기준으로 다시 만들었습니다. ({leaderboard.size()}개)'))
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shorts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Video 전체로 제목/설명 전문 검색 역색인(SQLite FTS5)을 다시 만듭니다.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{count}개 영상을 다시 색인했습니다. ({elapsed:.2f}s)'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shorts.scoring import DECAY_FUNCTIONS, rescore_catalog
+
+
+class Command(BaseCommand):
+    help = 'VideoStatsHistory의 최근 두 샘플로 전체 영상의 트렌드 점수를 다시 계산합니다. (settings.TREND_SCORE 변경 후 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view-weight', type=float, help='settings.TREND_SCORE의 VIEW_WEIGHT 대신 사용')
+        parser.add_argument('--like-weight', type=float, help='settings.TREND_SCORE의 LIKE_WEIGHT 대신 사용')
+        parser.add_argument('--decay', choices=sorted(DECAY_FUNCTIONS), help='settings.TREND_SCORE의 DECAY 대신 사용')
+        parser.add_argument('--dry-run', action='store_true', help='계산만 하고 저장하지 않음')
+
+    def handle(self, *args, **options):
+        overrides = {
+            key: options[option]
+            for key, option in [('VIEW_WEIGHT', 'view_weight'), ('LIKE_WEIGHT', 'like_weight'), ('DECAY', 'decay')]
+            if options[option] is not None
+        }
+
+        started = time.perf_counter()
+        count = rescore_catalog(dry_run=options['dry_run'], **overrides)
+        elapsed = time.perf_counter() - started
+
+        action = '계산' if options['dry_run'] else '다시 계산해 저장'
+        self.stdout.write(self.style.SUCCESS(f'{count}개 영상의 트렌드 점수를 {action}했습니다. ({elapsed:.2f}s)'))
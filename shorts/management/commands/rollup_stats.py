@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from shorts.rollups import run_rollups
+
+
+class Command(BaseCommand):
+    help = '통계 이력을 시간/일 단위로 압축하고 보존 기간이 지난 원본을 삭제합니다. (settings.STATS_HISTORY)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = run_rollups()
+        elapsed = time.perf_counter() - started
+
+        deleted = result['deleted']
+        self.stdout.write(self.style.SUCCESS(
+            f"시간 통계 {result['hour']}개, 일 통계 {result['day']}개를 저장하고 "
+            f"원본 {deleted['raw']}개, 시간 통계 {deleted['hour']}개를 삭제했습니다. ({elapsed:.2f}s)"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0003_quotausage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='trend_score',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+    ]
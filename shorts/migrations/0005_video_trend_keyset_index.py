@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0004_video_trend_score_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='trend_score',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['trend_score', 'video_id'], name='video_trend_keyset_idx'),
+        ),
+    ]
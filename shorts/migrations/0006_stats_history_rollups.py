@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0005_video_trend_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('hour', '시간'), ('day', '일')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('view_count', models.BigIntegerField(default=0)),
+                ('like_count', models.BigIntegerField(default=0)),
+                ('trend_score', models.BigIntegerField(default=0)),
+                ('samples', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='videostatshistory',
+            name='video',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stats_history', to='shorts.video'),
+        ),
+        migrations.AddIndex(
+            model_name='videostatshistory',
+            index=models.Index(fields=['video', 'collected_at'], name='history_video_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videostatshistory',
+            index=models.Index(fields=['collected_at'], name='history_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='videostatsrollup',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollups', to='shorts.video'),
+        ),
+        migrations.AddIndex(
+            model_name='videostatsrollup',
+            index=models.Index(fields=['resolution', 'bucket_start'], name='rollup_resolution_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='videostatsrollup',
+            constraint=models.UniqueConstraint(fields=('video', 'resolution', 'bucket_start'), name='unique_stats_rollup'),
+        ),
+    ]
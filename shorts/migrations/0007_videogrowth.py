@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0006_stats_history_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoGrowth',
+            fields=[
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='growth', serialize=False, to='shorts.video')),
+                ('sampled_at', models.DateTimeField()),
+                ('view_growth_1h', models.BigIntegerField(default=0)),
+                ('like_growth_1h', models.BigIntegerField(default=0)),
+                ('view_growth_6h', models.BigIntegerField(default=0)),
+                ('like_growth_6h', models.BigIntegerField(default=0)),
+                ('view_growth_24h', models.BigIntegerField(default=0)),
+                ('like_growth_24h', models.BigIntegerField(default=0)),
+                ('checkpoints', models.JSONField(default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['view_growth_1h'], name='growth_view_1h_idx'), models.Index(fields=['view_growth_6h'], name='growth_view_6h_idx'), models.Index(fields=['view_growth_24h'], name='growth_view_24h_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0007_videogrowth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('owner', models.UUIDField(blank=True, null=True)),
+                ('acquired_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('runs', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('takeovers', models.IntegerField(default=0)),
+                ('last_skipped_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0008_ingestionlock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscoveryQueryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('searches', models.IntegerField(default=0)),
+                ('results', models.IntegerField(default=0)),
+                ('new_videos', models.IntegerField(default=0)),
+                ('last_searched_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+FTS_TABLE = 'shorts_video_fts'
+POSTGRES_INDEX = 'video_search_idx'
+POSTGRES_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+def create_search_index(apps, schema_editor):
+    """전문 검색 역색인 생성 (shorts.search)"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, tokenize='unicode61', prefix='2 3 4')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            f"SELECT id, coalesce(title, ''), coalesce(description, '') FROM shorts_video"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"CREATE INDEX {POSTGRES_INDEX} ON shorts_video USING GIN ({POSTGRES_DOCUMENT})")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0009_discoveryquerystats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+RANKED_TABLE = 'shorts_video_fts_ranked'
+RANKED_SIZE = 50_000
+
+
+def create_ranked_index(apps, schema_editor):
+    """트렌드 점수 상위 영상만 담은 순위 역색인 생성 (rowid = 트렌드 순위, shorts.search)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {RANKED_TABLE} USING fts5("
+        f"title, description, video_pk UNINDEXED, tokenize='unicode61', prefix='2 3 4')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {RANKED_TABLE} (rowid, title, description, video_pk) "
+        f"SELECT row_number() OVER (ORDER BY trend_score DESC, video_id DESC), "
+        f"coalesce(title, ''), coalesce(description, ''), id "
+        f"FROM (SELECT id, video_id, title, description, trend_score FROM shorts_video "
+        f"ORDER BY trend_score DESC, video_id DESC LIMIT {RANKED_SIZE})"
+    )
+
+
+def drop_ranked_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {RANKED_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorts', '0010_video_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_ranked_index, drop_ranked_index),
+    ]
@@ -17,6 +17,16 @@ class Video(models.Model):
     like_diff = models.BigIntegerField(default=0)  # 좋아요 증가량
     trend_score = models.BigIntegerField(default=0)
 
+    # 갱신 스케줄 (shorts.scheduler)
+    last_refreshed_at = models.DateTimeField(null=True, blank=True)  # 마지막으로 통계를 수집한 시각
+    next_refresh_at = models.DateTimeField(null=True, blank=True, db_index=True)  # 다음 갱신 예정 시각
+
+    class Meta:
+        indexes = [
+            # 트렌드 목록 정렬과 커서 페이지네이션 (shorts.leaderboard)
+            models.Index(fields=['trend_score', 'video_id'], name='video_trend_keyset_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -26,11 +36,127 @@ class VideoStatsHistory(models.Model):
     영상의 통계 정보 이력 저장 테이블
     주기적으로 수집할 때마다 저장
     """
-    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='stats_history')
+    # video 단독 인덱스는 (video, collected_at) 복합 인덱스가 대신함
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='stats_history', db_index=False)
     collected_at = models.DateTimeField(auto_now_add=True)  # 통계를 수집한 시각
     view_count = models.BigIntegerField(default=0)
     like_count = models.BigIntegerField(default=0)
     trend_score = models.BigIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', 'collected_at'], name='history_video_time_idx'),  # 영상별 이력 조회
+            models.Index(fields=['collected_at'], name='history_time_idx'),  # 압축과 보존 기간 삭제 (shorts.rollups)
+        ]
+
     def __str__(self):
         return f"{self.video.title} / {self.collected_at}"
+
+
+class VideoStatsRollup(models.Model):
+    """
+    VideoStatsHistory를 시간/일 단위로 압축한 통계 (shorts.rollups)
+    원본 이력은 보존 기간이 지나면 삭제되고 압축된 통계만 남는다.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = [(HOUR, '시간'), (DAY, '일')]
+
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='stats_rollups')
+    resolution = models.CharField(max_length=4, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()  # 구간 시작 시각 (UTC 기준 정각/자정)
+    view_count = models.BigIntegerField(default=0)  # 구간의 마지막 조회수 (누적값이라 최댓값)
+    like_count = models.BigIntegerField(default=0)
+    trend_score = models.BigIntegerField(default=0)  # 구간 내 최고 트렌드 점수
+    samples = models.IntegerField(default=0)  # 압축한 원본 샘플 수
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'resolution', 'bucket_start'], name='unique_stats_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start'], name='rollup_resolution_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.video.title} / {self.resolution} / {self.bucket_start}"
+
+
+class VideoGrowth(models.Model):
+    """
+    영상별 최근 1시간/6시간/24시간 조회수·좋아요 증가량 (shorts.rankings)
+    수집할 때마다 증분 갱신되므로 증가량 순위를 조회할 때 이력을 읽지 않는다.
+    """
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, primary_key=True, related_name='growth')
+    sampled_at = models.DateTimeField()  # 마지막으로 반영한 샘플의 수집 시각
+    view_growth_1h = models.BigIntegerField(default=0)
+    like_growth_1h = models.BigIntegerField(default=0)
+    view_growth_6h = models.BigIntegerField(default=0)
+    like_growth_6h = models.BigIntegerField(default=0)
+    view_growth_24h = models.BigIntegerField(default=0)
+    like_growth_24h = models.BigIntegerField(default=0)
+    # 창별 기준점 {'1h': [[epoch 초, 조회수, 좋아요], ...], ...} (오래된 순)
+    checkpoints = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['view_growth_1h'], name='growth_view_1h_idx'),
+            models.Index(fields=['view_growth_6h'], name='growth_view_6h_idx'),
+            models.Index(fields=['view_growth_24h'], name='growth_view_24h_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.video.title} / {self.sampled_at}"
+
+
+class QuotaUsage(models.Model):
+    """
+    유튜브 API 할당량 사용 장부
+    수집 실행마다 엔드포인트별로 한 행씩 저장 (shorts.quota)
+    """
+    run_id = models.UUIDField(db_index=True)  # 수집 실행 ID
+    quota_date = models.DateField(db_index=True)  # 할당량 기준일 (태평양 시간)
+    endpoint = models.CharField(max_length=50)  # 'videos.list', 'search.list'
+    calls = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)  # 소모한 할당량 단위
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.quota_date} / {self.endpoint} / {self.units}"
+
+
+class IngestionLock(models.Model):
+    """
+    수집 실행 단일화 잠금 (shorts.locks)
+    cron과 Celery가 동시에 수집을 시작해도 리스를 가진 하나만 실행하고, 나머지는 건너뛴 횟수만 남긴다.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    owner = models.UUIDField(null=True, blank=True)  # 현재 리스를 가진 실행 ID (없으면 비어 있음)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)  # 갱신되지 않으면 이 시각 이후 다른 실행이 가져감
+    runs = models.IntegerField(default=0)  # 잠금을 얻어 실행한 횟수
+    skipped = models.IntegerField(default=0)  # 이전 실행이 끝나지 않아 건너뛴 횟수
+    takeovers = models.IntegerField(default=0)  # 만료된 리스를 가져온 횟수 (이전 실행이 비정상 종료)
+    last_skipped_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True)  # 마지막 실행 시간 (초)
+
+    def __str__(self):
+        return f"{self.name} / {self.owner}"
+
+
+class DiscoveryQueryStats(models.Model):
+    """
+    새 영상 검색(settings.SHORTS_DISCOVERY['QUERIES'])별 누적 수율 (shorts.discovery)
+    """
+    name = models.CharField(max_length=50, unique=True)
+    searches = models.IntegerField(default=0)  # search.list 호출 수
+    results = models.IntegerField(default=0)  # 검색 결과 영상 수
+    new_videos = models.IntegerField(default=0)  # 그중 저장되지 않은 영상 수
+    last_searched_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def new_per_search(self):
+        return self.new_videos / self.searches if self.searches else None
+
+    def __str__(self):
+        return f"{self.name} / {self.new_videos}/{self.searches}"
@@ -0,0 +1,150 @@
+# shorts/quota.py
+"""
+유튜브 Data API 할당량 장부와 실행 계획
+
+- 실행마다 엔드포인트별 호출 수와 소모 단위를 QuotaUsage에 기록
+- 다음 실행 전, 오늘 남은 할당량과 하루 페이스를 기준으로 이번 실행에서 쓸 수 있는 단위를 계산
+- 여유가 없으면 검색(100단위)을 먼저 빼고, 그래도 부족하면 덜 급한 영상 갱신을 줄인다
+- 검색은 실행 할당량의 DISCOVERY_SHARE 이내에서만 한다
+할당량은 태평양 시간 자정에 초기화된다.
+"""
+import math
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils.timezone import now
+
+from shorts.models import QuotaUsage
+
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# 호출 1회당 소모 단위
+ENDPOINT_COSTS = {
+    'videos.list': 1,
+    'search.list': 100,
+}
+
+# 검색 1회 = search.list 1번 + 새 영상 통계 조회 videos.list 1번
+DISCOVERY_COST = ENDPOINT_COSTS['search.list'] + ENDPOINT_COSTS['videos.list']
+
+
+def get_quota_setting(name):
+    return settings.YOUTUBE_QUOTA[name]
+
+
+def quota_date(at=None):
+    """at 시각이 속한 할당량 기준일"""
+    return (at or now()).astimezone(QUOTA_TIMEZONE).date()
+
+
+def quota_day_bounds(at=None):
+    """(오늘 할당량 시작 시각, 다음 초기화 시각)"""
+    day = quota_date(at)
+    started_at = datetime.combine(day, time.min, tzinfo=QUOTA_TIMEZONE)
+    return started_at, datetime.combine(day + timedelta(days=1), time.min, tzinfo=QUOTA_TIMEZONE)
+
+
+def spent_units(at=None):
+    return QuotaUsage.objects.filter(quota_date=quota_date(at)).aggregate(total=Sum('units'))['total'] or 0
+
+
+def record_usage(run_id, usage, at=None):
+    """
+    한 실행의 엔드포인트별 호출 수를 장부에 기록
+    :param usage: {'videos.list': 호출 수, ...}
+    """
+    day = quota_date(at)
+    QuotaUsage.objects.bulk_create([
+        QuotaUsage(
+            run_id=run_id, quota_date=day, endpoint=endpoint,
+            calls=calls, units=calls * ENDPOINT_COSTS.get(endpoint, 1),
+        )
+        for endpoint, calls in usage.items() if calls
+    ])
+
+
+class QuotaPlan:
+    """이번 실행에서 허용된 작업량"""
+
+    def __init__(self, allowance, refresh_limit, searches):
+        self.allowance = allowance          # 이번 실행에서 쓸 수 있는 단위
+        self.refresh_limit = refresh_limit  # 갱신할 수 있는 최대 영상 수
+        self.searches = searches            # 보낼 수 있는 최대 search.list 호출 수
+
+    @property
+    def discovery(self):
+        """새 영상 검색 여부"""
+        return self.searches > 0
+
+    def __repr__(self):
+        return (f"QuotaPlan(allowance={self.allowance}, refresh_limit={self.refresh_limit}, "
+                f"searches={self.searches})")
+
+
+def run_allowance(at=None):
+    """
+    이번 실행에서 쓸 수 있는 단위
+    하루 할당량을 시간에 비례해 나눈 페이스 + BURST_UNITS 여유분까지만 허용해
+    오후에 할당량이 바닥나지 않도록 한다. 페이스보다 덜 썼다면 그만큼 쌓인다.
+    """
+    at = at or now()
+    daily_limit = get_quota_setting('DAILY_LIMIT')
+    started_at, reset_at = quota_day_bounds(at)
+    elapsed_fraction = (at - started_at) / (reset_at - started_at)
+
+    spent = spent_units(at)
+    paced = daily_limit * elapsed_fraction + get_quota_setting('BURST_UNITS') - spent
+    return max(int(min(daily_limit - spent, paced)), 0)
+
+
+def plan_run(due_count, batch_size, at=None):
+    """
+    :param due_count: 갱신 시기가 된 영상 수 (실행당 예산으로 이미 제한된 값)
+    :param batch_size: videos.list 1회에 조회하는 영상 수
+    """
+    allowance = run_allowance(at)
+    refresh_calls = math.ceil(due_count / batch_size) * ENDPOINT_COSTS['videos.list']
+
+    # 1순위로 검색을 뺌 (갱신 후 남은 단위와 실행 할당량의 DISCOVERY_SHARE 중 작은 값 이내)
+    discovery_units = min(allowance - refresh_calls, int(allowance * get_quota_setting('DISCOVERY_SHARE')))
+    searches = max(discovery_units // DISCOVERY_COST, 0)
+    # 그래도 부족하면 갱신 수를 줄임 (스케줄러가 덜 급한 영상을 뒤로 보냄)
+    refresh_limit = min(due_count, allowance // ENDPOINT_COSTS['videos.list'] * batch_size)
+    return QuotaPlan(allowance, refresh_limit, searches)
+
+
+def quota_metrics(at=None):
+    """대시보드용 할당량 지표"""
+    at = at or now()
+    day = quota_date(at)
+    daily_limit = get_quota_setting('DAILY_LIMIT')
+    _, reset_at = quota_day_bounds(at)
+
+    today = QuotaUsage.objects.filter(quota_date=day)
+    by_endpoint = {
+        row['endpoint']: {'calls': row['calls'], 'units': row['units']}
+        for row in today.values('endpoint').annotate(calls=Sum('calls'), units=Sum('units'))
+    }
+    spent = sum(row['units'] for row in by_endpoint.values())
+    last_hour = today.filter(recorded_at__gte=at - timedelta(hours=1)).aggregate(total=Sum('units'))['total'] or 0
+
+    remaining = max(daily_limit - spent, 0)
+    if last_hour and remaining:
+        exhausted_at = at + timedelta(hours=remaining / last_hour)
+        projected_exhaustion_at = exhausted_at if exhausted_at < reset_at else None
+    else:
+        projected_exhaustion_at = at if not remaining else None
+
+    return {
+        'quota_date': day,
+        'daily_limit': daily_limit,
+        'spent_units': spent,
+        'remaining_units': remaining,
+        'spend_rate_per_hour': last_hour,
+        'projected_exhaustion_at': projected_exhaustion_at,
+        'resets_at': reset_at,
+        'run_allowance': run_allowance(at),
+        'by_endpoint': by_endpoint,
+    }
@@ -0,0 +1,125 @@
+# shorts/rankings.py
+"""
+최근 1시간/6시간/24시간 증가량 순위
+
+수집 파이프라인이 샘플을 저장할 때마다 VideoGrowth의 창별 증가량을 증분 갱신한다.
+    증가량 = 최신 누적값 - 창 시작 시각의 누적값
+
+창 시작 시각의 값은 영상마다 창별 기준점 목록(checkpoints)으로 유지한다.
+- 샘플이 들어오면 마지막 기준점 이후 창 길이의 1/CHECKPOINTS 이상 지났을 때만 기준점으로 추가
+- 창보다 오래된 기준점은 가장 최근 하나만 남기고 버림 -> 첫 기준점이 창 시작 시각 직전 값
+- 창 시작 시각의 값은 첫 기준점과 다음 기준점 사이를 선형 보간
+그래서 영상마다 창별 최대 CHECKPOINTS + 2개의 점만 저장한다.
+순위 조회는 증가량 인덱스만 읽는다.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from shorts.models import VideoGrowth
+from shorts.rollups import RAW, history_rows
+
+WINDOWS = {
+    '1h': timedelta(hours=1),
+    '6h': timedelta(hours=6),
+    '24h': timedelta(hours=24),
+}
+
+# 창별 기준점 수 (기준점 간격 = 창 길이 / CHECKPOINTS)
+CHECKPOINTS = 12
+
+GROWTH_FIELDS = [f'{metric}_growth_{window}' for window in WINDOWS for metric in ('view', 'like')]
+
+
+def advance(ring, at, view_count, like_count, window):
+    """
+    기준점 목록(ring)에 새 샘플을 반영
+    :param at: 샘플 수집 시각 (epoch 초)
+    :return: (조회수 증가량, 좋아요 증가량)
+    """
+    window_seconds = window.total_seconds()
+    if not ring or at - ring[-1][0] >= window_seconds / CHECKPOINTS:
+        ring.append([at, view_count, like_count])
+    while len(ring) >= 2 and ring[1][0] <= at - window_seconds:
+        ring.pop(0)
+
+    # 창 시작 시각의 값은 그 앞뒤 기준점(없으면 새 샘플) 사이를 선형 보간
+    start = at - window_seconds
+    anchor_at, anchor_views, anchor_likes = ring[0]
+    if anchor_at < start:
+        next_at, next_views, next_likes = ring[1] if len(ring) > 1 else (at, view_count, like_count)
+        fraction = (start - anchor_at) / (next_at - anchor_at)
+        anchor_views += (next_views - anchor_views) * fraction
+        anchor_likes += (next_likes - anchor_likes) * fraction
+    return int(view_count - anchor_views), int(like_count - anchor_likes)
+
+
+def apply_sample(growth, at, view_count, like_count):
+    """VideoGrowth 하나에 샘플 하나를 반영"""
+    epoch = int(at.timestamp())
+    for window, size in WINDOWS.items():
+        ring = growth.checkpoints.setdefault(window, [])
+        view_growth, like_growth = advance(ring, epoch, view_count, like_count, size)
+        setattr(growth, f'view_growth_{window}', view_growth)
+        setattr(growth, f'like_growth_{window}', like_growth)
+    growth.sampled_at = at
+
+
+def record_samples(videos, collected_at):
+    """
+    수집한 영상 배치의 새 샘플을 창별 증가량에 반영
+    (shorts.ingestion의 저장 트랜잭션 안에서 호출, 배치당 조회 1번 + upsert 1번)
+    """
+    existing = VideoGrowth.objects.in_bulk([video.pk for video in videos])
+    rows = []
+    for video in videos:
+        growth = existing.get(video.pk) or VideoGrowth(video_id=video.pk, checkpoints={})
+        apply_sample(growth, collected_at, video.view_count, video.like_count)
+        rows.append(growth)
+
+    VideoGrowth.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['video'],
+        update_fields=['sampled_at', 'checkpoints', *GROWTH_FIELDS],
+    )
+
+
+def growth_ranking(window, limit, at=None):
+    """
+    최근 window 동안 조회수가 가장 많이 늘어난 영상
+    window 안에 수집되지 않은 영상은 증가량을 알 수 없으므로 제외한다.
+    :return: VideoGrowth 리스트 (video 포함)
+    """
+    at = at or now()
+    return list(
+        VideoGrowth.objects
+        .filter(sampled_at__gte=at - WINDOWS[window])
+        .select_related('video')
+        .only('video__video_id', 'video__title', 'sampled_at', f'view_growth_{window}', f'like_growth_{window}')
+        .order_by(F(f'view_growth_{window}').desc())[:limit]
+    )
+
+
+def rebuild_from_history(at=None, chunk_size=10_000):
+    """
+    최근 이력으로 VideoGrowth를 다시 만듦 (배포 직후 또는 수집이 오래 멈췄을 때)
+    가장 긴 창 + 기준점 간격만큼의 이력을 영상/시간 순으로 한 번 읽는다.
+    :return: 다시 만든 영상 수
+    """
+    at = at or now()
+    longest = max(WINDOWS.values())
+    # 원본 보존 기간(RAW_RETENTION_DAYS)이 가장 긴 창보다 길어 원본만 읽음
+    samples = history_rows(RAW, at - longest - longest / CHECKPOINTS, at + timedelta(microseconds=1))
+
+    rows, growth = [], None
+    for video_pk, collected_at, view_count, like_count, _ in samples.iterator(chunk_size=chunk_size):
+        if growth is None or growth.video_id != video_pk:
+            growth = VideoGrowth(video_id=video_pk, checkpoints={})
+            rows.append(growth)
+        apply_sample(growth, collected_at, view_count, like_count)
+
+    with transaction.atomic():
+        VideoGrowth.objects.all().delete()
+        VideoGrowth.objects.bulk_create(rows, batch_size=2_000)
+    return len(rows)
@@ -0,0 +1,124 @@
+# shorts/response_cache.py
+"""
+trending_videos 응답 캐시
+
+수집 실행 사이에는 트렌드 목록이 바뀌지 않으므로 직렬화한 응답 본문(과 다음 페이지 커서)을 쿼리 파라미터별로 캐시한다.
+- 수집이 끝날 때마다 bump_version()으로 버전을 올려 이전 캐시를 즉시 무효화
+  (버전 값은 갱신 시각(ms)이라 Last-Modified로도 사용)
+- ETag / Last-Modified를 붙여 클라이언트가 304 응답을 받을 수 있게 함
+- 적중/실패 횟수를 세어 적중률 확인
+
+여러 프로세스(웹 서버, 수집 작업)가 같은 버전을 보려면 CACHES가 Redis 같은 공유 캐시여야 한다.
+로컬 메모리 캐시에서는 수집 작업이 올린 버전이 웹 서버에 보이지 않아 이전 목록과 304를 계속 돌려주므로,
+TRENDING_CACHE['REQUIRE_SHARED']가 켜져 있으면 응답 캐시와 ETag / Last-Modified를 쓰지 않는다.
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'shorts:trending:version'
+HITS_KEY = 'shorts:trending:hits'
+MISSES_KEY = 'shorts:trending:misses'
+
+_warned = False
+
+
+def is_enabled():
+    """공유 캐시일 때만 사용 (REQUIRE_SHARED가 꺼져 있으면 항상 사용)"""
+    global _warned
+    if not settings.TRENDING_CACHE['REQUIRE_SHARED'] or not isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return True
+    if not _warned:
+        _warned = True
+        logger.warning("CACHES가 프로세스 내 캐시라 trending_videos 응답 캐시를 사용하지 않습니다. (REDIS_CACHE_URL 설정 필요)")
+    return False
+
+
+def bump_version():
+    """트렌드 목록이 바뀌었음을 알림 (이전 버전의 캐시는 더 이상 읽히지 않음)"""
+    version = int(time.time() * 1000)
+    cache.set(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def params_digest(request):
+    """쿼리 파라미터 순서와 무관한 키"""
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    return hashlib.md5(urlencode(params).encode()).hexdigest()[:16]
+
+
+def cache_key(request, version):
+    return f'shorts:trending:{version}:{params_digest(request)}'
+
+
+def etag(request, *args, **kwargs):
+    if not is_enabled():
+        return None
+    return f'"{get_version()}-{params_digest(request)}"'
+
+
+def last_modified(request, *args, **kwargs):
+    if not is_enabled():
+        return None
+    return datetime.fromtimestamp(get_version() / 1000, tz=timezone.utc)
+
+
+def get_or_render(request, render):
+    """
+    현재 버전의 캐시된 응답을 반환하고, 없으면 render()로 만들어 저장
+    :param render: 응답 본문과 헤더 값 등 캐시할 값을 만드는 함수 (pickle 가능해야 함)
+    """
+    if not is_enabled():
+        return render()
+
+    key = cache_key(request, get_version())
+    body = cache.get(key)
+    if body is not None:
+        count(HITS_KEY)
+        return body
+
+    count(MISSES_KEY)
+    body = render()
+    cache.set(key, body, timeout=settings.TRENDING_CACHE['TIMEOUT'])
+    return body
+
+
+def count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    version = get_version()
+    return {
+        'enabled': is_enabled(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+        'version': version,
+        'last_modified': http_date(version / 1000),
+    }
@@ -0,0 +1,243 @@
+# shorts/rollups.py
+"""
+VideoStatsHistory 압축과 보존 기간 관리
+
+수집은 갱신할 때마다 영상별로 한 행씩 VideoStatsHistory에 쌓는다.
+- 끝난 시간 구간의 원본 샘플을 영상별 시간 통계(VideoStatsRollup HOUR)로 압축
+- 끝난 날의 시간 통계를 일 통계(DAY)로 압축
+- RAW_RETENTION_DAYS가 지난 원본, HOURLY_RETENTION_DAYS가 지난 시간 통계는 삭제 (일 통계는 계속 보존)
+  아직 압축되지 않은 구간은 보존 기간이 지나도 삭제하지 않는다.
+
+조회수/좋아요는 누적값이므로 구간의 최댓값을 구간 마지막 값으로 저장한다.
+압축이 끝난 뒤에 커밋된 늦은 샘플도 반영되도록 실행마다 마지막 LATE_BUCKETS개 구간을 다시 압축한다. (upsert)
+이력 조회는 load_history()가 기간에 맞는 해상도(원본/시간/일)를 골라 읽는다. (shorts.growth도 같은 함수로 읽음)
+"""
+from datetime import timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils.timezone import now
+
+from shorts.models import VideoStatsHistory, VideoStatsRollup
+
+RAW = 'raw'
+HOUR = VideoStatsRollup.HOUR
+DAY = VideoStatsRollup.DAY
+
+BUCKET_SIZES = {
+    HOUR: timedelta(hours=1),
+    DAY: timedelta(days=1),
+}
+
+# 해상도별 대략적인 샘플 간격 (load_history가 포인트 수를 어림할 때 사용)
+SAMPLE_STEPS = {
+    RAW: timedelta(minutes=1),
+    HOUR: BUCKET_SIZES[HOUR],
+    DAY: BUCKET_SIZES[DAY],
+}
+
+HISTORY_FIELDS = ['view_count', 'like_count', 'trend_score']
+
+
+def get_history_setting(name):
+    return settings.STATS_HISTORY[name]
+
+
+def truncate(at, resolution):
+    """at이 속한 구간의 시작 시각 (UTC)"""
+    at = at.astimezone(timezone.utc)
+    if resolution == HOUR:
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def retention(resolution):
+    """해상도별 보존 기간 (None이면 계속 보존)"""
+    if resolution == RAW:
+        return timedelta(days=get_history_setting('RAW_RETENTION_DAYS'))
+    if resolution == HOUR:
+        return timedelta(days=get_history_setting('HOURLY_RETENTION_DAYS'))
+    return None
+
+
+def rolled_up_until(resolution):
+    """압축이 끝난 마지막 구간의 끝 시각 (압축한 적이 없으면 None)"""
+    last = VideoStatsRollup.objects.filter(resolution=resolution).aggregate(last=Max('bucket_start'))['last']
+    return last + BUCKET_SIZES[resolution] if last else None
+
+
+def source_rows(resolution, start, end):
+    """[start, end) 구간의 원본을 영상/구간별로 집계하는 쿼리"""
+    if resolution == HOUR:
+        return (
+            VideoStatsHistory.objects
+            .filter(collected_at__gte=start, collected_at__lt=end)
+            .annotate(bucket_start=TruncHour('collected_at', tzinfo=timezone.utc))
+            .values('video_id', 'bucket_start')
+            .annotate(view_count=Max('view_count'), like_count=Max('like_count'),
+                      trend_score=Max('trend_score'), samples=Count('id'))
+        )
+    return (
+        VideoStatsRollup.objects
+        .filter(resolution=HOUR, bucket_start__gte=start, bucket_start__lt=end)
+        .annotate(day=TruncDay('bucket_start', tzinfo=timezone.utc))
+        .values('video_id', 'day')
+        .annotate(view_count=Max('view_count'), like_count=Max('like_count'),
+                  trend_score=Max('trend_score'), samples=Sum('samples'))
+    )
+
+
+def first_source_time(resolution, after=None):
+    """압축할 원본 중 가장 이른 시각"""
+    if resolution == HOUR:
+        queryset, field = VideoStatsHistory.objects.all(), 'collected_at'
+    else:
+        queryset, field = VideoStatsRollup.objects.filter(resolution=HOUR), 'bucket_start'
+    if after is not None:
+        queryset = queryset.filter(**{f'{field}__gte': after})
+    return queryset.aggregate(first=Min(field))['first']
+
+
+def rollup(resolution, at=None, batch_size=2_000):
+    """
+    끝난 구간을 압축해 VideoStatsRollup에 저장
+    구간 하나씩 읽고 (video, resolution, bucket_start) 기준으로 upsert하므로 다시 실행해도 안전하다.
+    :return: 저장한 행 수
+    """
+    size = BUCKET_SIZES[resolution]
+    end = truncate(at or now(), resolution)  # 진행 중인 구간은 제외
+    until = rolled_up_until(resolution)
+    # 이미 압축한 구간에 늦게 커밋된 샘플이 있을 수 있으므로 마지막 LATE_BUCKETS개 구간부터 다시 압축
+    start = until - size * get_history_setting('LATE_BUCKETS')[resolution] if until else first_source_time(resolution)
+
+    written = 0
+    while start is not None and start < end:
+        start = truncate(start, resolution)
+        window_end = start + size
+        rows = [
+            VideoStatsRollup(
+                video_id=row['video_id'],
+                resolution=resolution,
+                bucket_start=row['bucket_start'] if resolution == HOUR else row['day'],
+                view_count=row['view_count'],
+                like_count=row['like_count'],
+                trend_score=row['trend_score'],
+                samples=row['samples'],
+            )
+            for row in source_rows(resolution, start, window_end)
+        ]
+        if rows:
+            VideoStatsRollup.objects.bulk_create(
+                rows, batch_size=batch_size, update_conflicts=True,
+                unique_fields=['video', 'resolution', 'bucket_start'],
+                update_fields=['view_count', 'like_count', 'trend_score', 'samples'],
+            )
+            written += len(rows)
+            start = window_end
+        else:
+            # 비어 있는 구간은 건너뛰고 다음 원본이 있는 구간으로
+            start = first_source_time(resolution, after=window_end)
+    return written
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """긴 쓰기 잠금을 피하려고 chunk_size개씩 나눠 삭제"""
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+
+def prune(at=None):
+    """
+    보존 기간이 지나고 이미 압축된 원본/시간 통계를 삭제
+    :return: {'raw': 삭제한 원본 수, 'hour': 삭제한 시간 통계 수}
+    """
+    at = at or now()
+    chunk_size = get_history_setting('DELETE_CHUNK_SIZE')
+    deleted = {RAW: 0, HOUR: 0}
+
+    hourly_until = rolled_up_until(HOUR)
+    if hourly_until is not None:
+        cutoff = min(at - retention(RAW), hourly_until)
+        deleted[RAW] = delete_in_chunks(VideoStatsHistory.objects.filter(collected_at__lt=cutoff), chunk_size)
+
+    daily_until = rolled_up_until(DAY)
+    if daily_until is not None:
+        cutoff = min(at - retention(HOUR), daily_until)
+        deleted[HOUR] = delete_in_chunks(
+            VideoStatsRollup.objects.filter(resolution=HOUR, bucket_start__lt=cutoff), chunk_size
+        )
+    return deleted
+
+
+def run_rollups(at=None):
+    """시간 압축 -> 일 압축 -> 보존 기간 삭제 (정시마다 실행)"""
+    at = at or now()
+    return {
+        'hour': rollup(HOUR, at),
+        'day': rollup(DAY, at),
+        'deleted': prune(at),
+    }
+
+
+def select_resolution(start, end=None, at=None):
+    """
+    start부터의 이력을 읽을 해상도
+    start 시점의 데이터가 아직 남아 있고, 포인트 수가 MAX_POINTS를 넘지 않는 가장 세밀한 해상도
+    """
+    at = at or now()
+    end = end or at
+    max_points = get_history_setting('MAX_POINTS')
+    for resolution in (RAW, HOUR):
+        retained = start >= at - retention(resolution)
+        if retained and (end - start) / SAMPLE_STEPS[resolution] <= max_points:
+            return resolution
+    return DAY
+
+
+def history_rows(resolution, start, end, video=None):
+    """
+    [start, end) 이력 쿼리 (영상, 시각 순)
+    :param video: 영상 하나만 읽을 때 (None이면 모든 영상)
+    :return: (video_id, 시각, view_count, like_count, trend_score) values_list 쿼리
+    """
+    if resolution == RAW:
+        queryset, field = VideoStatsHistory.objects.all(), 'collected_at'
+    else:
+        queryset, field = VideoStatsRollup.objects.filter(resolution=resolution), 'bucket_start'
+    if video is not None:
+        queryset = queryset.filter(video=video)
+    return (
+        queryset
+        .filter(**{f'{field}__gte': start, f'{field}__lt': end})
+        .order_by('video_id', field)
+        .values_list('video_id', field, *HISTORY_FIELDS)
+    )
+
+
+def load_history(video, start, end=None, resolution=None):
+    """
+    영상의 [start, end) 이력
+    resolution의 압축 통계는 압축이 끝난 구간까지 읽고, 그 뒤는 더 세밀한 해상도(시간 통계 -> 원본)로 채운다.
+    :param resolution: RAW / HOUR / DAY (기본값: select_resolution)
+    :return: [{'at': 시각, 'view_count': ..., 'like_count': ..., 'trend_score': ...}, ...] 시간 순
+    """
+    end = end or now()
+    resolution = resolution or select_resolution(start, end)
+
+    history = []
+    cursor = start
+    for level in {DAY: (DAY, HOUR), HOUR: (HOUR,), RAW: ()}[resolution]:
+        until = rolled_up_until(level)
+        if until is None or until <= cursor:
+            continue
+        stop = min(until, end)
+        history += history_rows(level, cursor, stop, video)
+        cursor = stop
+    if cursor < end:
+        history += history_rows(RAW, cursor, end, video)
+    return [dict(zip(['at', *HISTORY_FIELDS], row[1:])) for row in history]
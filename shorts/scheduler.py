@@ -0,0 +1,80 @@
+# shorts/scheduler.py
+"""
+영상별 다음 갱신 시각을 정하는 스케줄러
+
+모든 영상을 매 실행마다 갱신하지 않고, 최근 증가 속도와 게시 후 경과 시간으로
+다음 갱신 시각(next_refresh_at)을 정한다.
+- 빠르게 크는 영상: TARGET_VIEW_DELTA 만큼 조회수가 쌓이는 시간마다 (최소 1분)
+- 게시된 지 얼마 안 된 영상: 아무리 느려도 YOUNG_MAX_INTERVAL_MINUTES 안에 한 번
+- 오래되고 정체된 영상: 최대 MAX_INTERVAL_MINUTES(하루)에 한 번
+실행당 갱신 수는 RUN_BUDGET(videos.list 호출 수)과 남은 할당량(shorts.quota)으로 제한하고,
+빠르게 크는 영상부터 처리한다.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import DurationField, ExpressionWrapper, F, Q
+
+from shorts.models import Video
+from shorts.scoring import get_trend_setting
+
+
+def get_schedule_setting(name):
+    return settings.SHORTS_REFRESH_SCHEDULE[name]
+
+
+def velocity_per_minute(view_diff, like_diff, elapsed_minutes, w_l=None):
+    """
+    직전 갱신 이후 분당 증가 속도 (좋아요는 트렌드 점수와 같은 가중치)
+    :param w_l: 좋아요 가중치 (기본값: settings.TREND_SCORE['LIKE_WEIGHT'])
+    """
+    if w_l is None:
+        w_l = get_trend_setting('LIKE_WEIGHT')
+    return max(view_diff + like_diff * w_l, 0) / max(elapsed_minutes, 1)
+
+
+def refresh_interval(velocity, age_in_hours):
+    """
+    다음 갱신까지의 간격(분)
+    :param velocity: 분당 증가 속도 (velocity_per_minute)
+    :param age_in_hours: 게시 후 경과 시간
+    """
+    min_interval = get_schedule_setting('MIN_INTERVAL_MINUTES')
+    if age_in_hours < get_schedule_setting('YOUNG_VIDEO_HOURS'):
+        max_interval = get_schedule_setting('YOUNG_MAX_INTERVAL_MINUTES')
+    else:
+        max_interval = get_schedule_setting('MAX_INTERVAL_MINUTES')
+
+    if velocity <= 0:
+        return max_interval
+
+    interval = get_schedule_setting('TARGET_VIEW_DELTA') / velocity
+    return min(max(interval, min_interval), max_interval)
+
+
+def schedule_next_refresh(collected_at, velocity, age_in_hours):
+    return collected_at + timedelta(minutes=refresh_interval(velocity, age_in_hours))
+
+
+def due_videos(at):
+    """at 시각 기준 갱신 시기가 된 영상 (아직 예약이 없는 영상 포함)"""
+    return Video.objects.filter(Q(next_refresh_at__isnull=True) | Q(next_refresh_at__lte=at))
+
+
+def due_video_pks(at, limit):
+    """
+    at 시각 기준 갱신 시기가 된 영상의 pk 목록
+    예산이 부족하면 덜 급한 영상이 잘리도록 아직 예약이 없는 영상, 갱신 간격이 짧은(빠르게 크는) 영상,
+    오래 밀린 영상 순으로 정렬
+    :param limit: 최대 개수 (실행당 예산)
+    """
+    interval = ExpressionWrapper(F('next_refresh_at') - F('last_refreshed_at'), output_field=DurationField())
+    return list(
+        due_videos(at)
+        .order_by(interval.asc(nulls_first=True), 'next_refresh_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def count_due_videos(at, limit):
+    return due_videos(at)[:limit].count()
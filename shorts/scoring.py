@@ -0,0 +1,167 @@
+# shorts/scoring.py
+"""
+트렌드 점수 계산
+
+    trend_score = (view_diff * VIEW_WEIGHT + like_diff * LIKE_WEIGHT) / decay(age_in_hours)
+
+가중치와 감쇠 함수는 settings.TREND_SCORE로 설정한다.
+수집 배치나 전체 카탈로그를 NumPy 배열로 받아 한 번에 계산한다.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from shorts.leaderboard import rebuild_from_db
+from shorts.search import rebuild_ranked_index
+from shorts.snapshots import publish_safely
+from shorts.models import Video, VideoStatsHistory
+
+
+def decay_sqrt(age_in_hours, options):
+    return np.sqrt(age_in_hours)
+
+
+def decay_power(age_in_hours, options):
+    return np.power(age_in_hours, options.get('EXPONENT', 0.5))
+
+
+def decay_gravity(age_in_hours, options):
+    """Hacker News 방식: (age + 2) ^ gravity"""
+    return np.power(age_in_hours + 2, options.get('GRAVITY', 1.8))
+
+
+def decay_exponential(age_in_hours, options):
+    """HALF_LIFE_HOURS마다 점수가 절반으로 줄어듦"""
+    return np.exp2(age_in_hours / options.get('HALF_LIFE_HOURS', 24))
+
+
+DECAY_FUNCTIONS = {
+    'sqrt': decay_sqrt,
+    'power': decay_power,
+    'gravity': decay_gravity,
+    'exponential': decay_exponential,
+}
+
+
+def get_trend_setting(name):
+    return settings.TREND_SCORE[name]
+
+
+def get_options(overrides=None):
+    return {**settings.TREND_SCORE, **(overrides or {})}
+
+
+def trend_scores(view_diffs, like_diffs, ages_in_hours, **overrides):
+    """
+    여러 영상의 트렌드 점수를 한 번에 계산
+    :param view_diffs: 조회수 증가량 배열
+    :param like_diffs: 좋아요 증가량 배열
+    :param ages_in_hours: 게시 후 경과 시간 배열 (단위: 시간)
+    :param overrides: settings.TREND_SCORE 대신 쓸 값 (VIEW_WEIGHT=..., DECAY=... 등)
+    :return: float64 배열
+    """
+    options = get_options(overrides)
+    view_diffs = np.asarray(view_diffs, dtype=np.float64)
+    like_diffs = np.asarray(like_diffs, dtype=np.float64)
+    ages_in_hours = np.asarray(ages_in_hours, dtype=np.float64)
+
+    ages_in_hours = np.where(ages_in_hours <= 0, 1, ages_in_hours)  # 0으로 나누는 문제 방지
+    decay = DECAY_FUNCTIONS[options['DECAY']](ages_in_hours, options)
+
+    with np.errstate(over='ignore'):
+        return (view_diffs * options['VIEW_WEIGHT'] + like_diffs * options['LIKE_WEIGHT']) / decay
+
+
+def lifetime_rates(view_counts, like_counts, ages_in_hours):
+    """
+    이전 샘플이 없는 영상의 분당 증가량 (누적값 / 게시 후 경과 분, 최소 1분)
+    첫 수집 점수를 갱신 점수(직전 샘플 대비 분당 증가량)와 같은 단위로 맞춘다.
+    :return: (분당 조회수 배열, 분당 좋아요 배열)
+    """
+    minutes = np.maximum(np.asarray(ages_in_hours, dtype=np.float64) * 60, 1)
+    return np.asarray(view_counts, dtype=np.float64) / minutes, np.asarray(like_counts, dtype=np.float64) / minutes
+
+
+def calculate_trend_score(view_diff, like_diff, age_in_hours, **overrides):
+    """
+    영상 하나의 트렌드 점수
+    :param view_diff: 조회수 증가량
+    :param like_diff: 좋아요 증가량
+    :param age_in_hours: 영상이 게시된 후 경과 시간 (단위: 시간)
+    :return: 트렌드 점수
+    """
+    return float(trend_scores([view_diff], [like_diff], [age_in_hours], **overrides)[0])
+
+
+def to_db_scores(scores):
+    """trend_score(BigIntegerField)에 저장할 정수 리스트 (소수점 이하 버림)"""
+    return np.trunc(np.nan_to_num(scores, posinf=0, neginf=0)).astype(np.int64).tolist()
+
+
+def load_history_snapshots():
+    """
+    VideoStatsHistory에서 영상별 최근 두 개의 샘플을 읽어 NumPy 배열로 반환
+    :return: (video_pks, view_rates, like_rates, ages_in_hours)
+        샘플이 하나뿐인 영상은 게시 후 평균 분당 증가량 (첫 수집과 동일, lifetime_rates)
+    """
+    ranked = (
+        VideoStatsHistory.objects
+        .annotate(
+            rank=Window(RowNumber(), partition_by=[F('video_id')], order_by=F('collected_at').desc()),
+            published_at=F('video__published_at'),
+        )
+        .filter(rank__lte=2)
+        .order_by('video_id', 'rank')
+        .values_list('video_id', 'rank', 'collected_at', 'view_count', 'like_count', 'published_at')
+    )
+
+    rows = np.array(
+        [
+            (video_pk, rank, collected_at.timestamp(), view_count, like_count, published_at.timestamp())
+            for video_pk, rank, collected_at, view_count, like_count, published_at in ranked.iterator(chunk_size=10_000)
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 6)
+
+    latest = rows[rows[:, 1] == 1]
+    previous = rows[rows[:, 1] == 2]
+
+    video_pks = latest[:, 0].astype(np.int64)
+    view_diffs = latest[:, 3].copy()
+    like_diffs = latest[:, 4].copy()
+    # 샘플이 하나뿐인 영상은 게시 후 경과 시간으로 나눔
+    elapsed_minutes = np.maximum((latest[:, 2] - latest[:, 5]) / 60, 1)
+
+    # 두 번째 샘플이 있는 영상은 직전 샘플과의 분당 증가량
+    has_previous = np.searchsorted(video_pks, previous[:, 0].astype(np.int64))
+    view_diffs[has_previous] -= previous[:, 3]
+    like_diffs[has_previous] -= previous[:, 4]
+    elapsed_minutes[has_previous] = np.maximum((latest[has_previous, 2] - previous[:, 2]) / 60, 1)
+
+    ages_in_hours = (latest[:, 2] - latest[:, 5]) / 3600
+    return video_pks, view_diffs / elapsed_minutes, like_diffs / elapsed_minutes, ages_in_hours
+
+
+def rescore_catalog(chunk_size=5_000, dry_run=False, **overrides):
+    """
+    전체 영상의 트렌드 점수를 이력 기준으로 다시 계산해 저장 (가중치/감쇠 함수 변경 후)
+    :return: 다시 계산한 영상 수
+    """
+    video_pks, view_rates, like_rates, ages_in_hours = load_history_snapshots()
+    scores = to_db_scores(trend_scores(view_rates, like_rates, ages_in_hours, **overrides))
+    if dry_run:
+        return len(scores)
+
+    # bulk_update의 CASE WHEN 생성 비용을 피하려고 executemany로 한 번에 갱신
+    sql = f'UPDATE {Video._meta.db_table} SET trend_score = %s WHERE id = %s'
+    rows = list(zip(scores, video_pks.tolist()))
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            cursor.executemany(sql, rows[start:start + chunk_size])
+
+    rebuild_from_db()
+    publish_safely()
+    rebuild_ranked_index()
+    return len(rows)
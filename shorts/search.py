@@ -0,0 +1,216 @@
+# shorts/search.py
+"""
+영상 제목/설명 전문 검색
+
+- SQLite: FTS5 가상 테이블 shorts_video_fts (rowid = Video.pk, 2~4글자 접두어 색인 포함)
+  와 트렌드 점수 상위 RANKED_SIZE개 영상만 담은 shorts_video_fts_ranked (rowid = 트렌드 순위)
+- PostgreSQL: 제목 + 설명의 to_tsvector('simple', ...) GIN 인덱스
+  (역색인은 migrations/0010_video_search_index, 0011_video_search_ranked_index에서 생성)
+
+SQLite 전체 역색인은 수집 파이프라인(shorts.ingestion)이 배치를 저장하는 트랜잭션 안에서 index_videos()로 증분 갱신하고,
+순위 역색인은 수집 실행/점수 재계산이 끝날 때마다 rebuild_ranked_index()로 다시 만든다.
+PostgreSQL은 표현식 인덱스라 DB가 함께 갱신한다. 삭제된 영상은 post_delete 시그널로 역색인에서 뺀다.
+한글 단어는 조사가 붙은 형태도 찾도록 접두어로, 그 외 단어는 단어 그대로 검색한다. (쇼츠 -> 쇼츠를)
+
+관련도 계산(bm25/ts_rank)은 매칭된 행마다 비용이 들어 흔한 단어(예: 쇼츠)는 매칭 수에 비례해 느려지므로,
+검색어가 모두 들어간 영상 중 트렌드 점수 상위 CANDIDATES개를 먼저 고르고 그 후보에만 관련도를 계산한다.
+SQLite는 순위 역색인을 rowid(트렌드 순위) 순으로 읽다가 CANDIDATES개에서 멈추므로 매칭 수와 무관하게 비용이 일정하다.
+    score = relevance × (1 + TREND_WEIGHT × log(1 + trend_score))
+순위 역색인에서 limit개를 채우지 못하면(드문 검색어, 아직 순위 역색인에 없는 새 영상) 전체 역색인에서 관련도 순으로 찾는다.
+역색인이 없는 DB에서는 icontains 필터로 찾아 trend_score 순으로 정렬한다. (느리지만 같은 응답 형식)
+"""
+import math
+import re
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from shorts.models import Video
+
+FTS_TABLE = 'shorts_video_fts'
+RANKED_TABLE = 'shorts_video_fts_ranked'
+
+# BM25 열 가중치 (제목, 설명): 제목에서 찾은 단어를 더 높게
+BM25_WEIGHTS = (10.0, 1.0)
+
+# PostgreSQL GIN 인덱스와 같은 표현식이어야 인덱스를 사용함
+POSTGRES_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+TERM_PATTERN = re.compile(r'\w+')
+HANGUL_PATTERN = re.compile(r'[\uac00-\ud7a3]')
+
+
+def get_search_setting(name):
+    return settings.VIDEO_SEARCH[name]
+
+
+def parse_terms(query):
+    """검색어를 단어 목록으로 (문법 문자는 버림)"""
+    return TERM_PATTERN.findall(query.lower())[:get_search_setting('MAX_TERMS')]
+
+
+def is_prefix_term(term):
+    """조사가 붙을 수 있는 한글 단어는 접두어로 검색"""
+    return bool(HANGUL_PATTERN.search(term))
+
+
+def index_videos(videos):
+    """
+    저장한 영상 배치의 제목/설명을 역색인에 반영 (SQLite만, 바뀐 영상만 다시 색인)
+    :param videos: title, description이 채워진 Video 리스트
+    """
+    if connection.vendor != 'sqlite' or not videos:
+        return
+    documents = {video.pk: (video.title or '', video.description or '') for video in videos}
+    placeholders = ','.join(['%s'] * len(documents))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, title, description FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', list(documents)
+        )
+        indexed = {rowid: (title, description) for rowid, title, description in cursor.fetchall()}
+        changed = [pk for pk, document in documents.items() if indexed.get(pk) != document]
+        if not changed:
+            return
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({",".join(["%s"] * len(changed))})', changed
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)',
+            [(pk, *documents[pk]) for pk in changed],
+        )
+
+
+def unindex_video(pk):
+    """삭제된 영상을 SQLite 역색인에서 뺌 (순위 역색인은 다음 재생성까지 남지만 영상 테이블과 조인하며 걸러짐)"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_ranked_index(size=None):
+    """
+    트렌드 점수 상위 size개 영상으로 SQLite 순위 역색인을 다시 만듦 (rowid = 1부터 시작하는 트렌드 순위)
+    :param size: 색인할 영상 수 (기본값: RANKED_SIZE)
+    :return: 색인한 영상 수
+    """
+    if connection.vendor != 'sqlite':
+        return 0
+    size = get_search_setting('RANKED_SIZE') if size is None else size
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {RANKED_TABLE}')
+        # 상위 size개는 (trend_score, video_id) 인덱스를 거꾸로 읽어 고름
+        cursor.execute(
+            f"INSERT INTO {RANKED_TABLE} (rowid, title, description, video_pk) "
+            f"SELECT row_number() OVER (ORDER BY trend_score DESC, video_id DESC), "
+            f"coalesce(title, ''), coalesce(description, ''), id "
+            f"FROM (SELECT id, video_id, title, description, trend_score FROM {Video._meta.db_table} "
+            f"ORDER BY trend_score DESC, video_id DESC LIMIT %s)",
+            [size],
+        )
+        return cursor.rowcount
+
+
+def rebuild_index():
+    """
+    SQLite 역색인을 Video 전체로 다시 만듦 (색인이 어긋났을 때, 순위 역색인 포함)
+    :return: 색인한 영상 수
+    """
+    if connection.vendor != 'sqlite':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            f"SELECT id, coalesce(title, ''), coalesce(description, '') FROM {Video._meta.db_table}"
+        )
+        count = cursor.rowcount
+    rebuild_ranked_index()
+    return count
+
+
+def match_expression(terms):
+    """FTS5 MATCH 식 (모든 단어 AND, 한글 단어는 접두어)"""
+    return ' AND '.join(f'"{term}"*' if is_prefix_term(term) else f'"{term}"' for term in terms)
+
+
+def ranked_matches(terms, candidates, limit):
+    """
+    검색어의 모든 단어가 들어간 영상 중 트렌드 점수 상위 candidates개를 고르고 관련도와 트렌드 점수를 섞어 상위 limit개
+    관련도는 후보에만 계산하고 영상 테이블은 후보 행만 읽으므로, 흔한 단어도 비용이 매칭 수에 비례하지 않는다.
+    :return: [(video_id, title, trend_score, relevance, score), ...] (relevance는 클수록 관련도가 높음)
+    """
+    trend_weight = get_search_setting('TREND_WEIGHT')
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # bm25()는 관련도가 높을수록 작은 음수
+            weights = ', '.join(map(str, BM25_WEIGHTS))
+            match = match_expression(terms)
+            # 순위 역색인은 rowid(트렌드 순위) 순으로 읽다가 candidates개에서 멈춤
+            cursor.execute(
+                f"SELECT video.video_id, video.title, video.trend_score, candidate.relevance, "
+                f"candidate.relevance * (1 + %s * ln(1 + max(video.trend_score, 0))) AS score "
+                f"FROM (SELECT video_pk, -bm25({RANKED_TABLE}, {weights}) AS relevance FROM {RANKED_TABLE} "
+                f"WHERE {RANKED_TABLE} MATCH %s ORDER BY rowid LIMIT %s) candidate "
+                f"JOIN {Video._meta.db_table} video ON video.id = candidate.video_pk "
+                f"ORDER BY score DESC LIMIT %s",
+                [trend_weight, match, candidates, limit],
+            )
+            rows = cursor.fetchall()
+            if len(rows) >= limit:
+                return rows
+
+            # 드문 검색어: 전체 역색인의 매칭이 적으므로 관련도 상위 candidates개를 후보로
+            cursor.execute(
+                f"SELECT video.video_id, video.title, video.trend_score, candidate.relevance, "
+                f"candidate.relevance * (1 + %s * ln(1 + max(video.trend_score, 0))) AS score "
+                f"FROM (SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS relevance FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s) candidate "
+                f"JOIN {Video._meta.db_table} video ON video.id = candidate.rowid "
+                f"ORDER BY score DESC LIMIT %s",
+                [trend_weight, match, candidates, limit],
+            )
+            return cursor.fetchall()
+        if connection.vendor == 'postgresql':
+            # 트렌드 점수 상위 후보를 먼저 고르고 ts_rank는 후보에만 계산
+            tsquery = ' & '.join(f'{term}:*' if is_prefix_term(term) else term for term in terms)
+            cursor.execute(
+                f"SELECT video_id, title, trend_score, relevance, "
+                f"relevance * (1 + %s * ln(1 + greatest(trend_score, 0))) AS score "
+                f"FROM (SELECT video.video_id, video.title, video.trend_score, "
+                f"ts_rank({POSTGRES_DOCUMENT}, query) AS relevance "
+                f"FROM (SELECT id FROM {Video._meta.db_table}, to_tsquery('simple', %s) query "
+                f"WHERE {POSTGRES_DOCUMENT} @@ query ORDER BY trend_score DESC, video_id DESC LIMIT %s) candidate "
+                f"JOIN {Video._meta.db_table} video ON video.id = candidate.id, to_tsquery('simple', %s) query"
+                f") ranked ORDER BY score DESC LIMIT %s",
+                [trend_weight, tsquery, candidates, tsquery, limit],
+            )
+            return cursor.fetchall()
+
+    # 역색인이 없는 DB: 모든 단어가 제목이나 설명에 들어간 영상을 트렌드 점수 순으로 (관련도는 모두 같게 1)
+    condition = reduce(and_, (Q(title__icontains=term) | Q(description__icontains=term) for term in terms))
+    return [
+        (video_id, title, trend_score, 1.0, 1 + trend_weight * math.log1p(max(trend_score, 0)))
+        for video_id, title, trend_score in Video.objects.filter(condition).order_by('-trend_score', '-video_id')
+        .values_list('video_id', 'title', 'trend_score')[:limit]
+    ]
+
+
+def search_videos(query, limit):
+    """
+    제목/설명에 검색어의 모든 단어가 들어간 영상을 관련도와 트렌드 점수로 정렬
+    :return: [{'video_id', 'title', 'trend_score', 'relevance', 'score'}, ...]
+    """
+    terms = parse_terms(query)
+    if not terms or not limit:
+        return []
+
+    return [
+        {'video_id': video_id, 'title': title, 'trend_score': trend_score, 'relevance': relevance, 'score': score}
+        for video_id, title, trend_score, relevance, score in ranked_matches(
+            terms, max(limit, get_search_setting('CANDIDATES')), limit,
+        )
+    ]
@@ -0,0 +1,12 @@
+# shorts/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import search
+from .models import Video
+
+
+@receiver(post_delete, sender=Video)
+def unindex_deleted_video(sender, instance, **kwargs):
+    # 삭제된 영상이 검색되지 않도록 역색인에서 뺌
+    search.unindex_video(instance.pk)
@@ -0,0 +1,209 @@
+# shorts/snapshots.py
+"""
+트렌드 목록 / 증가량 순위 / 게임 랭크 순위 정적 스냅샷
+
+모든 사용자에게 같은 목록이므로 수집이 끝나거나 점수가 바뀔 때마다 미리 만든 JSON을
+settings.FEED_SNAPSHOTS['ROOT'] 아래에 써 두고, nginx나 CDN이 앱을 거치지 않고 바로 내려주게 한다.
+
+    trending/1.json ~ trending/{TRENDING_PAGES}.json   results: trending_videos 응답 본문, next_cursor: X-Next-Cursor 헤더 값, next: 다음 페이지 경로
+    growth/1h.json, growth/6h.json, growth/24h.json   growth_rankings 응답과 같은 형식
+    ranks.json                                        게임 랭크 점수(Profile.rank_score) 상위 RANK_LIMIT명
+    manifest.json                                     생성 시각과 파일 목록 (마지막에 씀)
+
+- 같은 디렉터리의 임시 파일에 쓴 뒤 rename하므로 읽는 쪽은 항상 완전한 파일만 봄
+- 내용이 바뀌지 않은 파일은 다시 쓰지 않음 (CDN 캐시 유지)
+- COMPRESS에 따라 .gz / .br 파일을 함께 씀 (nginx gzip_static / brotli_static)
+  brotli는 선택 의존성이라 설치되어 있지 않으면 건너뜀
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.timezone import now
+
+from accounts.models import Profile
+from shorts.leaderboard import encode_cursor, get_leaderboard
+from shorts.rankings import WINDOWS, growth_ranking
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_SUFFIXES = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+
+def get_snapshot_setting(name):
+    return settings.FEED_SNAPSHOTS[name]
+
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    return brotli.compress(body, quality=11)
+
+
+def write_atomic(path, data):
+    """임시 파일에 쓴 뒤 rename (같은 파일 시스템이므로 원자적)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp는 0600으로 만들므로 웹 서버가 읽을 수 있게
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class SnapshotWriter:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.encodings = [
+            encoding for encoding in get_snapshot_setting('COMPRESS')
+            if encoding != 'br' or brotli is not None
+        ]
+        if 'br' in get_snapshot_setting('COMPRESS') and brotli is None:
+            logger.warning("brotli 패키지가 없어 .br 스냅샷을 건너뜁니다.")
+        self.written = []
+        self.unchanged = []
+
+    def write(self, name, data):
+        """JSON 파일 하나와 압축본 (내용이 같으면 건너뜀)"""
+        body = json.dumps(data, cls=DjangoJSONEncoder).encode()
+        path = self.root / name
+        if path.exists() and path.read_bytes() == body:
+            self.unchanged.append(name)
+            return
+        # 압축본을 먼저 써서 원본과 압축본이 다른 내용을 가리키는 시간을 줄임
+        for encoding in self.encodings:
+            write_atomic(path.with_name(path.name + COMPRESSED_SUFFIXES[encoding]), compress(body, encoding))
+        write_atomic(path, body)
+        self.written.append(name)
+
+    def remove(self, name):
+        path = self.root / name
+        for candidate in [path, *(path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES.values())]:
+            if candidate.exists():
+                candidate.unlink()
+
+
+def trending_pages(writer):
+    """트렌드 목록 상위 TRENDING_PAGES × PAGE_SIZE개를 페이지 파일로"""
+    page_size = get_snapshot_setting('PAGE_SIZE')
+    page_count = get_snapshot_setting('TRENDING_PAGES')
+    leaderboard = get_leaderboard()
+
+    after = None
+    names = []
+    for page in range(1, page_count + 1):
+        entries = leaderboard.top(page_size, after)
+        if not entries:
+            break
+        next_cursor = None
+        if len(entries) == page_size:
+            video_id, score, _ = entries[-1]
+            after = (score, video_id)
+            next_cursor = encode_cursor(score, video_id)
+        writer.write(f'trending/{page}.json', {
+            'results': [payload for _, _, payload in entries],
+            'next_cursor': next_cursor,
+            'next': f'{page + 1}.json' if next_cursor and page < page_count else None,
+        })
+        names.append(f'trending/{page}.json')
+        if next_cursor is None:
+            break
+
+    # 목록이 줄어 더 이상 없는 페이지는 삭제
+    for page in range(len(names) + 1, page_count + 1):
+        writer.remove(f'trending/{page}.json')
+    return names
+
+
+def growth_rankings(writer):
+    """1h / 6h / 24h 증가량 순위"""
+    names = []
+    for window in WINDOWS:
+        writer.write(f'growth/{window}.json', {
+            'window': window,
+            'results': [
+                {
+                    'video_id': growth.video.video_id,
+                    'title': growth.video.title,
+                    'view_growth': getattr(growth, f'view_growth_{window}'),
+                    'like_growth': getattr(growth, f'like_growth_{window}'),
+                    'sampled_at': growth.sampled_at,
+                }
+                for growth in growth_ranking(window, get_snapshot_setting('GROWTH_LIMIT'))
+            ],
+        })
+        names.append(f'growth/{window}.json')
+    return names
+
+
+def rank_leaderboard(writer):
+    """게임 랭크 점수 순위 (매치가 끝날 때마다가 아니라 스냅샷을 만들 때 함께 갱신)"""
+    profiles = (
+        Profile.objects.select_related('user')
+        .only('user__username', 'rank_score', 'win_count', 'lose_count')
+        .order_by('-rank_score', 'user_id')[:get_snapshot_setting('RANK_LIMIT')]
+    )
+    writer.write('ranks.json', {
+        'results': [
+            {
+                'rank': rank,
+                'username': profile.user.username,
+                'rank_score': profile.rank_score,
+                'win_count': profile.win_count,
+                'lose_count': profile.lose_count,
+            }
+            for rank, profile in enumerate(profiles, start=1)
+        ],
+    })
+    return ['ranks.json']
+
+
+def publish(root=None):
+    """
+    스냅샷을 모두 다시 씀 (ROOT가 설정되지 않았으면 아무것도 하지 않음)
+    :return: {'written': [...], 'unchanged': [...]} 또는 None
+    """
+    root = root or get_snapshot_setting('ROOT')
+    if not root:
+        return None
+
+    writer = SnapshotWriter(root)
+    files = trending_pages(writer) + growth_rankings(writer) + rank_leaderboard(writer)
+    # manifest는 마지막에 써서 manifest가 가리키는 파일은 모두 새 내용
+    write_atomic(writer.root / 'manifest.json', json.dumps({
+        'generated_at': now(),
+        'files': files,
+        'encodings': writer.encodings,
+    }, cls=DjangoJSONEncoder).encode())
+    return {'written': writer.written, 'unchanged': writer.unchanged}
+
+
+def publish_safely():
+    """수집/점수 갱신 뒤 호출 (스냅샷 실패로 수집이 실패하지 않도록 에러는 기록만)"""
+    try:
+        result = publish()
+    except OSError as e:
+        logger.error(f"스냅샷 생성 실패: {e}")
+        return None
+    if result is not None:
+        logger.info(f"스냅샷 {len(result['written'])}개 갱신 ({len(result['unchanged'])}개 변경 없음)")
+    return result
@@ -0,0 +1,246 @@
+# shorts/sources.py
+"""
+수집 파이프라인(shorts.ingestion)이 통계를 받아오는 소스
+
+- StatsSource: 공통 인터페이스 (videos.list / search.list 응답 형식을 그대로 반환)
+- shorts.fetcher.AsyncYouTubeFetcher: 실제 유튜브 Data API
+- RecordingSource: 다른 소스의 원본 응답을 NDJSON 파일로 기록
+- ReplaySource: 기록된 응답을 재생 (할당량 소모 없이 회귀 테스트)
+- SyntheticSource: 현실적인 성장 곡선을 가진 가짜 쇼츠 생성 (대규모 벤치마크)
+"""
+import asyncio
+import json
+import math
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.utils.timezone import now
+
+
+class StatsSource:
+    """
+    모든 소스는 async context manager로 사용한다.
+        async with source:
+            items = await source.videos_list(['abc', 'def'])
+    """
+    # 일일 할당량이 소진되어 이번 실행의 남은 요청을 보낼 수 없는 상태
+    quota_exceeded = False
+
+    # 재시도 후에도 실패한 요청 수 (할당량 소진 포함)
+    error_count = 0
+
+    # 실제 유튜브 할당량을 소모하는 소스인지 여부 (shorts.quota 장부 기록 대상)
+    metered = False
+
+    @property
+    def usage(self):
+        """엔드포인트별 호출 수 {'videos.list': 12, ...}"""
+        return {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def videos_list(self, video_ids, part="statistics,snippet"):
+        """
+        videos.list 한 번 호출 (최대 50개 id)
+        :return: items 리스트 (에러 시 None)
+        """
+        raise NotImplementedError
+
+    async def search_list(self, **params):
+        """
+        search.list 한 번 호출
+        :return: 응답 dict (에러 시 None)
+        """
+        raise NotImplementedError
+
+    async def stream_videos_list(self, batches, key=None):
+        """
+        여러 배치를 동시에 조회하고 끝나는 순서대로 (batch, items)를 yield
+        :param batches: 배치 리스트
+        :param key: 배치에서 video_id 리스트를 꺼내는 함수 (기본값: 배치 자체가 id 리스트)
+        """
+        key = key or (lambda batch: batch)
+
+        async def fetch(batch):
+            return batch, await self.videos_list(key(batch))
+
+        tasks = [asyncio.create_task(fetch(batch)) for batch in batches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class RecordingSource(StatsSource):
+    """
+    감싼 소스의 호출과 원본 응답을 한 줄에 하나씩 NDJSON으로 저장
+    {"resource": "videos", "params": {...}, "response": {...}}
+    """
+
+    def __init__(self, source, path):
+        self.source = source
+        self.path = path
+        self._file = None
+
+    @property
+    def quota_exceeded(self):
+        return self.source.quota_exceeded
+
+    @property
+    def error_count(self):
+        return self.source.error_count
+
+    @property
+    def metered(self):
+        return self.source.metered
+
+    @property
+    def usage(self):
+        return self.source.usage
+
+    async def __aenter__(self):
+        await self.source.__aenter__()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._file.close()
+        await self.source.__aexit__(exc_type, exc, tb)
+
+    def record(self, resource, params, response):
+        if response is None:
+            return
+        self._file.write(json.dumps(
+            {'resource': resource, 'params': params, 'response': response}, ensure_ascii=False
+        ) + '\n')
+
+    async def videos_list(self, video_ids, part="statistics,snippet"):
+        items = await self.source.videos_list(video_ids, part=part)
+        self.record('videos', {'part': part, 'id': ",".join(video_ids)}, None if items is None else {'items': items})
+        return items
+
+    async def search_list(self, **params):
+        response = await self.source.search_list(**params)
+        self.record('search', params, response)
+        return response
+
+
+class ReplaySource(StatsSource):
+    """
+    RecordingSource가 남긴 파일을 재생
+    영상별로 기록된 스냅샷을 순서대로 돌려주고, 마지막 스냅샷 이후에는 마지막 값을 유지한다.
+    search.list 응답도 기록된 순서대로 돌려준다.
+    """
+
+    def __init__(self, path):
+        self.snapshots = defaultdict(list)  # video_id -> [item, ...]
+        self.searches = []
+        self.cursors = defaultdict(int)
+        self.search_cursor = 0
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['resource'] == 'videos':
+                    for item in record['response'].get('items', []):
+                        self.snapshots[item['id']].append(item)
+                elif record['resource'] == 'search':
+                    self.searches.append(record['response'])
+
+    async def videos_list(self, video_ids, part="statistics,snippet"):
+        items = []
+        for video_id in video_ids:
+            snapshots = self.snapshots.get(video_id)
+            if not snapshots:
+                continue
+            index = min(self.cursors[video_id], len(snapshots) - 1)
+            self.cursors[video_id] += 1
+            items.append(snapshots[index])
+        return items
+
+    async def search_list(self, **params):
+        if not self.searches:
+            return {'items': []}
+        response = self.searches[self.search_cursor % len(self.searches)]
+        self.search_cursor += 1
+        return response
+
+
+class SyntheticSource(StatsSource):
+    """
+    count개의 가짜 쇼츠를 만들어 videos.list / search.list 응답을 흉내 냄
+
+    각 영상은 게시 후 tau 시간 동안 빠르게 성장하다 포화하는 곡선을 따른다.
+        views(t) = potential * (1 - exp(-t / tau))
+    potential은 로그정규분포라 소수의 영상만 크게 성장한다.
+    호출할 때마다 시뮬레이션 시계가 step만큼 진행되므로 실행을 반복하면 증가량이 생긴다.
+    """
+
+    def __init__(self, count=100_000, seed=0, step=timedelta(minutes=1), max_age=timedelta(days=30)):
+        self.count = count
+        self.step = step
+        self.started_at = now()
+        self.elapsed = timedelta(0)
+        self.discovered = 0
+
+        rng = random.Random(seed)
+        self.videos = {}
+        for i in range(count):
+            self.videos[self.video_id(i)] = (
+                self.started_at - max_age * rng.random(),       # published_at
+                min(rng.lognormvariate(math.log(20_000), 2.0), 5e8),  # potential
+                rng.uniform(6, 72),                              # tau (시간)
+                rng.uniform(0.01, 0.06),                         # like_ratio
+            )
+
+    @staticmethod
+    def video_id(index):
+        return f'syn{index:08d}'
+
+    def video_ids(self):
+        return list(self.videos)
+
+    def advance(self):
+        """시뮬레이션 시계를 한 step 진행 (수집 1회 = step)"""
+        self.elapsed += self.step
+
+    def item(self, video_id):
+        published_at, potential, tau, like_ratio = self.videos[video_id]
+        age_in_hours = max((self.started_at + self.elapsed - published_at).total_seconds() / 3600, 0)
+        view_count = int(potential * (1 - math.exp(-age_in_hours / tau)))
+        return {
+            'id': video_id,
+            'snippet': {
+                'title': f'synthetic short {video_id}',
+                'description': '',
+                'publishedAt': published_at.isoformat().replace('+00:00', 'Z'),
+            },
+            'statistics': {
+                'viewCount': str(view_count),
+                'likeCount': str(int(view_count * like_ratio)),
+            },
+        }
+
+    async def videos_list(self, video_ids, part="statistics,snippet"):
+        return [self.item(video_id) for video_id in video_ids if video_id in self.videos]
+
+    async def search_list(self, **params):
+        """아직 검색되지 않은 영상을 maxResults개씩 순서대로 노출"""
+        start = self.discovered
+        self.discovered = min(start + int(params.get('maxResults', 50)), self.count)
+        response = {'items': [
+            {'id': {'kind': 'youtube#video', 'videoId': self.video_id(i)}}
+            for i in range(start, self.discovered)
+        ]}
+        if self.discovered < self.count:
+            response['nextPageToken'] = str(self.discovered)
+        return response
@@ -1,138 +1,157 @@
 import logging
-import math
+import uuid
 from datetime import datetime
-from django.utils.timezone import now
-from celery import shared_task
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from shorts.models import Video, VideoStatsHistory
+
+from celery import chord, shared_task
 from django.conf import settings
+from django.db import DatabaseError
+from django.utils.timezone import now
+
+from shorts.ingestion import (
+    BATCH_SIZE, INGESTION_LOCK_NAME, IncompleteChunk, build_source, chunked, discover_videos, finish_ingestion,
+    refresh_chunk, refresh_limit, run_with_source,
+)
+from shorts.locks import Lease, acquire
+from shorts.quota import plan_run
+from shorts.rollups import run_rollups
+from shorts.scheduler import count_due_videos, due_video_pks
 
 logger = logging.getLogger(__name__)
 
 
-def calculate_trend_score(view_diff, like_diff, age_in_hours, w_v=1.0, w_l=2.0):
-    if age_in_hours <= 0:
-        age_in_hours = 1  # 0으로 나누는 문제 방지
+def get_task_setting(name):
+    return settings.SHORTS_INGESTION_TASKS[name]
+
 
-    return (view_diff * w_v + like_diff * w_l) / math.sqrt(age_in_hours)
+def resume_lease(owner):
+    """
+    coordinator가 획득한 수집 잠금을 하위 작업에서 이어서 사용
+    :return: Lease (다른 실행이 가져갔으면 None)
+    """
+    lease = Lease.resume(INGESTION_LOCK_NAME, owner)
+    return lease if lease.renew(force=True) else None
 
 
 @shared_task
-def fetch_youtube_data():
-    # 유튜브 API 클라이언트 초기화
-    youtube = build('youtube', 'v3', developerKey=settings.YOUTUBE_DATA_API_KEY)
-    updated_videos = []
-
-    # 기존 Video 업데이트
-    existing_videos = Video.objects.all()
-    for video in existing_videos:
-        try:
-            response = youtube.videos().list(
-                part="statistics,snippet", id=video.video_id
-            ).execute()
-        except HttpError as e:
-            logger.error(f"유튜브 API 호출 에러 (video_id: {video.video_id}): {e}")
-            continue
-
-        items = response.get('items', [])
-        if not items:
-            logger.warning(f"해당 video_id {video.video_id}로 정보를 찾을 수 없습니다.")
-            continue
-
-        item = items[0]
-        stats = item['statistics']
-
-        # DB 최신 영상 정보 업데이트
-        old_view_count = video.view_count
-        old_like_count = video.like_count
-
-        new_view_count = int(stats.get('viewCount', 0))
-        new_like_count = int(stats.get('likeCount', 0))
-
-        video.view_count = new_view_count
-        video.like_count = new_like_count
-        video.title = item['snippet']['title']
-        video.description = item['snippet']['description']
-
-        video.save()
-
-        # 이력 테이블에 저장
-        VideoStatsHistory.objects.create(
-            video=video, view_count=new_view_count, like_count=new_like_count
-        )
-
-        # 증가량 계산
-        view_diff = new_view_count - old_view_count
-        like_diff = new_like_count - old_like_count
-
-        # 트렌드 점수 계산
-        age_in_hours = (now() - video.published_at).total_seconds() / 3600
-        trend_score = calculate_trend_score(view_diff, like_diff, age_in_hours)
-
-        video.view_diff = view_diff
-        video.like_diff = like_diff
-        video.trend_score = trend_score
-        video.save()
-
-        updated_videos.append({"video": video, "trend_score": trend_score})
-
-    logger.info("유튜브 데이터 업데이트 완료")
-
-    # 새로운 영상 검색 및 추가
+def fetch_youtube_data(**fetcher_options):
+    """
+    수집 1회를 하위 작업으로 나눠 실행 (chord)
+    1. 갱신 시기가 된 영상을 CHUNK_SIZE개씩 refresh_video_chunk로, 새 영상 검색은 discover_new_videos로 보냄
+    2. 모든 하위 작업이 끝나면 finalize_ingestion이 결과를 합치고 트렌드 목록을 다시 계산
+    실패한 하위 작업은 그 작업만 재시도하고, 수집 잠금(shorts.locks)은 finalize_ingestion이 해제한다.
+    :param fetcher_options: AsyncYouTubeFetcher 생성 옵션 (JSON 직렬화 가능한 값)
+    """
+    lease = acquire(INGESTION_LOCK_NAME)
+    if lease is None:
+        logger.warning("이전 수집이 아직 실행 중이라 이번 실행을 건너뜁니다.")
+        return None
+
     try:
-        search_response = youtube.search().list(
-            part="snippet",
-            maxResults=50,
-            order="date",
-            regionCode="KR",
-            type="video",
-            videoDuration="short",
-            relevanceLanguage="ko",
-        ).execute()
-
-        for item in search_response.get('items', []):
-            video_id = item['id'].get('videoId')
-            if not video_id or Video.objects.filter(video_id=video_id).exists():
-                continue
-
-            snippet = item['snippet']
-            new_video = Video.objects.create(
-                video_id=video_id,
-                title=snippet.get('title'),
-                description=snippet.get('description'),
-                published_at=snippet.get('publishedAt'),
+        owner, run_id = str(lease.owner), str(uuid.uuid4())
+        dispatched_at = now()
+        plan = plan_run(count_due_videos(dispatched_at, refresh_limit()), BATCH_SIZE)
+
+        header = [
+            refresh_video_chunk.s(video_pks, dispatched_at.isoformat(), owner, run_id, fetcher_options)
+            for video_pks in chunked(
+                due_video_pks(dispatched_at, limit=plan.refresh_limit), get_task_setting('CHUNK_SIZE')
             )
+        ]
+        if plan.discovery:
+            header.append(discover_new_videos.s(owner, run_id, plan.searches, fetcher_options))
+        else:
+            logger.info(f"할당량이 부족해 새 영상 검색을 건너뜁니다. ({plan})")
+
+        # 하위 작업은 시작할 때 리스를 갱신하므로, 대기열에서 기다리는 동안 만료되지 않도록 chord 전체 시간만큼 미리 연장
+        lease.extend(len(header) * get_task_setting('CHUNK_LEASE_SECONDS'))
+        body = finalize_ingestion.s(owner, run_id, dispatched_at.isoformat())
+        if header:
+            # 하위 작업이 재시도 끝에 실패하면 finalize_ingestion 대신 성공한 하위 작업까지만 반영하고 잠금 해제
+            chord(header)(body.on_error(release_ingestion_lease.si(owner, dispatched_at.isoformat())))
+        else:
+            body.delay([])
+    except Exception:
+        lease.release()
+        raise
+
+    return {'run_id': run_id, 'chunks': len(header)}
+
+
+@shared_task(
+    autoretry_for=(IncompleteChunk, DatabaseError),
+    retry_backoff=True,
+    max_retries=settings.SHORTS_INGESTION_TASKS['MAX_RETRIES'],
+)
+def refresh_video_chunk(video_pks, dispatched_at, owner, run_id, fetcher_options=None):
+    """
+    영상 청크 하나를 갱신 (50개 단위 배치를 동시에 조회)
+    이번 실행에서 이미 갱신된 영상은 건너뛰므로 재시도해도 실패한 배치만 다시 조회한다.
+    """
+    lease = resume_lease(owner)
+    if lease is None:
+        logger.warning(f"수집 잠금을 잃어 청크를 건너뜁니다. (run {run_id}, {len(video_pks)}개)")
+        return {'updated': 0, 'created': 0}
+
+    updated_count = refresh_chunk(
+        video_pks, datetime.fromisoformat(dispatched_at), lease=lease, run_id=run_id, **(fetcher_options or {})
+    )
+    return {'updated': updated_count, 'created': 0}
+
+
+@shared_task
+def discover_new_videos(owner, run_id, max_searches, fetcher_options=None):
+    """
+    설정된 검색으로 새 영상을 추가
+    다시 실행하면 search.list 할당량(호출당 100)을 또 소모하므로 자동 재시도하지 않는다.
+    """
+    lease = resume_lease(owner)
+    if lease is None:
+        logger.warning(f"수집 잠금을 잃어 새 영상 검색을 건너뜁니다. (run {run_id})")
+        return {'updated': 0, 'created': 0}
+
+    source = build_source(**(fetcher_options or {}))
+    created_videos = run_with_source(
+        source, lambda source: discover_videos(source, lease=lease, max_searches=max_searches), run_id
+    )
+    return {'updated': 0, 'created': len(created_videos)}
+
+
+def finish_run(owner, dispatched_at=None):
+    """
+    분할 수집 실행을 마무리하고 수집 잠금 해제
+    dispatched_at 이후 수집된 영상의 점수로 트렌드 목록을 다시 계산한다. (shorts.ingestion.finish_ingestion)
+    """
+    finish_ingestion(datetime.fromisoformat(dispatched_at) if dispatched_at else None)
+    Lease.resume(INGESTION_LOCK_NAME, owner).release()
 
-            # 초기 통계 정보 가져오기
-            try:
-                stats_response = youtube.videos().list(
-                    part="statistics", id=video_id
-                ).execute()
-
-                stats = stats_response['items'][0]['statistics']
-                new_video.view_count = int(stats.get('viewCount', 0))
-                new_video.like_count = int(stats.get('likeCount', 0))
-
-                age_in_hours = (
-                    now() - datetime.fromisoformat(new_video.published_at.replace('Z', '+00:00'))
-                ).total_seconds() / 3600
-                trend_score = calculate_trend_score(new_video.view_count, new_video.like_count, age_in_hours)
-
-                new_video.trend_score = trend_score
-                new_video.save()
-
-                # 이력 테이블에 초기 값 저장
-                VideoStatsHistory.objects.create(
-                    video=new_video,
-                    view_count=new_video.view_count,
-                    like_count=new_video.like_count,
-                )
-            except HttpError as e:
-                logger.error(f"유튜브 API 호출 에러 (video_id: {video_id}): {e}")
-                continue
-
-    except HttpError as e:
-        logger.error(f"유튜브 API 검색 호출 에러: {e}")
-
-    logger.info("새로운 유튜브 영상 추가 완료")
+
+@shared_task
+def finalize_ingestion(results, owner, run_id, dispatched_at=None):
+    """
+    모든 하위 작업이 끝난 뒤 결과를 합치고 트렌드 목록을 다시 계산한 뒤 수집 잠금 해제
+    """
+    summary = {
+        'run_id': run_id,
+        'chunks': len(results),
+        'updated': sum(result['updated'] for result in results),
+        'created': sum(result['created'] for result in results),
+    }
+    finish_run(owner, dispatched_at)
+    logger.info(f"유튜브 데이터 수집 완료: {summary}")
+    return summary
+
+
+@shared_task
+def release_ingestion_lease(owner, dispatched_at=None):
+    """하위 작업이 실패해 finalize_ingestion이 실행되지 않을 때 성공한 하위 작업까지 반영하고 수집 잠금 해제"""
+    finish_run(owner, dispatched_at)
+
+
+@shared_task
+def rollup_video_stats():
+    """
+    끝난 구간의 통계 이력을 시간/일 단위로 압축하고 보존 기간이 지난 원본을 삭제
+    """
+    result = run_rollups()
+    logger.info(f"통계 이력 압축: {result}")
+    return result
@@ -1,3 +1,793 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from Assa_backend.celery import app as celery_app
+from shorts.ingestion import INGESTION_LOCK_NAME, apply_create, apply_refresh, find_new_video_ids, run_ingestion
+from shorts.leaderboard import (
+    LocalLeaderboard, RedisLeaderboard, decode_cursor, encode_cursor, get_leaderboard, rebuild_from_db,
+    reset_leaderboard,
+)
+from shorts.locks import acquire, single_flight
+from shorts.growth import growth_curve
+from shorts.models import (
+    DiscoveryQueryStats, IngestionLock, QuotaUsage, Video, VideoGrowth, VideoStatsHistory, VideoStatsRollup,
+)
+from shorts.rankings import (
+    CHECKPOINTS, GROWTH_FIELDS, WINDOWS, advance, growth_ranking, rebuild_from_history, record_samples,
+)
+from shorts.quota import plan_run, record_usage, run_allowance
+from shorts.rollups import run_rollups
+from shorts.scheduler import count_due_videos, due_video_pks, refresh_interval, velocity_per_minute
+from shorts.scoring import calculate_trend_score, rescore_catalog, trend_scores
+from shorts.search import FTS_TABLE, rebuild_ranked_index
+from shorts.snapshots import publish
+from shorts.sources import RecordingSource, ReplaySource, SyntheticSource
+from shorts.tasks import fetch_youtube_data, finalize_ingestion, resume_lease
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+User = get_user_model()
+
+
+class StubYouTubeHandler(BaseHTTPRequestHandler):
+    """videos.list / search.list 응답을 흉내 내는 로컬 스텁 서버"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append((url.path, params))
+            fail = server.failures.pop(0) if server.failures else None
+
+        if fail:
+            status, reason = fail
+            self.send_json(status, {'error': {'message': reason, 'errors': [{'reason': reason}]}})
+        elif url.path.endswith('/videos'):
+            self.send_json(200, {'items': [
+                server.videos[video_id] for video_id in params['id'].split(',') if video_id in server.videos
+            ]})
+        elif url.path.endswith('/search'):
+            # search_ids가 dict면 검색어(q)별 결과
+            search_ids = server.search_ids
+            if isinstance(search_ids, dict):
+                search_ids = search_ids.get(params.get('q', ''), [])
+            self.send_json(200, {'items': [
+                {'id': {'kind': 'youtube#video', 'videoId': video_id}} for video_id in search_ids
+            ]})
+        else:
+            self.send_json(404, {'error': {'message': 'not found'}})
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def video_item(video_id, view_count, like_count, published_at='2024-01-01T00:00:00Z'):
+    return {
+        'id': video_id,
+        'snippet': {'title': f'title {video_id}', 'description': '', 'publishedAt': published_at},
+        'statistics': {'viewCount': str(view_count), 'likeCount': str(like_count)},
+    }
+
+
+class AsyncIngestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubYouTubeHandler)
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}/youtube/v3/'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.failures = []
+        self.server.videos = {}
+        self.server.search_ids = []
+
+    def ingest(self, **options):
+        return run_ingestion(api_key='test', base_url=self.base_url, backoff_base=0.01, **options)
+
+    def test_refreshes_existing_videos_in_concurrent_batches(self):
+        published_at = now() - timedelta(hours=4)
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i:03d}', title='', published_at=published_at, view_count=100, like_count=10)
+            for i in range(120)
+        )
+        self.server.videos = {f'v{i:03d}': video_item(f'v{i:03d}', 300, 20) for i in range(120)}
+
+        updated_count, created_videos = self.ingest(concurrency=4)
+
+        self.assertEqual(updated_count, 120)
+        self.assertEqual(created_videos, [])
+        video_calls = [params for path, params in self.server.requests if path.endswith('/videos')]
+        self.assertEqual(len(video_calls), 3)  # 50 + 50 + 20
+        self.assertEqual(VideoStatsHistory.objects.count(), 120)
+
+        video = Video.objects.get(video_id='v000')
+        self.assertEqual((video.view_diff, video.like_diff), (200, 10))
+        self.assertAlmostEqual(video.trend_score, (200 + 10 * 2.0) / 2, delta=1)
+
+    def test_discovers_new_videos(self):
+        Video.objects.create(video_id='known', title='', published_at=now())
+        self.server.search_ids = ['known', 'new1', 'new2']
+        self.server.videos = {video_id: video_item(video_id, 10, 1) for video_id in ['known', 'new1', 'new2']}
+
+        _, created_videos = self.ingest()
+
+        self.assertEqual(sorted(video.video_id for video in created_videos), ['new1', 'new2'])
+        self.assertEqual(Video.objects.count(), 3)
+
+    @override_settings(SHORTS_DISCOVERY={
+        'QUERIES': [{'name': 'latest'}, {'name': 'a', 'q': 'a'}, {'name': 'b', 'q': 'b'}],
+        'PAGES': 2, 'MIN_YIELD': 1.0, 'MIN_SEARCHES': 20,
+    })
+    def test_fans_out_discovery_queries_and_dedupes_results(self):
+        Video.objects.create(video_id='known', title='', published_at=now())
+        self.server.search_ids = {'': ['known', 'x1', 'x2'], 'a': ['x2', 'x3'], 'b': ['x3', 'x4']}
+        self.server.videos = {video_id: video_item(video_id, 10, 1) for video_id in ['known', 'x1', 'x2', 'x3', 'x4']}
+
+        _, created_videos = self.ingest()
+
+        self.assertEqual(sorted(video.video_id for video in created_videos), ['x1', 'x2', 'x3', 'x4'])
+        search_calls = [params for path, params in self.server.requests if path.endswith('/search')]
+        self.assertEqual(len(search_calls), 3)  # nextPageToken이 없으므로 검색마다 1페이지
+        # 새 영상 4개는 videos.list 한 번으로 조회 (+ 기존 영상 갱신 1번)
+        self.assertEqual(len([path for path, _ in self.server.requests if path.endswith('/videos')]), 2)
+        stats = {row.name: (row.searches, row.results, row.new_videos) for row in DiscoveryQueryStats.objects.all()}
+        self.assertEqual(stats, {'latest': (1, 3, 2), 'a': (1, 2, 2), 'b': (1, 2, 2)})
+
+    def test_discovery_queries_do_not_grow_with_search_results(self):
+        Video.objects.bulk_create(Video(video_id=f'k{i:03d}', title='', published_at=now()) for i in range(30))
+
+        find_new_video_ids(['k000'])  # 프로세스 전역 video_id 집합 동기화
+        new_ids = [f'n{i:02d}' for i in range(20)]
+        with self.assertNumQueries(2):
+            found = find_new_video_ids([f'k{i:03d}' for i in range(30)] + new_ids + new_ids[:5])
+
+        self.assertEqual(found, new_ids)
+
+    def test_retries_rate_limited_requests(self):
+        Video.objects.create(video_id='v1', title='', published_at=now())
+        self.server.videos = {'v1': video_item('v1', 5, 1)}
+        self.server.failures = [(429, 'rateLimitExceeded'), (403, 'userRateLimitExceeded')]
+
+        updated_count, _ = self.ingest()
+
+        self.assertEqual(updated_count, 1)
+        self.assertEqual(Video.objects.get(video_id='v1').view_count, 5)
+
+    def test_stops_after_daily_quota_is_exhausted(self):
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i:03d}', title='', published_at=now()) for i in range(100)
+        )
+        self.server.failures = [(403, 'quotaExceeded')] * 10
+
+        updated_count, created_videos = self.ingest(concurrency=1)
+
+        self.assertEqual((updated_count, created_videos), (0, []))
+        self.assertEqual(len(self.server.requests), 1)
+
+    @override_settings(SHORTS_INGESTION_TASKS={'CHUNK_SIZE': 50, 'MAX_RETRIES': 3, 'CHUNK_LEASE_SECONDS': 60})
+    def test_chunked_task_retries_only_the_failed_chunk(self):
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i:03d}', title='', published_at=now() - timedelta(hours=4)) for i in range(120)
+        )
+        self.server.videos = {f'v{i:03d}': video_item(f'v{i:03d}', 300, 20) for i in range(120)}
+        self.server.failures = [(500, 'backendError')]  # 첫 청크의 videos.list 한 번 실패
+
+        conf = celery_app.conf
+        previous = conf.task_always_eager, conf.broker_url
+        conf.update(task_always_eager=True, broker_url='memory://')
+        try:
+            result = fetch_youtube_data.delay(api_key='test', base_url=self.base_url, max_retries=0)
+        finally:
+            conf.task_always_eager, conf.broker_url = previous
+
+        self.assertEqual(result.get()['chunks'], 4)  # 갱신 3개 + 새 영상 검색 1개
+        video_calls = [params for path, params in self.server.requests if path.endswith('/videos')]
+        self.assertEqual(len(video_calls), 4)  # 실패한 청크만 한 번 더 조회
+        self.assertEqual(VideoStatsHistory.objects.count(), 120)
+        self.assertEqual(QuotaUsage.objects.filter(endpoint='videos.list').aggregate(Sum('calls'))['calls__sum'], 4)
+        self.assertEqual(len(set(QuotaUsage.objects.values_list('run_id', flat=True))), 1)
+        self.assertIsNone(IngestionLock.objects.get(name=INGESTION_LOCK_NAME).owner)
+
+
+class StatsSourceTests(TestCase):
+    def test_replay_reproduces_a_recorded_run(self):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'run.ndjson'
+        _, created_videos = run_ingestion(source=RecordingSource(SyntheticSource(count=5, seed=1), path))
+        self.assertEqual(len(created_videos), 5)
+
+        # 기록한 검색/통계 응답을 같은 순서로 돌려줌 (할당량 소모 없음)
+        source = ReplaySource(path)
+        self.assertFalse(source.metered)
+        video_ids = [item['id']['videoId'] for item in async_to_sync(source.search_list)()['items']]
+        self.assertEqual(video_ids, [SyntheticSource.video_id(i) for i in range(5)])
+        items = async_to_sync(source.videos_list)(video_ids)
+        self.assertEqual(
+            {item['id']: int(item['statistics']['viewCount']) for item in items},
+            dict(Video.objects.values_list('video_id', 'view_count')),
+        )
+
+    def test_replay_holds_the_last_snapshot(self):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'run.ndjson'
+        path.write_text('\n'.join(json.dumps({
+            'resource': 'videos', 'params': {}, 'response': {'items': [video_item('v1', view_count, 0)]},
+        }) for view_count in [10, 20]) + '\n')
+        source = ReplaySource(path)
+
+        view_counts = [
+            async_to_sync(source.videos_list)(['v1', 'missing'])[0]['statistics']['viewCount'] for _ in range(3)
+        ]
+        self.assertEqual(view_counts, ['10', '20', '20'])
+
+
+class RefreshScheduleTests(TestCase):
+    def test_interval_follows_velocity_and_age(self):
+        self.assertEqual(refresh_interval(500, 1), 1)         # 분당 500회 -> 최소 간격
+        self.assertEqual(refresh_interval(50, 1), 10)         # TARGET_VIEW_DELTA(500)가 쌓이는 시간
+        self.assertEqual(refresh_interval(0, 1), 60)          # 게시 48시간 이내는 최소 한 시간에 한 번
+        self.assertEqual(refresh_interval(0.1, 24 * 30), 24 * 60)
+        self.assertEqual(velocity_per_minute(-100, 0, 10), 0)  # 조회수가 줄어도 음수가 되지 않음
+
+    def test_due_videos_are_ordered_by_urgency_within_the_budget(self):
+        at = now()
+        published_at = at - timedelta(days=10)
+        Video.objects.bulk_create([
+            Video(video_id='slow', title='', published_at=published_at,
+                  last_refreshed_at=at - timedelta(days=1), next_refresh_at=at - timedelta(hours=1)),
+            Video(video_id='fast', title='', published_at=published_at,
+                  last_refreshed_at=at - timedelta(minutes=6), next_refresh_at=at - timedelta(minutes=1)),
+            Video(video_id='new', title='', published_at=published_at),
+            Video(video_id='later', title='', published_at=published_at,
+                  last_refreshed_at=at, next_refresh_at=at + timedelta(minutes=5)),
+        ])
+        video_ids = dict(Video.objects.values_list('pk', 'video_id'))
+
+        self.assertEqual([video_ids[pk] for pk in due_video_pks(at, limit=10)], ['new', 'fast', 'slow'])
+        self.assertEqual([video_ids[pk] for pk in due_video_pks(at, limit=2)], ['new', 'fast'])
+        self.assertEqual(count_due_videos(at, limit=2), 2)
+
+    def test_refresh_schedules_the_next_refresh_by_growth(self):
+        refreshed_at = now() - timedelta(minutes=10)
+        Video.objects.bulk_create(
+            Video(video_id=video_id, title='', published_at=refreshed_at - timedelta(days=10), view_count=1000,
+                  last_refreshed_at=refreshed_at)
+            for video_id in ['fast', 'stalled']
+        )
+
+        apply_refresh(list(Video.objects.all()), [video_item('fast', 2000, 0), video_item('stalled', 1000, 0)])
+
+        intervals = {
+            video_id: (next_refresh_at - last_refreshed_at) / timedelta(minutes=1)
+            for video_id, last_refreshed_at, next_refresh_at
+            in Video.objects.values_list('video_id', 'last_refreshed_at', 'next_refresh_at')
+        }
+        self.assertAlmostEqual(intervals['fast'], 5, delta=0.1)  # 10분 동안 1000회 -> 500회 쌓이는 5분 뒤
+        self.assertEqual(intervals['stalled'], 24 * 60)
+
+
+    def test_new_videos_are_scored_on_the_same_per_minute_scale(self):
+        published_at = now() - timedelta(days=10)
+        Video.objects.create(video_id='rising', title='', published_at=published_at, view_count=1000,
+                             last_refreshed_at=now() - timedelta(minutes=10))
+        apply_refresh(list(Video.objects.all()), [video_item('rising', 11_000, 0)])  # 분당 1000회
+        # 10일 동안 누적 100만 회 (분당 약 70회)
+        apply_create([video_item('old', 1_000_000, 0, published_at=published_at.isoformat())])
+
+        scores = dict(Video.objects.values_list('video_id', 'trend_score'))
+        self.assertGreater(scores['rising'], scores['old'] * 10)
+
+        # 샘플이 하나뿐인 영상은 점수를 다시 계산해도 첫 수집과 같은 단위
+        rescore_catalog()
+        self.assertAlmostEqual(Video.objects.get(video_id='old').trend_score, scores['old'], delta=1)
+
+@override_settings(YOUTUBE_QUOTA={'DAILY_LIMIT': 10_000, 'BURST_UNITS': 500, 'DISCOVERY_SHARE': 0.5})
+class QuotaPlanTests(TestCase):
+    # 태평양 시간 정오 (하루 할당량의 절반 페이스)
+    at = datetime(2026, 1, 15, 20, 0, tzinfo=dt_timezone.utc)
+
+    def spend(self, searches, at=None):
+        record_usage(uuid.uuid4(), {'search.list': searches}, at=at or self.at)
+
+    def test_allowance_follows_the_daily_pace(self):
+        self.assertEqual(run_allowance(self.at), 5500)  # 페이스 5000 + BURST_UNITS
+        self.spend(20, at=self.at - timedelta(days=1))   # 전날 사용량은 세지 않음
+        self.spend(50)
+        self.assertEqual(run_allowance(self.at), 500)
+        self.spend(60)
+        self.assertEqual(run_allowance(self.at + timedelta(hours=11)), 0)  # 페이스를 넘겨도 하루 한도 이내
+
+    def test_plan_drops_discovery_before_refreshes(self):
+        self.spend(50)
+        plan = plan_run(1000, 50, at=self.at)
+        # 갱신 20단위를 빼고 실행 할당량의 절반(250) 이내에서 검색 (검색 1회 101단위)
+        self.assertEqual((plan.allowance, plan.refresh_limit, plan.searches), (500, 1000, 2))
+
+        # 남은 100단위로는 갱신도 다 못 함 -> 검색 없이 100번 호출분만 갱신
+        self.spend(4)
+        plan = plan_run(10_000, 50, at=self.at)
+        self.assertEqual((plan.allowance, plan.refresh_limit, plan.searches), (100, 5000, 0))
+        self.assertFalse(plan.discovery)
+
+
+class IngestionLockTests(TestCase):
+    def test_overlapping_run_is_skipped(self):
+        with single_flight(INGESTION_LOCK_NAME) as lease:
+            self.assertIsNotNone(lease)
+            self.assertIsNone(run_ingestion(api_key='test', base_url='http://127.0.0.1:9/'))
+
+        lock = IngestionLock.objects.get(name=INGESTION_LOCK_NAME)
+        self.assertEqual((lock.runs, lock.skipped, lock.takeovers), (1, 1, 0))
+        self.assertIsNone(lock.owner)
+
+    def test_expired_lease_is_taken_over(self):
+        stale = acquire(INGESTION_LOCK_NAME)
+        IngestionLock.objects.filter(name=INGESTION_LOCK_NAME).update(expires_at=now() - timedelta(seconds=1))
+
+        lease = acquire(INGESTION_LOCK_NAME)
+
+        self.assertIsNotNone(lease)
+        self.assertFalse(stale.renew(force=True))
+        self.assertTrue(lease.renew(force=True))
+        self.assertEqual(IngestionLock.objects.get(name=INGESTION_LOCK_NAME).takeovers, 1)
+
+    def test_queued_chunks_keep_the_extended_lease(self):
+        lease = acquire(INGESTION_LOCK_NAME)
+        lease.extend(3600)  # 하위 작업이 대기열에서 기다리는 시간까지
+        expires_at = IngestionLock.objects.get(name=INGESTION_LOCK_NAME).expires_at
+
+        # 먼저 시작한 하위 작업의 갱신이 리스를 앞당기지 않아 뒤의 하위 작업이 잠금을 잃지 않음
+        self.assertIsNotNone(resume_lease(str(lease.owner)))
+        self.assertEqual(IngestionLock.objects.get(name=INGESTION_LOCK_NAME).expires_at, expires_at)
+        self.assertIsNone(acquire(INGESTION_LOCK_NAME))
+
+
+    def test_finalize_recomputes_trending_from_the_db(self):
+        self.enterContext(override_settings(TRENDING_LEADERBOARD={**settings.TRENDING_LEADERBOARD, 'REDIS_URL': ''}))
+        reset_leaderboard()
+        self.addCleanup(reset_leaderboard)
+        dispatched_at = now()
+        Video.objects.bulk_create([
+            Video(video_id='stale', title='', published_at=dispatched_at, trend_score=10,
+                  last_refreshed_at=dispatched_at),
+            Video(video_id='other', title='', published_at=dispatched_at, trend_score=50),
+        ])
+        rebuild_from_db()
+        # 하위 작업의 순위표 반영이 실패해 DB에만 저장된 점수
+        Video.objects.filter(video_id='stale').update(trend_score=100)
+        lease = acquire(INGESTION_LOCK_NAME)
+
+        summary = finalize_ingestion([{'updated': 1, 'created': 0}], str(lease.owner), 'run', dispatched_at.isoformat())
+
+        self.assertEqual(summary['updated'], 1)
+        self.assertEqual(get_leaderboard().rank('stale'), (1, 100))
+        self.assertIsNone(IngestionLock.objects.get(name=INGESTION_LOCK_NAME).owner)
+
+class VideoSearchTests(TestCase):
+    def test_ingestion_keeps_search_index_in_sync(self):
+        apply_create([video_item('a1', 10, 1), video_item('a2', 10, 1)])
+        self.assertEqual(
+            [result['video_id'] for result in self.client.get('/api/v1/video/search/', {'q': 'title a1'}).json()['results']],
+            ['a1'],
+        )
+
+        renamed = video_item('a1', 20, 2)
+        renamed['snippet']['title'] = '고양이 먹방 쇼츠'
+        apply_refresh(Video.objects.filter(video_id='a1'), [renamed])
+
+        response = self.client.get('/api/v1/video/search/', {'q': '고양이'})
+        self.assertEqual([result['video_id'] for result in response.json()['results']], ['a1'])
+        self.assertEqual(self.client.get('/api/v1/video/search/', {'q': 'title a1'}).json()['results'], [])
+
+    def test_ranks_by_relevance_and_trend_score(self):
+        items = [video_item(f'v{i}', 10, 1) for i in range(3)]
+        for item, (title, description) in zip(items, [
+            ('고양이', ''), ('강아지', '고양이를 만난 강아지'), ('강아지', '고양이를 만난 강아지'),
+        ]):
+            item['snippet'].update(title=title, description=description)
+        apply_create(items)
+        Video.objects.filter(video_id='v2').update(trend_score=1000)
+
+        results = self.client.get('/api/v1/video/search/', {'q': '고양이'}).json()['results']
+
+        # 제목 일치가 가장 관련도가 높고, 설명 일치끼리는 트렌드 점수가 높은 영상이 먼저
+        self.assertEqual([result['video_id'] for result in results], ['v0', 'v2', 'v1'])
+        self.assertEqual(self.client.get('/api/v1/video/search/').status_code, 400)
+
+    @override_settings(VIDEO_SEARCH={**settings.VIDEO_SEARCH, 'CANDIDATES': 2})
+    def test_candidates_are_top_trending_matches(self):
+        items = [video_item(f'v{i}', 10, 1) for i in range(4)]
+        for i, item in enumerate(items):
+            item['snippet'].update(title='고양이' if i == 0 else '강아지', description='' if i == 0 else '고양이 친구')
+        apply_create(items)
+        for i in range(4):
+            Video.objects.filter(video_id=f'v{i}').update(trend_score=i * 100)
+        rebuild_ranked_index()
+
+        # 관련도는 트렌드 점수 상위 2개(v3, v2)에만 계산
+        results = self.client.get('/api/v1/video/search/', {'q': '고양이', 'limit': 2}).json()['results']
+        self.assertEqual([result['video_id'] for result in results], ['v3', 'v2'])
+        # 아직 순위 역색인에 없는 새 영상은 전체 역색인에서 찾음
+        new = video_item('new', 10, 1)
+        new['snippet']['title'] = '고양이 호랑이'
+        apply_create([new])
+        results = self.client.get('/api/v1/video/search/', {'q': '호랑이'}).json()['results']
+        self.assertEqual([result['video_id'] for result in results], ['new'])
+
+    def test_deleted_videos_are_not_searchable(self):
+        apply_create([video_item('a1', 10, 1), video_item('a2', 10, 1)])
+        rebuild_ranked_index()
+        deleted_pk = Video.objects.get(video_id='a1').pk
+        Video.objects.filter(pk=deleted_pk).delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE} WHERE rowid = %s', [deleted_pk])
+            self.assertEqual(cursor.fetchone()[0], 0)
+        # 순위 역색인에 남은 행은 영상 테이블과 조인하며 걸러짐
+        for limit in [1, 10]:
+            response = self.client.get('/api/v1/video/search/', {'q': 'title', 'limit': limit})
+            self.assertEqual([result['video_id'] for result in response.json()['results']], ['a2'])
+
+
+class TrendScoreTests(TestCase):
+    def test_vectorized_scores_match_single_video_scores(self):
+        view_diffs, like_diffs, ages = [100, 0, 5000], [10, 3, 0], [0, 4, 100]
+        scores = trend_scores(view_diffs, like_diffs, ages, DECAY='gravity')
+        self.assertEqual(
+            scores.tolist(),
+            [calculate_trend_score(*args, DECAY='gravity') for args in zip(view_diffs, like_diffs, ages)],
+        )
+        self.assertEqual(calculate_trend_score(100, 10, 4), 60)  # (100 + 10 * 2) / sqrt(4)
+
+    @override_settings(TREND_SCORE={**settings.TREND_SCORE, 'LIKE_WEIGHT': 5.0})
+    def test_like_weight_is_shared_with_the_scheduler(self):
+        self.assertEqual(calculate_trend_score(0, 10, 1), 50)
+        self.assertEqual(velocity_per_minute(100, 10, 10), 15)
+
+    def test_rescore_catalog_uses_per_minute_growth_between_latest_samples(self):
+        collected_at = now()
+        video = Video.objects.create(video_id='v1', title='', published_at=collected_at - timedelta(hours=4))
+        for minutes_ago, view_count, like_count in [(60, 0, 0), (10, 1000, 10), (0, 1400, 30)]:
+            history = VideoStatsHistory.objects.create(video=video, view_count=view_count, like_count=like_count)
+            VideoStatsHistory.objects.filter(pk=history.pk).update(
+                collected_at=collected_at - timedelta(minutes=minutes_ago)
+            )
+
+        self.assertEqual(rescore_catalog(), 1)
+        # 가장 최근 두 샘플 사이 10분: 분당 조회수 40, 좋아요 2 -> (40 + 2 * 2) / sqrt(4)
+        self.assertEqual(Video.objects.get(pk=video.pk).trend_score, 22)
+
+
+class TrendingPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # 상위 TOP_K개 밖의 페이지는 DB에서 읽음
+        self.enterContext(override_settings(TRENDING_LEADERBOARD={
+            **settings.TRENDING_LEADERBOARD, 'REDIS_URL': '', 'TOP_K': 4,
+        }))
+        reset_leaderboard()
+        self.addCleanup(reset_leaderboard)
+        scores = [50, 50, 50, 40, 40, 40, 40, 30, 30, 10]
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i}', title='', published_at=now(), trend_score=score) for i, score in enumerate(scores)
+        )
+        rebuild_from_db()
+
+    def test_paginates_to_exhaustion_with_ties(self):
+        params = {'limit': 3, 'fields': 'video_id,trend_score'}
+        pages = []
+        while True:
+            response = self.client.get('/api/v1/video/trending-videos/', params)
+            pages.append(response.json())
+            if 'X-Next-Cursor' not in response:
+                break
+            self.assertIn(f'cursor={response["X-Next-Cursor"]}', response['Link'])
+            params['cursor'] = response['X-Next-Cursor']
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        expected = list(Video.objects.order_by('-trend_score', '-video_id').values('video_id', 'trend_score'))
+        self.assertEqual([video for page in pages for video in page], expected)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i}', title='', published_at=now(), trend_score=score)
+            for i, score in enumerate([30, 20, 20, 10])
+        )
+
+    def test_local_top_rank_and_cursor(self):
+        leaderboard = LocalLeaderboard(top_k=3, refresh_seconds=60)
+        self.assertEqual([entry[0] for entry in leaderboard.top(2)], ['v0', 'v2'])
+        self.assertEqual([entry[0] for entry in leaderboard.top(2, after=(20, 'v2'))], ['v1', 'v3'])  # DB에서 이어 읽음
+        self.assertEqual(leaderboard.rank('v1'), (3, 20))
+        self.assertEqual(leaderboard.rank('v3'), (4, 10))  # top_k 밖
+        self.assertIsNone(leaderboard.rank('missing'))
+        self.assertEqual(decode_cursor(encode_cursor(20, 'v2')), (20, 'v2'))
+        with self.assertRaises(ValueError):
+            decode_cursor('!!')
+
+    @skipUnless(fakeredis, 'fakeredis가 설치되어 있지 않음')
+    def test_redis_refills_missing_sorted_set(self):
+        client = fakeredis.FakeRedis(decode_responses=True)
+        leaderboard = RedisLeaderboard(client, 'test')
+        # Redis가 비어 있어도 읽을 때 DB에서 다시 채움
+        self.assertEqual([entry[0] for entry in leaderboard.top(3)], ['v0', 'v2', 'v1'])
+        client.flushall()
+        self.assertEqual(leaderboard.rank('v3'), (4, 10))
+        self.assertIsNone(leaderboard.rank('missing'))
+
+        # DB에도 영상이 없으면 빈 순위표를 기억해 읽을 때마다 다시 채우지 않음
+        Video.objects.all().delete()
+        client.flushall()
+        self.assertEqual(leaderboard.top(3), [])
+        with self.assertNumQueries(0):
+            self.assertEqual(leaderboard.top(3), [])
+
+
+class TrendingResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        Video.objects.create(video_id='v1', title='', published_at=now(), trend_score=10)
+        rebuild_from_db()
+
+    @override_settings(TRENDING_CACHE={**settings.TRENDING_CACHE, 'REQUIRE_SHARED': False})
+    def test_not_modified_until_version_bump(self):
+        response = self.client.get('/api/v1/video/trending-videos/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/v1/video/trending-videos/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # 다른 파라미터는 다른 ETag
+        self.assertNotEqual(self.client.get('/api/v1/video/trending-videos/', {'limit': 1})['ETag'], etag)
+
+        Video.objects.filter(video_id='v1').update(trend_score=20)
+        rebuild_from_db()  # bump_version
+        response = self.client.get('/api/v1/video/trending-videos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['trend_score'], 20)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get('/api/v1/video/trending-videos/cache-stats/').json()['hits'], 0)
+        self.client.get('/api/v1/video/trending-videos/')
+        self.assertEqual(self.client.get('/api/v1/video/trending-videos/cache-stats/').json()['hits'], 1)
+
+    def test_disabled_without_shared_cache(self):
+        response = self.client.get('/api/v1/video/trending-videos/')
+        self.assertNotIn('ETag', response)
+        self.assertFalse(self.client.get('/api/v1/video/trending-videos/cache-stats/').json()['enabled'])
+
+
+class StatsRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.video = Video.objects.create(video_id='v1', title='', published_at=now())
+        self.at = datetime(2026, 1, 10, 12, 30, tzinfo=dt_timezone.utc)
+
+    def sample(self, hour, minute, view_count):
+        history = VideoStatsHistory.objects.create(video=self.video, view_count=view_count, like_count=view_count // 10)
+        VideoStatsHistory.objects.filter(pk=history.pk).update(collected_at=self.at.replace(hour=hour, minute=minute))
+
+    def test_late_samples_are_rolled_up_before_prune(self):
+        self.sample(9, 10, 100)
+        self.sample(9, 50, 200)
+        self.sample(10, 20, 300)
+        self.assertEqual(run_rollups(self.at)['hour'], 2)
+        # 압축이 끝난 구간에 늦게 커밋된 샘플
+        self.sample(9, 55, 250)
+        self.sample(12, 10, 400)  # 진행 중인 구간
+        self.assertEqual(run_rollups(self.at)['hour'], 2)
+        self.assertEqual(
+            list(VideoStatsRollup.objects.filter(resolution='hour').order_by('bucket_start')
+                 .values_list('view_count', 'samples')),
+            [(250, 3), (300, 1)],
+        )
+
+        with override_settings(STATS_HISTORY={**settings.STATS_HISTORY, 'RAW_RETENTION_DAYS': 0}):
+            self.assertEqual(run_rollups(self.at)['deleted']['raw'], 4)
+        # 압축되지 않은 구간의 원본은 보존 기간이 지나도 남음
+        self.assertEqual(list(VideoStatsHistory.objects.values_list('view_count', flat=True)), [400])
+
+        # 성장 곡선은 압축 통계와 남은 원본을 load_history로 이어서 읽음
+        buckets, _ = growth_curve(self.video, '1h', self.at.replace(hour=9, minute=0), self.at, self.at)
+        self.assertEqual([(bucket['start'].hour, bucket['view_count'], bucket['view_delta']) for bucket in buckets],
+                         [(9, 250, None), (10, 300, 50), (12, 400, 100)])
+
+
+@override_settings(GROWTH_CURVE={**settings.GROWTH_CURVE, 'PAGE_BUCKETS': 4})
+class GrowthCurveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.video = Video.objects.create(video_id='v1', title='', published_at=now())
+        self.at = datetime(2026, 1, 10, 12, 32, tzinfo=dt_timezone.utc)
+
+    def sample(self, minute, view_count):
+        history = VideoStatsHistory.objects.create(video=self.video, view_count=view_count, like_count=view_count // 10)
+        VideoStatsHistory.objects.filter(pk=history.pk).update(collected_at=self.at.replace(minute=minute))
+
+    def curve(self):
+        buckets, finished_until = growth_curve(self.video, '5m', self.at.replace(minute=0), self.at.replace(minute=35),
+                                               self.at)
+        self.assertEqual(finished_until, self.at.replace(minute=30))
+        return [(bucket['start'].minute, bucket['view_count'], bucket['view_delta']) for bucket in buckets]
+
+    def test_buckets_keep_the_last_value_and_skip_empty_buckets(self):
+        for minute, view_count in [(1, 100), (3, 150), (12, 200), (22, 300), (31, 350)]:
+            self.sample(minute, view_count)
+        # 12:05 구간은 샘플이 없어 건너뛰고, 증가량은 값이 있는 직전 구간 대비
+        self.assertEqual(self.curve(), [(0, 150, None), (10, 200, 50), (20, 300, 100), (30, 350, 50)])
+
+    def test_finished_pages_are_cached(self):
+        self.sample(3, 100)
+        self.sample(25, 200)
+        self.assertEqual(self.curve(), [(0, 100, None), (25, 200, 100)])
+
+        # 끝난 페이지(12:00~12:20)는 캐시에서 읽고, 진행 중인 페이지만 DB에서 다시 읽음
+        self.sample(4, 150)
+        self.sample(31, 300)
+        self.assertEqual(self.curve(), [(0, 100, None), (25, 200, 100), (30, 300, 100)])
+
+
+class GrowthRankingTests(TestCase):
+    def test_window_start_is_interpolated_between_checkpoints(self):
+        ring = []
+        # 7분마다 수집, 분당 조회수 10 / 좋아요 1
+        for minute in range(0, 100, 7):
+            growth = advance(ring, minute * 60, minute * 10, minute, WINDOWS['1h'])
+            self.assertLessEqual(len(ring), CHECKPOINTS + 2)
+        self.assertEqual(growth, (600, 60))  # 38분 시점의 값을 앞뒤 기준점 사이에서 보간
+
+        # 정체된 영상은 창 안의 증가량이 0으로 줄어듦
+        self.assertEqual(advance(ring, 200 * 60, 980, 98, WINDOWS['1h']), (0, 0))
+
+    def test_rebuild_from_history_matches_incremental_growth(self):
+        at = now()
+        videos = Video.objects.bulk_create(
+            Video(video_id=f'v{i}', title='', published_at=at - timedelta(days=2)) for i in range(2)
+        )
+        # 25시간 동안 50분마다 수집 (분당 조회수 10 / 30)
+        for video, rate in zip(videos, [10, 30]):
+            for minute in range(0, 25 * 60 + 1, 50):
+                collected_at = at - timedelta(hours=25) + timedelta(minutes=minute)
+                video.view_count, video.like_count = minute * rate, minute * rate // 10
+                history = VideoStatsHistory.objects.create(
+                    video=video, view_count=video.view_count, like_count=video.like_count,
+                )
+                VideoStatsHistory.objects.filter(pk=history.pk).update(collected_at=collected_at)
+                record_samples([video], collected_at)
+        incremental = list(VideoGrowth.objects.order_by('pk').values_list(*GROWTH_FIELDS))
+
+        self.assertEqual(rebuild_from_history(at), 2)
+        self.assertEqual(list(VideoGrowth.objects.order_by('pk').values_list(*GROWTH_FIELDS)), incremental)
+        self.assertEqual(incremental[1][:2], (60 * 30, 60 * 3))
+        self.assertEqual([growth.video.video_id for growth in growth_ranking('24h', 10, at)], ['v1', 'v0'])
+        self.assertEqual(growth_ranking('1h', 10, at + timedelta(hours=2)), [])  # 창 안에 수집되지 않음
+
+
+class StatsHistoryExportTests(TestCase):
+    def setUp(self):
+        start = now().replace(microsecond=0) - timedelta(hours=3)
+        for video_id in ['a', 'b']:
+            video = Video.objects.create(video_id=video_id, title='', published_at=start)
+            for hour in range(3):
+                history = VideoStatsHistory.objects.create(video=video, view_count=hour * 10, like_count=hour)
+                VideoStatsHistory.objects.filter(pk=history.pk).update(collected_at=start + timedelta(hours=hour))
+        self.start = start
+        self.staff = User.objects.create_user(username='staff', password='pw', is_staff=True)
+        self.client.force_login(self.staff)
+
+    def export(self, **params):
+        response = self.client.get('/api/v1/video/stats-history/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    @override_settings(STATS_EXPORT={'CHUNK_SIZE': 2, 'GZIP_LEVEL': 6})
+    def test_streams_filtered_ndjson(self):
+        body = self.export(video='a', start=(self.start + timedelta(hours=1)).isoformat())
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([(row['video_id'], row['view_count']) for row in rows], [('a', 10), ('a', 20)])
+
+    @override_settings(STATS_EXPORT={'CHUNK_SIZE': 2, 'GZIP_LEVEL': 6})
+    def test_streams_gzipped_csv(self):
+        body = self.export(format='csv', gzip='1')
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['collected_at'], self.start.isoformat())
+        self.assertEqual(self.client.get('/api/v1/video/stats-history/export/', {'format': 'xml'}).status_code, 400)
+
+    def test_requires_staff(self):
+        self.client.force_login(User.objects.create_user(username='user', password='pw'))
+        self.assertEqual(self.client.get('/api/v1/video/stats-history/export/').status_code, 302)
+
+    @override_settings(STATS_EXPORT={'CHUNK_SIZE': 2, 'GZIP_LEVEL': 6})
+    async def test_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get('/api/v1/video/stats-history/export/', {'format': 'csv'})
+        # 동기 iterator면 Django가 전체를 list로 모은 뒤 보냄
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks).decode().count('\n'), 7)
+
+
+class FeedSnapshotTests(TestCase):
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(FEED_SNAPSHOTS={
+            'ROOT': str(self.root), 'TRENDING_PAGES': 3, 'PAGE_SIZE': 2, 'GROWTH_LIMIT': 10, 'RANK_LIMIT': 10,
+            'COMPRESS': ['gzip'],
+        }))
+        Video.objects.bulk_create(
+            Video(video_id=f'v{i}', title='', published_at=now(), trend_score=i * 10) for i in range(3)
+        )
+        rebuild_from_db()
+
+    def test_writes_trending_pages_atomically_with_gzip(self):
+        result = publish()
+
+        first = json.loads((self.root / 'trending/1.json').read_text())
+        self.assertEqual([video['video_id'] for video in first['results']], ['v2', 'v1'])
+        self.assertEqual(first['next'], '2.json')
+        self.assertEqual(json.loads((self.root / 'trending/2.json').read_text())['next'], None)
+        self.assertFalse((self.root / 'trending/3.json').exists())
+        self.assertEqual(gzip.decompress((self.root / 'trending/1.json.gz').read_bytes()),
+                         (self.root / 'trending/1.json').read_bytes())
+        self.assertTrue((self.root / 'growth/24h.json').exists())
+        self.assertIn('trending/2.json', json.loads((self.root / 'manifest.json').read_text())['files'])
+        self.assertEqual(list(self.root.glob('**/.*')), [])  # 임시 파일이 남지 않음
+
+        self.assertEqual(publish()['written'], [])  # 내용이 같으면 다시 쓰지 않음
+        self.assertEqual(len(result['written']), 2 + len(WINDOWS) + 1)
+
+    def test_removes_pages_that_no_longer_exist(self):
+        publish()
+        Video.objects.filter(video_id='v0').delete()
+        rebuild_from_db()
+
+        publish()
+
+        self.assertFalse((self.root / 'trending/2.json').exists())
+        self.assertFalse((self.root / 'trending/2.json.gz').exists())
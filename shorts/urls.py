@@ -1,8 +1,21 @@
 # app_name/urls.py
 from django.urls import path
-from .views import trending_videos
+from .views import (
+    discovery_status, growth_rankings, ingestion_status, quota_status, trending_cache_stats, trending_videos, video_growth, video_growth_list, video_rank,
+    stats_history_export, video_search,
+)
 from . import views  # 현재 앱의 views.py에서 함수를 가져옵니다.
 
 urlpatterns = [
     path('trending-videos/', trending_videos, name='trending_videos'), # URL과 View 연결
+    path('trending-videos/cache-stats/', trending_cache_stats, name='trending_cache_stats'),
+    path('growth-rankings/', growth_rankings, name='growth_rankings'),
+    path('growth-rankings/list/', video_growth_list, name='video_growth_list'),
+    path('quota/', quota_status, name='quota_status'),
+    path('ingestion/', ingestion_status, name='ingestion_status'),
+    path('discovery/', discovery_status, name='discovery_status'),
+    path('search/', video_search, name='video_search'),
+    path('stats-history/export/', stats_history_export, name='stats_history_export'),
+    path('<str:video_id>/rank/', video_rank, name='video_rank'),
+    path('<str:video_id>/growth/', video_growth, name='video_growth'),
 ]
@@ -1,28 +1,287 @@
-from django.http import JsonResponse
+import json
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+from django.views.decorators.http import condition
+from shorts import export, response_cache
+from shorts.discovery import discovery_metrics
+from shorts.growth import RESOLUTIONS, growth_curve
+from shorts.ingestion import INGESTION_LOCK_NAME
+from shorts.leaderboard import PAYLOAD_FIELDS, decode_cursor, encode_cursor, get_leaderboard
+from shorts.locks import lock_metrics
 from shorts.models import Video
+from shorts.quota import quota_metrics
+from shorts.rankings import WINDOWS, growth_ranking
+from shorts.search import search_videos
 
+@condition(etag_func=response_cache.etag, last_modified_func=response_cache.last_modified)
 def trending_videos(request):
     """
     트렌드 점수 기준으로 정렬된 영상 목록을 반환
+    Video 테이블 대신 수집 파이프라인이 갱신하는 순위표(shorts.leaderboard)에서 읽고,
+    다음 수집 전까지는 직렬화한 응답을 캐시에서 그대로 돌려줌 (shorts.response_cache)
+
+    - limit: 페이지 크기 (최대 settings.TRENDING_PAGE['MAX_LIMIT'])
+    - cursor: 이전 응답의 X-Next-Cursor 헤더 값. 그 다음 영상부터 반환
+    - fields: 쉼표로 구분한 필드 목록 (예: fields=video_id,title,trend_score)
+    응답 본문은 기존과 같은 영상 목록이고, 다음 페이지가 있으면 X-Next-Cursor와 Link(rel="next") 헤더를 붙인다.
     """
-    limit = request.GET.get('limit', 10)  # 쿼리 매개변수에서 'limit' 값을 가져옴 (기본값: 10)
+    page_settings = settings.TRENDING_PAGE
+    limit = request.GET.get('limit', page_settings['DEFAULT_LIMIT'])  # 쿼리 매개변수에서 'limit' 값을 가져옴
     try:
         limit = int(limit)  # limit 값을 정수로 변환
     except ValueError:
         return JsonResponse({'error': 'Invalid limit value'}, status=400)
+    if limit < 0:
+        return JsonResponse({'error': 'Invalid limit value'}, status=400)
+    limit = min(limit, page_settings['MAX_LIMIT'])
+
+    cursor = request.GET.get('cursor')
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    fields = request.GET.get('fields')
+    if fields:
+        fields = list(dict.fromkeys(fields.split(',')))
+        if not set(fields) <= set(PAYLOAD_FIELDS):
+            return JsonResponse({'error': f'Invalid fields (available: {",".join(PAYLOAD_FIELDS)})'}, status=400)
+    else:
+        fields = None
+
+    # 트렌드 점수 기준 커서 다음의 limit개
+    def render():
+        entries = get_leaderboard().top(limit, after, fields) if limit else []
+        next_cursor = None
+        if entries and len(entries) == limit:
+            video_id, score, _ = entries[-1]
+            next_cursor = encode_cursor(score, video_id)
+        return json.dumps([payload for _, _, payload in entries], cls=DjangoJSONEncoder), next_cursor
+
+    body, next_cursor = response_cache.get_or_render(request, render)
+    response = HttpResponse(body, content_type='application/json')
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        response['X-Next-Cursor'] = next_cursor
+        response['Link'] = f'<{request.build_absolute_uri(f"{request.path}?{params.urlencode()}")}>; rel="next"'
+    return response
+
+
+def trending_cache_stats(request):
+    """
+    trending_videos 응답 캐시 적중률
+    """
+    return JsonResponse(response_cache.cache_stats())
+
+
+def video_rank(request, video_id):
+    """
+    영상 하나의 트렌드 순위 (1위부터)
+    """
+    result = get_leaderboard().rank(video_id)
+    if result is None:
+        return JsonResponse({'error': 'Video not found'}, status=404)
+
+    rank, trend_score = result
+    return JsonResponse({'video_id': video_id, 'rank': rank, 'trend_score': trend_score})
+
+
+def parse_time(value):
+    """ISO 8601 문자열 -> aware datetime (시간대가 없으면 UTC)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'invalid datetime: {value}')
+    return make_aware(parsed) if is_naive(parsed) else parsed
+
+
+def video_growth(request, video_id):
+    """
+    영상 하나의 조회수/좋아요 성장 곡선
+    - resolution: 구간 단위 5m / 1h / 1d (기본값: 1h)
+    - start, end: ISO 8601 시각 (기본값: 최근 DEFAULT_BUCKETS개 구간)
+    끝난 구간만 포함한 응답은 바뀌지 않으므로 오래 캐시할 수 있고,
+    진행 중인 구간을 포함하면 그 구간이 끝날 때까지만 캐시한다.
+    """
+    growth_settings = settings.GROWTH_CURVE
+    resolution = request.GET.get('resolution', '1h')
+    if resolution not in RESOLUTIONS:
+        return JsonResponse({'error': f'Invalid resolution (available: {",".join(RESOLUTIONS)})'}, status=400)
+    bucket_size = RESOLUTIONS[resolution]
+
+    at = now()
+    try:
+        end = parse_time(request.GET['end']) if 'end' in request.GET else at
+        start = (parse_time(request.GET['start']) if 'start' in request.GET
+                 else end - bucket_size * growth_settings['DEFAULT_BUCKETS'])
+    except ValueError:
+        return JsonResponse({'error': 'Invalid start/end value'}, status=400)
+    if not start < end or (end - start) / bucket_size > growth_settings['MAX_BUCKETS']:
+        return JsonResponse({'error': f'Invalid range (up to {growth_settings["MAX_BUCKETS"]} buckets)'}, status=400)
+
+    video = Video.objects.filter(video_id=video_id).only('pk').first()
+    if video is None:
+        return JsonResponse({'error': 'Video not found'}, status=404)
+
+    buckets, finished_until = growth_curve(video, resolution, start, end, at)
+    response = JsonResponse({
+        'video_id': video_id,
+        'resolution': resolution,
+        'start': start,
+        'end': end,
+        'buckets': buckets,
+    })
+    if end <= finished_until:
+        max_age = growth_settings['CACHE_TIMEOUT']
+    else:
+        max_age = int((finished_until + bucket_size - at).total_seconds())
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def parse_growth_request(request):
+    """
+    증가량 순위 요청의 (window, limit)
+    :raises ValueError: 잘못된 window / limit
+    """
+    window = request.GET.get('window', '24h')
+    if window not in WINDOWS:
+        raise ValueError(f'Invalid window (available: {",".join(WINDOWS)})')
+    try:
+        limit = int(request.GET.get('limit', settings.TRENDING_PAGE['DEFAULT_LIMIT']))
+    except ValueError:
+        raise ValueError('Invalid limit value')
+    if limit < 0:
+        raise ValueError('Invalid limit value')
+    return window, min(limit, settings.TRENDING_PAGE['MAX_LIMIT'])
+
+
+def growth_rankings(request):
+    """
+    최근 1h / 6h / 24h 동안 조회수가 가장 많이 늘어난 영상 (window, limit)
+    수집할 때 증분 갱신한 VideoGrowth에서 읽으므로 이력을 조회하지 않음
+    """
+    try:
+        window, limit = parse_growth_request(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-    # 트렌드 점수 기준 정렬 및 limit에 따른 제한
-    videos = Video.objects.order_by('-trend_score')[:limit]
     data = [
         {
-            'video_id': video.video_id,
-            'title': video.title,
-            'description': video.description,
-            'trend_score': video.trend_score,
-            'view_count': video.view_count,
-            'like_count': video.like_count,
-            'published_at': video.published_at,
+            'video_id': growth.video.video_id,
+            'title': growth.video.title,
+            'view_growth': getattr(growth, f'view_growth_{window}'),
+            'like_growth': getattr(growth, f'like_growth_{window}'),
+            'sampled_at': growth.sampled_at,
+        }
+        for growth in growth_ranking(window, limit)
+    ]
+    return JsonResponse({'window': window, 'results': data})
+
+
+def video_growth_list(request):
+    """
+    증가량 순위 페이지 (templates/video_growth_list.html)
+    """
+    try:
+        window, limit = parse_growth_request(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    growth_data = [
+        {
+            'video': growth.video,
+            'view_diff': getattr(growth, f'view_growth_{window}'),
+            'like_diff': getattr(growth, f'like_growth_{window}'),
         }
-        for video in videos
+        for growth in growth_ranking(window, limit)
     ]
-    return JsonResponse(data, safe=False)
+    return render(request, 'video_growth_list.html', {'growth_data': growth_data, 'window': window})
+
+
+def quota_status(request):
+    """
+    유튜브 API 할당량 사용 현황 (대시보드용)
+    남은 할당량, 최근 1시간 소모 속도, 현재 속도로 소진 예상 시각, 엔드포인트별 사용량
+    """
+    return JsonResponse(quota_metrics())
+
+
+def ingestion_status(request):
+    """
+    수집 실행 잠금 상태 (실행 중 여부, 건너뛴/겹친 실행 수, 마지막 실행 시간)
+    skipped가 계속 늘면 수집 주기가 실행 시간보다 짧은 것
+    """
+    return JsonResponse(lock_metrics(INGESTION_LOCK_NAME))
+
+
+def discovery_status(request):
+    """
+    새 영상 검색별 누적 수율 (검색 1회당 새 영상 수)
+    수율이 낮은 검색은 settings.SHORTS_DISCOVERY['QUERIES']에서 빼거나 MIN_YIELD로 자동으로 건너뜀
+    """
+    return JsonResponse(discovery_metrics())
+
+
+def video_search(request):
+    """
+    제목/설명 전문 검색 (q, limit)
+    역색인(shorts.search)에서 검색어의 모든 단어가 들어간 영상을 찾아 관련도와 트렌드 점수로 정렬
+    """
+    search_settings = settings.VIDEO_SEARCH
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'q is required'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', search_settings['DEFAULT_LIMIT']))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit value'}, status=400)
+    if limit < 0:
+        return JsonResponse({'error': 'Invalid limit value'}, status=400)
+
+    results = search_videos(query, min(limit, search_settings['MAX_LIMIT']))
+    return JsonResponse({'query': query, 'results': results})
+
+
+@staff_member_required
+def stats_history_export(request):
+    """
+    통계 이력 내보내기 (스트리밍, 메모리 사용량 일정, 관리자만)
+    - format: ndjson / csv (기본값: ndjson)
+    - resolution: raw / hour / day (기본값: raw)
+    - video: 쉼표로 구분한 video_id 목록
+    - start, end: ISO 8601 시각
+    - gzip: 1이면 gzip 파일로 내려줌
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in export.FORMATS:
+        return JsonResponse({'error': f'Invalid format (available: {",".join(export.FORMATS)})'}, status=400)
+    resolution = request.GET.get('resolution', export.RAW)
+    if resolution not in export.RESOLUTIONS:
+        return JsonResponse({'error': f'Invalid resolution (available: {",".join(export.RESOLUTIONS)})'}, status=400)
+    try:
+        start = parse_time(request.GET['start']) if 'start' in request.GET else None
+        end = parse_time(request.GET['end']) if 'end' in request.GET else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid start/end value'}, status=400)
+    video_ids = [video_id for video_id in request.GET.get('video', '').split(',') if video_id]
+    compress = request.GET.get('gzip') in ('1', 'true')
+
+    chunks = export.export_stream(
+        export_format, compress, resolution=resolution, video_ids=video_ids, start=start, end=end,
+    )
+    if isinstance(request, ASGIRequest):
+        chunks = export.aiter_chunks(chunks)
+    response = StreamingHttpResponse(
+        chunks, content_type='application/gzip' if compress else export.FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export.export_filename(export_format, compress)}"'
+    return response